@@ -4,9 +4,10 @@ Add Missing Corporations
 Adds Nexus Enraenra and Aethos Military Group to the database
 """
 
-import sqlite3
 import sys
 
+from database_utils import begin_write, connect
+
 
 def add_corporations(db_path="universe.db"):
     """Add the missing corporations"""
@@ -15,9 +16,10 @@ def add_corporations(db_path="universe.db"):
     print("ADDING MISSING CORPORATIONS")
     print("="*60)
     
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path, 'concurrent')
     cursor = conn.cursor()
     cursor.execute("PRAGMA foreign_keys = ON")
+    begin_write(conn)
     
     # Get Tokyo location ID (for headquarters)
     cursor.execute("SELECT location_id FROM locations WHERE location_name = 'Tokyo'")
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Asyncio Database API
+====================
+An async facade over database_utils for the asyncio editor backend, so
+it no longer wraps every call in run_in_executor by hand.
+
+    reads    run on a dedicated thread pool. Each thread keeps its own
+             read-profile connection open for the life of the facade, so
+             a call costs one query, not a connect. Reads run concurrently
+             (WAL readers do not block each other or the writer).
+    writes   go through a WriterService (writer_service.py): one write
+             connection, group commits, results after the commit. At most
+             `max_pending_writes` writes are in flight; further writes
+             wait in `await`, not in a blocked thread. The writer starts
+             on the first write, so a read-only session never opens a
+             write connection or switches the file to WAL.
+    cancel   cancelling a read interrupts its query (sqlite3 interrupt).
+             Cancelling a write that has not reached a commit group drops
+             it; once its group has started the write may still commit.
+    iterate  `async for` over large result sets, fetched in batches on a
+             reader thread with at most two batches buffered.
+
+Usage:
+    async with AsyncDatabase("universe.db") as db:
+        kage = await db.get_character("Kage Ishigawa")
+        async for row in db.iter_characters(faction="Shadow Core"):
+            ...
+        event_id = await db.add_event("Kage Ishigawa", 2031, "Joins Shadow Core")
+
+    python async_database.py <database_path> <character_name>
+"""
+
+import asyncio
+import sqlite3
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from database_utils import (
+    CHARACTER_QUERY, TIMELINE_QUERY, character_search_query, connect, read_profile,
+)
+from writer_service import WriterService
+
+
+READ_THREADS = 4
+MAX_PENDING_WRITES = 1000
+FETCH_BATCH = 500                   # rows per step of an async iteration
+BUFFERED_BATCHES = 2                # batches an iteration may fetch ahead
+
+
+class AsyncDatabase:
+    """Async reads on a thread pool, async writes through a WriterService"""
+
+    def __init__(self, db_path: str, read_threads: int = READ_THREADS,
+                 max_pending_writes: int = MAX_PENDING_WRITES, **writer_options):
+        """
+        Args:
+            db_path: Path to database
+            read_threads: Reader threads (each with its own connection);
+                          a running iteration holds one of them
+            max_pending_writes: Writes in flight before add_* calls wait
+            **writer_options: Passed to WriterService (group_window, ...)
+        """
+        self.db_path = db_path
+        self.read_threads = read_threads
+        self.max_pending_writes = max_pending_writes
+        self.writer = WriterService(db_path, max_pending=max_pending_writes, **writer_options)
+        self._readers = None
+        self._write_slots = None
+        self._writer_lock = None
+        self._writer_started = False
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    async def open(self):
+        """Start the reader pool (the writer starts on the first write)"""
+        self._readers = ThreadPoolExecutor(self.read_threads, thread_name_prefix='async-reader')
+        self._write_slots = asyncio.Semaphore(self.max_pending_writes)
+        self._writer_lock = asyncio.Lock()
+
+    async def close(self):
+        """Finish pending writes, then close every connection"""
+        loop = asyncio.get_running_loop()
+        if self._writer_started:
+            await loop.run_in_executor(None, self.writer.stop)
+            self._writer_started = False
+        if self._readers:
+            await loop.run_in_executor(None, self._readers.shutdown)
+            self._readers = None
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    # ──────────────────────────────────────────────────────────
+    # Reader threads
+    # ──────────────────────────────────────────────────────────
+
+    def _connection(self) -> sqlite3.Connection:
+        """This reader thread's connection, opened on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # check_same_thread=False only so close() can close it; the
+            # connection is never used from another thread
+            conn = connect(self.db_path, read_profile(self.db_path),
+                           row_factory=sqlite3.Row, check_same_thread=False)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    async def _read(self, work, *args):
+        """Run work(connection, *args) on a reader thread; cancelling interrupts it"""
+        if self._readers is None:
+            raise RuntimeError("AsyncDatabase is not open")
+        loop = asyncio.get_running_loop()
+        running = {}
+        guard = threading.Lock()
+
+        def run():
+            conn = self._connection()
+            with guard:
+                running['conn'] = conn
+            try:
+                return work(conn, *args)
+            finally:
+                with guard:
+                    running.pop('conn', None)
+
+        future = loop.run_in_executor(self._readers, run)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            with guard:
+                if 'conn' in running:
+                    running['conn'].interrupt()
+            raise
+
+    async def fetch_all(self, sql: str, params=()) -> List[Dict[str, Any]]:
+        """Run a read query and return every row as a dict"""
+        return await self._read(lambda conn: [dict(row) for row in conn.execute(sql, params)])
+
+    async def fetch_one(self, sql: str, params=()) -> Optional[Dict[str, Any]]:
+        """Run a read query and return its first row as a dict (or None)"""
+        def work(conn):
+            row = conn.execute(sql, params).fetchone()
+            return dict(row) if row else None
+        return await self._read(work)
+
+    async def iterate(self, sql: str, params=(), batch_size: int = FETCH_BATCH) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a read query's rows.
+
+        A reader thread fetches `batch_size` rows at a time and stops
+        fetching while BUFFERED_BATCHES are waiting, so memory stays
+        bounded however large the result. Leaving the loop early
+        interrupts the query and frees the thread.
+
+        Yields:
+            Rows as dicts
+        """
+        if self._readers is None:
+            raise RuntimeError("AsyncDatabase is not open")
+        loop = asyncio.get_running_loop()
+        batches = asyncio.Queue(BUFFERED_BATCHES)
+        stop = threading.Event()
+        running = {}
+        guard = threading.Lock()
+        done = object()
+
+        def produce():
+            conn = self._connection()
+            with guard:
+                if stop.is_set():
+                    return
+                running['conn'] = conn
+            try:
+                cursor = conn.execute(sql, params)
+                try:
+                    while not stop.is_set():
+                        rows = [dict(row) for row in cursor.fetchmany(batch_size)]
+                        if not hand_over(rows or done) or not rows:
+                            break
+                finally:
+                    cursor.close()
+            except Exception as e:
+                if not stop.is_set():
+                    hand_over(e)
+            finally:
+                with guard:
+                    running.pop('conn', None)
+
+        def hand_over(item) -> bool:
+            put = asyncio.run_coroutine_threadsafe(batches.put(item), loop)
+            while True:
+                try:
+                    put.result(timeout=0.1)
+                    return True
+                except FutureTimeout:
+                    if stop.is_set():
+                        put.cancel()
+                        return False
+
+        producer = loop.run_in_executor(self._readers, produce)
+        try:
+            while True:
+                item = await batches.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                for row in item:
+                    yield row
+        finally:
+            # Stop a query the consumer walked away from; the thread is
+            # free again once the producer returns
+            with guard:
+                stop.set()
+                if 'conn' in running:
+                    running['conn'].interrupt()
+            await asyncio.shield(producer)
+
+    # ──────────────────────────────────────────────────────────
+    # Characters and timelines (database_utils equivalents)
+    # ──────────────────────────────────────────────────────────
+
+    async def get_character(self, character_name: str) -> Optional[Dict[str, Any]]:
+        """Async database_utils.get_character"""
+        return await self.fetch_one(CHARACTER_QUERY, (character_name,))
+
+    async def get_characters(self, character_names: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Look up many characters in one round trip.
+
+        Returns:
+            Dictionary of name → character (None when not found)
+        """
+        names = list(dict.fromkeys(character_names))
+
+        def work(conn):
+            found = {}
+            # Stay under SQLite's default host-parameter limit (999)
+            for start in range(0, len(names), 900):
+                chunk = names[start:start + 900]
+                marks = ','.join('?' * len(chunk))
+                for row in conn.execute(
+                        f"SELECT * FROM characters WHERE character_name IN ({marks})", chunk):
+                    found.setdefault(row['character_name'], dict(row))
+            return {name: found.get(name) for name in names}
+        return await self._read(work)
+
+    async def search_characters(self, **filters) -> List[Dict[str, Any]]:
+        """Async database_utils.search_characters"""
+        return await self.fetch_all(*character_search_query(**filters))
+
+    def iter_characters(self, **filters) -> AsyncIterator[Dict[str, Any]]:
+        """search_characters as an async iterator for large rosters"""
+        return self.iterate(*character_search_query(**filters))
+
+    async def get_character_timeline(self, character_name: str) -> List[Dict[str, Any]]:
+        """Async database_utils.get_character_timeline"""
+        return await self.fetch_all(TIMELINE_QUERY, (character_name,))
+
+    # ──────────────────────────────────────────────────────────
+    # Writes
+    # ──────────────────────────────────────────────────────────
+
+    async def write(self, op: str, *args, **kwargs):
+        """
+        Run a WriterService operation (add_character, add_event, execute, ...).
+
+        Waits for a free slot when max_pending_writes are in flight.
+
+        Returns:
+            The operation's result once committed; its error is raised
+        """
+        if self._write_slots is None:
+            raise RuntimeError("AsyncDatabase is not open")
+        await self._start_writer()
+        await self._write_slots.acquire()
+        return await self._submit(op, args, kwargs)
+
+    async def _start_writer(self):
+        """Open the write connection on first use"""
+        if self._writer_started:
+            return
+        async with self._writer_lock:
+            if not self._writer_started:
+                await asyncio.get_running_loop().run_in_executor(None, self.writer.start)
+                self._writer_started = True
+
+    def _submit(self, op: str, args, kwargs) -> asyncio.Future:
+        """Hand an operation to the writer; its write slot must already be held"""
+        try:
+            future = asyncio.wrap_future(self.writer.submit(op, *args, **kwargs))
+        except BaseException:
+            self._write_slots.release()
+            raise
+        future.add_done_callback(lambda _: self._write_slots.release())
+        return future
+
+    async def add_event(self, character_name: str, event_year: int, description: str,
+                        event_type: Optional[str] = None, event_date: Optional[str] = None,
+                        location_name: Optional[str] = None) -> Optional[int]:
+        """
+        Async database_utils.add_event.
+
+        Returns:
+            event_id, or None if the character does not exist
+            (sqlite3.Error is raised instead of printed)
+        """
+        return await self.write('add_event', character_name, event_year, description,
+                                event_type, event_date, location_name)
+
+    async def add_character(self, character_name: str, **kwargs) -> int:
+        """Async database_utils.add_character (sqlite3.Error is raised)"""
+        return await self.write('add_character', character_name, **kwargs)
+
+    async def add_events(self, events: Iterable[Dict[str, Any]]) -> List[Any]:
+        """
+        Add many events; they share group commits.
+
+        Args:
+            events: Dicts of add_event keyword arguments
+
+        Returns:
+            event_id (or None) per event, in order; failed events appear
+            as exception instances
+        """
+        return await self._write_many('add_event', events)
+
+    async def add_characters(self, characters: Iterable[Dict[str, Any]]) -> List[Any]:
+        """
+        Add many characters; they share group commits.
+
+        Args:
+            characters: Dicts of add_character keyword arguments
+                        (character_name required)
+
+        Returns:
+            character_id per character, in order; failed characters
+            appear as exception instances
+        """
+        return await self._write_many('add_character', characters)
+
+    async def _write_many(self, op: str, items: Iterable[Dict[str, Any]]) -> List[Any]:
+        if self._write_slots is None:
+            raise RuntimeError("AsyncDatabase is not open")
+        await self._start_writer()
+        futures = []
+        try:
+            for item in items:
+                # One slot per submission, so a huge batch is paced by the
+                # writer instead of queueing everything up front
+                await self._write_slots.acquire()
+                futures.append(self._submit(op, (), item))
+            return await asyncio.gather(*futures, return_exceptions=True)
+        except asyncio.CancelledError:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+async def _demo(db_path: str, character_name: str):
+    async with AsyncDatabase(db_path) as db:
+        # Phase 5 databases have no character_events table
+        has_events = await db.fetch_one(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'character_events'")
+        character, timeline = await asyncio.gather(
+            db.get_character(character_name),
+            db.get_character_timeline(character_name) if has_events else asyncio.sleep(0, []),
+        )
+        if not character:
+            print(f"✗ Character '{character_name}' not found")
+            return
+        print(f"✓ {character['character_name']} ({character.get('faction') or 'no faction'})")
+        if not has_events:
+            print("  ⚠ No character_events table - timeline skipped")
+        for event in timeline:
+            print(f"  {event['event_year']}: {event['description']}")
+        same_faction = 0
+        async for _ in db.iter_characters(faction=character.get('faction')):
+            same_faction += 1
+        print(f"  {same_faction} character(s) in the same faction")
+
+
+def main():
+    if len(sys.argv) != 3:
+        print("Usage: python async_database.py <database_path> <character_name>")
+        sys.exit(1)
+
+    db_path = sys.argv[1]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    try:
+        asyncio.run(_demo(db_path, sys.argv[2]))
+    except sqlite3.Error as e:
+        print(f"❌ Database error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+Clearance & Resonance Authorization
+===================================
+Access rules are spread across several encodings:
+
+    K-levels        CMM klevel "01"–"05" (character_secrets, characters.klevel)
+    RRL tiers       rrl-nnn-0X codes and rrl_tier (resonance_levels.csv,
+                    character_secrets, characters.rrl_level)
+    clearance       affiliations.clearance_level: "K-Level 01", "RRL-03", "03"
+    fail-safes      meta_core_fail_safes.rrl_required / authority
+    vault           meta_core_vault_conditions bearer_rrl_code_min
+
+This module normalizes all of them to two numeric scales (klevel, rrl),
+derives a capability registry from the rule tables, and precomputes one
+capability bitset per character:
+
+    authorization_capabilities  bit → capability (scale, min level, principal)
+    character_capabilities      character_id → klevel, rrl_level, bits
+    authorization_dirty         characters (or '*' for all) awaiting recompute
+
+Triggers on characters, affiliations and the rule tables mark rows dirty;
+Authorizer.sync() recomputes only those. An Authorizer loads the stored
+registry and bitsets and syncs, so a process that finds nothing dirty
+reads but never writes; the full rebuild runs on install, when the
+tables are missing and when a rule table changed ('*'). can() and
+who_may() are then dictionary/bit operations with no database access.
+
+Usage:
+    python authorization.py <database_path> install
+    python authorization.py <database_path> can <character> <capability>
+    python authorization.py <database_path> who <capability>
+    python authorization.py <database_path> faction <faction>
+"""
+
+import json
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from database_utils import table_exists, table_columns
+from name_index import NameIndex
+
+
+MAX_CAPABILITIES = 63  # bitsets are stored in a signed 64-bit INTEGER
+LEVELS = range(1, 6)
+
+KLEVEL_RE = re.compile(r'^\s*k(?:[-\s]*level)?[-\s]*0*(\d+)\s*$', re.IGNORECASE)
+RRL_RE = re.compile(r'^\s*rrl(?:-nnn)?[-\s]*0*(\d+)\s*$', re.IGNORECASE)
+BARE_RE = re.compile(r'^\s*0*(\d+)\s*$')
+
+DEFAULT_VAULT_MIN = ('rrl', 3)
+
+
+def normalize_level(value, default_scale: Optional[str] = None) -> Optional[Tuple[str, int]]:
+    """
+    Normalize a clearance string to (scale, level).
+
+    Args:
+        value: "K-Level 01", "klevel 3", "RRL-03", "rrl-nnn-04", "05", 4, ...
+        default_scale: Scale for bare numbers ('klevel' or 'rrl'); None ignores them
+
+    Returns:
+        ('klevel' | 'rrl', level) or None if unrecognized
+    """
+    if value is None:
+        return None
+    text = str(value)
+    for scale, pattern in (('klevel', KLEVEL_RE), ('rrl', RRL_RE)):
+        match = pattern.match(text)
+        if match:
+            return scale, int(match.group(1))
+    match = BARE_RE.match(text)
+    if match and default_scale:
+        return default_scale, int(match.group(1))
+    return None
+
+
+def create_authorization_tables(cursor):
+    """Create capability, bitset and invalidation tables plus triggers"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS authorization_capabilities (
+            bit INTEGER PRIMARY KEY,
+            capability TEXT UNIQUE NOT NULL,
+            scale TEXT,
+            min_level INTEGER,
+            principal_id
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS character_capabilities (
+            character_id PRIMARY KEY,
+            faction TEXT,
+            klevel INTEGER NOT NULL DEFAULT 0,
+            rrl_level INTEGER NOT NULL DEFAULT 0,
+            capability_bits INTEGER NOT NULL DEFAULT 0,
+            computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_character_capabilities_faction
+        ON character_capabilities(faction)
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS authorization_dirty (
+            character_id PRIMARY KEY
+        )
+    """)
+
+    char_cols = [c for c in ('character_secrets', 'klevel', 'rrl_level', 'faction', 'character_name')
+                 if c in table_columns(cursor, 'characters')]
+    triggers = {
+        'trg_auth_characters_ins': "AFTER INSERT ON characters",
+        'trg_auth_characters_upd': f"AFTER UPDATE OF {', '.join(char_cols)} ON characters",
+        'trg_auth_characters_del': "AFTER DELETE ON characters",
+    }
+    # Phase 5 importers insert characters without a character_id; there is
+    # nothing to compute for them until they get one
+    for name, event in triggers.items():
+        row = 'OLD' if name.endswith('_del') else 'NEW'
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"""
+            CREATE TRIGGER {name} {event}
+            WHEN {row}.character_id IS NOT NULL
+            BEGIN
+            INSERT OR IGNORE INTO authorization_dirty VALUES ({row}.character_id);
+            END
+        """)
+
+    if table_exists(cursor, 'character_corporate_affiliations'):
+        for suffix, event, row in (('ins', 'AFTER INSERT', 'NEW'),
+                                   ('upd', 'AFTER UPDATE', 'NEW'),
+                                   ('del', 'AFTER DELETE', 'OLD')):
+            name = f"trg_auth_affiliations_{suffix}"
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(f"""
+                CREATE TRIGGER {name} {event} ON character_corporate_affiliations
+                WHEN {row}.character_id IS NOT NULL
+                BEGIN
+                INSERT OR IGNORE INTO authorization_dirty VALUES ({row}.character_id);
+                END
+            """)
+
+    # Rule changes invalidate everyone
+    for table in ('meta_core_fail_safes', 'meta_core_vault_conditions'):
+        if not table_exists(cursor, table):
+            continue
+        for suffix, event in (('ins', 'INSERT'), ('upd', 'UPDATE'), ('del', 'DELETE')):
+            name = f"trg_auth_{table}_{suffix}"
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(f"""
+                CREATE TRIGGER {name} AFTER {event} ON {table}
+                BEGIN
+                INSERT OR IGNORE INTO authorization_dirty VALUES ('*');
+                END
+            """)
+
+
+def _capability_rules(cursor, names: NameIndex) -> List[Tuple[str, Optional[str], Optional[int], object]]:
+    """(capability, scale, min_level, principal character_id) derived from the rule tables"""
+    rules = []
+    for level in LEVELS:
+        rules.append((f"klevel:{level:02d}", 'klevel', level, None))
+        rules.append((f"rrl:{level:02d}", 'rrl', level, None))
+
+    if table_exists(cursor, 'meta_core_fail_safes'):
+        cursor.execute("SELECT name, authority, rrl_required FROM meta_core_fail_safes ORDER BY id")
+        for name, authority, rrl_required in cursor.fetchall():
+            required = normalize_level(rrl_required) if rrl_required else None
+            principal = names.resolve(authority) if authority else None
+            rules.append((f"fail_safe:{name}", *(required or (None, None)), principal))
+
+    if table_exists(cursor, 'meta_core_vault_conditions'):
+        cursor.execute("""
+            SELECT value FROM meta_core_vault_conditions
+            WHERE key = 'bearer_rrl_code_min' ORDER BY rowid DESC LIMIT 1
+        """)
+        row = cursor.fetchone()
+        vault_min = normalize_level(row[0]) if row else None
+        cursor.execute("SELECT DISTINCT category FROM meta_core_vault_conditions ORDER BY category")
+        for (category,) in cursor.fetchall():
+            rules.append((f"vault:{category}", *(vault_min or DEFAULT_VAULT_MIN), None))
+
+    if len(rules) > MAX_CAPABILITIES:
+        raise ValueError(f"{len(rules)} capabilities exceed the {MAX_CAPABILITIES}-bit bitset")
+    return rules
+
+
+def _character_levels(cursor, character_ids: Optional[List] = None) -> Dict[object, Dict]:
+    """Normalized klevel / rrl_level and faction per character"""
+    char_cols = table_columns(cursor, 'characters')
+    columns = ['character_id', 'faction'] + [
+        c for c in ('klevel', 'rrl_level', 'character_secrets') if c in char_cols
+    ]
+    query = f"SELECT {', '.join(columns)} FROM characters"
+    params: List = []
+    if character_ids is not None:
+        query += f" WHERE character_id IN ({', '.join('?' for _ in character_ids)})"
+        params = list(character_ids)
+    else:
+        query += " WHERE character_id IS NOT NULL"
+    cursor.execute(query, params)
+
+    levels = {}
+    for values in cursor.fetchall():
+        row = dict(zip(columns, values))
+        found = {'klevel': 0, 'rrl': 0}
+
+        def take(level):
+            if level:
+                found[level[0]] = max(found[level[0]], level[1])
+
+        take(normalize_level(row.get('klevel'), 'klevel'))
+        take(normalize_level(row.get('rrl_level'), 'rrl'))
+        try:
+            secrets = json.loads(row.get('character_secrets') or '{}')
+        except (TypeError, ValueError):
+            secrets = {}
+        if isinstance(secrets, dict):
+            take(normalize_level(secrets.get('klevel'), 'klevel'))
+            take(normalize_level(secrets.get('rrl_code'), 'rrl'))
+            take(normalize_level(secrets.get('rrl_tier'), 'rrl'))
+        levels[row['character_id']] = {'faction': row['faction'], **found}
+
+    if table_exists(cursor, 'character_corporate_affiliations') and levels:
+        cursor.execute(f"""
+            SELECT character_id, clearance_level FROM character_corporate_affiliations
+            WHERE clearance_level IS NOT NULL
+              AND character_id IN ({', '.join('?' for _ in levels)})
+        """, list(levels))
+        for character_id, clearance in cursor.fetchall():
+            # Importers write bare numbers as K-levels (RRL tiers also land in secrets)
+            level = normalize_level(clearance, 'klevel')
+            if level:
+                found = levels[character_id]
+                found[level[0]] = max(found[level[0]], level[1])
+    return levels
+
+
+class Authorizer:
+    """In-memory capability bitsets with trigger-driven invalidation"""
+
+    def __init__(self, db_path: str = "universe.db", refresh: bool = False):
+        """
+        Args:
+            db_path: Path to database
+            refresh: Recompute everything instead of loading the stored bitsets
+        """
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.capabilities: Dict[str, int] = {}       # capability → bit
+        self.bits: Dict[object, int] = {}             # character_id → bitset
+        self.factions: Dict[object, Optional[str]] = {}
+        self.names: Optional[NameIndex] = None
+        if refresh:
+            self.rebuild()
+        else:
+            self.load()
+
+    def close(self):
+        """Close database connection"""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # ──────────────────────────────────────────────────────────
+    # Precomputation
+    # ──────────────────────────────────────────────────────────
+
+    def load(self):
+        """Load the stored registry and bitsets, then apply pending invalidations"""
+        cursor = self.conn.cursor()
+        tables = ('authorization_capabilities', 'character_capabilities', 'authorization_dirty')
+        if not all(table_exists(cursor, table) for table in tables):
+            self.rebuild()
+            return
+        cursor.execute("""
+            SELECT bit, capability, scale, min_level, principal_id
+            FROM authorization_capabilities ORDER BY bit
+        """)
+        stored = cursor.fetchall()
+        if not stored:
+            self.rebuild()
+            return
+
+        self._rules = [tuple(row[1:]) for row in stored]
+        self.capabilities = {capability: bit for bit, capability, *_ in stored}
+        self.names = NameIndex.from_cursor(cursor)
+        cursor.execute("SELECT character_id, faction, capability_bits FROM character_capabilities")
+        self.bits, self.factions = {}, {}
+        for character_id, faction, bits in cursor.fetchall():
+            self.bits[character_id] = bits
+            self.factions[character_id] = faction
+        self.sync()
+
+    def rebuild(self):
+        """Recompute the capability registry and every character's bitset"""
+        cursor = self.conn.cursor()
+        create_authorization_tables(cursor)
+        self.names = NameIndex.from_cursor(cursor)
+        rules = _capability_rules(cursor, self.names)
+
+        cursor.execute("DELETE FROM authorization_capabilities")
+        cursor.executemany("""
+            INSERT INTO authorization_capabilities (bit, capability, scale, min_level, principal_id)
+            VALUES (?, ?, ?, ?, ?)
+        """, [(bit, *rule) for bit, rule in enumerate(rules)])
+        self.capabilities = {rule[0]: bit for bit, rule in enumerate(rules)}
+        self._rules = rules
+
+        cursor.execute("DELETE FROM character_capabilities")
+        cursor.execute("DELETE FROM authorization_dirty")
+        self.bits, self.factions = {}, {}
+        self._store(cursor, _character_levels(cursor))
+        self.conn.commit()
+
+    def _bitset(self, character_id, levels: Dict) -> int:
+        bits = 0
+        for bit, (_, scale, min_level, principal) in enumerate(self._rules):
+            granted = principal is not None and principal == character_id
+            if scale and levels[scale] >= min_level:
+                granted = True
+            if granted:
+                bits |= 1 << bit
+        return bits
+
+    def _store(self, cursor, levels: Dict[object, Dict]):
+        rows = []
+        for character_id, found in levels.items():
+            bits = self._bitset(character_id, found)
+            self.bits[character_id] = bits
+            self.factions[character_id] = found['faction']
+            rows.append((character_id, found['faction'], found['klevel'], found['rrl'], bits))
+        cursor.executemany("""
+            INSERT OR REPLACE INTO character_capabilities
+            (character_id, faction, klevel, rrl_level, capability_bits)
+            VALUES (?, ?, ?, ?, ?)
+        """, rows)
+
+    def sync(self) -> int:
+        """
+        Apply pending invalidations from the triggers.
+
+        Returns:
+            Number of characters recomputed (-1 for a full rebuild)
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT character_id FROM authorization_dirty")
+        dirty = [row[0] for row in cursor.fetchall()]
+        if not dirty:
+            return 0
+        if '*' in dirty:
+            self.rebuild()
+            return -1
+
+        levels = _character_levels(cursor, [c for c in dirty if c is not None])
+        for character_id in dirty:
+            if character_id is not None and character_id not in levels:
+                self.bits.pop(character_id, None)
+                self.factions.pop(character_id, None)
+                cursor.execute("DELETE FROM character_capabilities WHERE character_id = ?",
+                               (character_id,))
+        self._store(cursor, levels)
+        # IS, not =, so NULL ids queued by older triggers are cleared too
+        cursor.executemany("DELETE FROM authorization_dirty WHERE character_id IS ?",
+                           [(character_id,) for character_id in dirty])
+        self.conn.commit()
+        return len(dirty)
+
+    # ──────────────────────────────────────────────────────────
+    # Checks (no database access)
+    # ──────────────────────────────────────────────────────────
+
+    def _id(self, character):
+        if character in self.bits:
+            return character
+        return self.names.resolve(str(character)) if self.names else None
+
+    def can(self, character, capability: str) -> bool:
+        """
+        Check one capability, e.g. can('Kage Ishigawa', 'fail_safe:ADJUDICATOR_BRAKE').
+
+        Args:
+            character: character_id or any resolvable name
+            capability: Capability name (see capabilities)
+        """
+        bit = self.capabilities.get(capability)
+        bits = self.bits.get(self._id(character), 0)
+        return bit is not None and bool(bits >> bit & 1)
+
+    def can_access_vault(self, character, category: str) -> bool:
+        """Whether a character may access a vault condition category"""
+        return self.can(character, f"vault:{category}")
+
+    def who_may(self, capability: str) -> List[object]:
+        """All character_ids holding a capability"""
+        bit = self.capabilities.get(capability)
+        if bit is None:
+            return []
+        mask = 1 << bit
+        return [character_id for character_id, bits in self.bits.items() if bits & mask]
+
+    def granted(self, character) -> List[str]:
+        """Every capability a character holds"""
+        bits = self.bits.get(self._id(character), 0)
+        return [name for name, bit in self.capabilities.items() if bits >> bit & 1]
+
+    def evaluate_faction(self, faction: str, capabilities: Optional[List[str]] = None
+                         ) -> Dict[object, List[str]]:
+        """
+        Bulk evaluation for every member of a faction.
+
+        Args:
+            faction: Faction name
+            capabilities: Capabilities to evaluate (default: all)
+
+        Returns:
+            Dictionary of character_id → granted capabilities
+        """
+        wanted = [(name, 1 << self.capabilities[name])
+                  for name in (capabilities or self.capabilities) if name in self.capabilities]
+        return {
+            character_id: [name for name, mask in wanted if self.bits[character_id] & mask]
+            for character_id, member_faction in self.factions.items()
+            if member_faction == faction
+        }
+
+
+def main():
+    commands = ('install', 'can', 'who', 'faction')
+    if len(sys.argv) < 3 or sys.argv[2] not in commands:
+        print("Usage: python authorization.py <database_path> install")
+        print("       python authorization.py <database_path> can <character> <capability>")
+        print("       python authorization.py <database_path> who <capability>")
+        print("       python authorization.py <database_path> faction <faction>")
+        sys.exit(1)
+
+    db_path, command = sys.argv[1], sys.argv[2]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    with Authorizer(db_path, refresh=(command == 'install')) as auth:
+        names = auth.names.names
+        if command == 'install':
+            print(f"✓ {len(auth.capabilities)} capabilities, {len(auth.bits)} characters evaluated")
+        elif command == 'can' and len(sys.argv) == 5:
+            allowed = auth.can(sys.argv[3], sys.argv[4])
+            print(f"  {'✓ allowed' if allowed else '✗ denied'}: {sys.argv[3]} → {sys.argv[4]}")
+        elif command == 'who' and len(sys.argv) == 4:
+            for character_id in auth.who_may(sys.argv[3]):
+                print(f"  • {names.get(character_id, character_id)}")
+        elif command == 'faction' and len(sys.argv) == 4:
+            for character_id, granted in auth.evaluate_faction(sys.argv[3]).items():
+                print(f"  • {names.get(character_id, character_id)}: {', '.join(granted) or '—'}")
+        else:
+            print(f"❌ Wrong arguments for '{command}'")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
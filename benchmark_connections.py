@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Connection Profile Benchmark
+============================
+Compares query latency of the database_utils connection profiles:
+
+    default    plain sqlite3.connect (rollback journal, 2 MB page cache)
+    read       mode=ro, query_only, large mmap_size and page cache
+    snapshot   immutable=1 on top of the read pragmas (frozen files only)
+
+Four workloads run against the characters table:
+
+    open     connect, one lookup by rowid, close (the database_utils pattern)
+    point    random lookups by rowid across the whole table
+    hot      random lookups confined to a 64 MB working set, the shape of
+             an explore/query session revisiting the same rows
+    scan     full-table LIKE count
+
+The repo's own databases fit in memory, so the difference shows on large
+files. `build` writes a synthetic database of roughly the requested size.
+
+Usage:
+    python benchmark_connections.py <database_path> [repeat]
+    python benchmark_connections.py build <database_path> <gigabytes>
+"""
+
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from database_utils import CONNECTION_PROFILES, connect
+
+
+PROFILES = ['default', 'read', 'snapshot']
+POINT_LOOKUPS = 1000
+HOT_SET_BYTES = 64 << 20
+ROW_BYTES = 2048                    # two synthetic characters per 4 KB page
+
+
+def build_database(db_path: str, gigabytes: float):
+    """
+    Write a synthetic characters table of roughly `gigabytes` GB.
+
+    Args:
+        db_path: Path of the database to create (must not exist)
+        gigabytes: Target file size
+    """
+    rows = max(1000, int(gigabytes * (1 << 30) / ROW_BYTES))
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("""
+            CREATE TABLE characters (
+                character_id INTEGER PRIMARY KEY,
+                character_name TEXT,
+                faction TEXT,
+                biography TEXT
+            )
+        """)
+        conn.execute("""
+            INSERT INTO characters (character_name, faction, biography)
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+            SELECT 'Character ' || i, 'Faction ' || (i % 37), hex(randomblob(?)) FROM n
+        """, (rows, ROW_BYTES // 2 - 100))
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"✓ Built {db_path}: {rows:,} characters, "
+          f"{Path(db_path).stat().st_size / (1 << 30):.2f} GB")
+
+
+def time_workload(db_path: str, profile: str, workload: str, max_rowid: int) -> float:
+    """
+    Run one workload once.
+
+    Returns:
+        Elapsed seconds
+    """
+    start = time.perf_counter()
+    if workload == 'open':
+        conn = connect(db_path, profile)
+        conn.execute("SELECT character_name FROM characters WHERE rowid = ?",
+                     (random.randint(1, max_rowid),)).fetchone()
+        conn.close()
+        return time.perf_counter() - start
+
+    conn = connect(db_path, profile)
+    try:
+        start = time.perf_counter()
+        if workload in ('point', 'hot'):
+            high = max_rowid if workload == 'point' else min(max_rowid, HOT_SET_BYTES // ROW_BYTES)
+            for _ in range(POINT_LOOKUPS):
+                conn.execute("SELECT * FROM characters WHERE rowid = ?",
+                             (random.randint(1, high),)).fetchone()
+        else:
+            conn.execute("SELECT COUNT(*) FROM characters WHERE character_name LIKE '%7%'").fetchone()
+        return time.perf_counter() - start
+    finally:
+        conn.close()
+
+
+def run_benchmark(db_path: str, repeat: int = 5):
+    """
+    Time every workload under every profile and print median/p95 latency.
+
+    Profiles are interleaved per round so OS page-cache warmth is shared
+    fairly; one warm-up round is discarded.
+
+    Args:
+        db_path: Path to database
+        repeat: Timed rounds per workload
+    """
+    conn = connect(db_path, 'read')
+    try:
+        max_rowid = conn.execute("SELECT MAX(rowid) FROM characters").fetchone()[0] or 1
+    finally:
+        conn.close()
+
+    size_mb = Path(db_path).stat().st_size / (1 << 20)
+    print(f"Database: {db_path} ({size_mb:,.1f} MB, {max_rowid:,} characters)")
+    for profile in PROFILES[1:]:
+        pragmas = ', '.join(f"{k}={v}" for k, v in CONNECTION_PROFILES[profile]['pragmas'].items())
+        print(f"  {profile}: {CONNECTION_PROFILES[profile]['uri']}; {pragmas}")
+
+    for workload in ('open', 'point', 'hot', 'scan'):
+        samples = {profile: [] for profile in PROFILES}
+        for round_number in range(repeat + 1):
+            order = PROFILES[round_number % len(PROFILES):] + PROFILES[:round_number % len(PROFILES)]
+            for profile in order:
+                elapsed = time_workload(db_path, profile, workload, max_rowid)
+                if round_number:
+                    samples[profile].append(elapsed)
+
+        print(f"\n{workload}" + (f" ({POINT_LOOKUPS} lookups)" if workload in ('point', 'hot') else ''))
+        baseline = statistics.median(samples['default'])
+        for profile in PROFILES:
+            ordered = sorted(samples[profile])
+            median = statistics.median(ordered)
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            print(f"  {profile:<9} median {median * 1000:9.2f} ms   p95 {p95 * 1000:9.2f} ms"
+                  f"   {baseline / median:5.2f}x")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python benchmark_connections.py <database_path> [repeat]")
+        print("       python benchmark_connections.py build <database_path> <gigabytes>")
+        sys.exit(1)
+
+    if sys.argv[1] == 'build':
+        if len(sys.argv) != 4:
+            print("Usage: python benchmark_connections.py build <database_path> <gigabytes>")
+            sys.exit(1)
+        if Path(sys.argv[2]).exists():
+            print(f"❌ Error: '{sys.argv[2]}' already exists")
+            sys.exit(1)
+        build_database(sys.argv[2], float(sys.argv[3]))
+        return
+
+    db_path = sys.argv[1]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    run_benchmark(db_path, int(sys.argv[2]) if len(sys.argv) > 2 else 5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Materialized Character Cards
+=============================
+Keeps a denormalized, display-ready character_cards table (one row per
+character) so profile views become a single primary-key read instead of
+re-joining characters, affiliations, corporations, divisions and locations
+and re-parsing character_secrets every time.
+
+Each card holds:
+    name, codename, role, status, faction, corporation, division,
+    position, K-level, RRL tier, sigil kanji, current location
+
+Triggers on the source tables refresh only the cards of the characters a
+change affects (renaming a corporation refreshes its members, moving an
+affiliation refreshes that character, and so on).
+
+Usage:
+    python character_cards.py <database_path> install      # table + triggers + full build
+    python character_cards.py <database_path> rebuild      # recompute every card
+    python character_cards.py <database_path> show [name]  # print cards
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from database_utils import table_exists, table_columns
+
+
+CARD_COLUMNS = [
+    'character_rowid',
+    'character_id',
+    'character_name',
+    'codename',
+    'primary_role',
+    'status',
+    'faction',
+    'corp_name',
+    'division_name',
+    'position_title',
+    'klevel',
+    'rrl_tier',
+    'sigil_kanji',
+    'current_location',
+]
+
+
+def create_cards_table(cursor):
+    """Create the character_cards table"""
+    # Cards are keyed by the characters rowid: Phase 5 character_id is an
+    # untyped TEXT key that the importers leave NULL. Cards built before
+    # that key existed are derived data, so they are simply rebuilt.
+    if table_exists(cursor, 'character_cards') and \
+            'character_rowid' not in table_columns(cursor, 'character_cards'):
+        cursor.execute("DROP TABLE character_cards")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS character_cards (
+            character_rowid INTEGER PRIMARY KEY,
+            character_id,
+            character_name TEXT NOT NULL,
+            codename TEXT,
+            primary_role TEXT,
+            status TEXT,
+            faction TEXT,
+            corp_name TEXT,
+            division_name TEXT,
+            position_title TEXT,
+            klevel TEXT,
+            rrl_tier TEXT,
+            sigil_kanji TEXT,
+            current_location TEXT,
+            refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_character_cards_id ON character_cards(character_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_character_cards_name ON character_cards(character_name)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_character_cards_faction ON character_cards(faction)"
+    )
+
+
+def _secret(path: str) -> str:
+    """SQL expression reading a value from the character_secrets JSON blob"""
+    return (
+        f"CASE WHEN json_valid(c.character_secrets) "
+        f"THEN json_extract(c.character_secrets, '{path}') END"
+    )
+
+
+def _refresh_sql(cursor, where: str) -> str:
+    """
+    Build the INSERT OR REPLACE statement that materializes cards for the
+    characters matched by a WHERE clause on alias c.
+
+    Column availability differs between schema generations (Phase 5 keeps
+    klevel/rrl_level/sigil_kanji as columns, the Phase 2 schema only has
+    them inside character_secrets), so expressions are chosen here.
+    """
+    char_cols = table_columns(cursor, 'characters')
+    aff_cols = table_columns(cursor, 'character_corporate_affiliations')
+    has_divisions = table_exists(cursor, 'divisions') and 'division_id' in aff_cols
+    has_locations = table_exists(cursor, 'locations') and 'current_location_id' in char_cols
+
+    klevel = (
+        f"COALESCE(NULLIF(c.klevel, ''), {_secret('$.klevel')})"
+        if 'klevel' in char_cols else _secret('$.klevel')
+    )
+    rrl_tier = (
+        f"COALESCE(NULLIF(c.rrl_level, ''), {_secret('$.rrl_code')})"
+        if 'rrl_level' in char_cols else _secret('$.rrl_code')
+    )
+    sigil_kanji = (
+        f"COALESCE(NULLIF(c.sigil_kanji, ''), {_secret('$.sigil.kanji')})"
+        if 'sigil_kanji' in char_cols else _secret('$.sigil.kanji')
+    )
+    primary_role = 'c.primary_role' if 'primary_role' in char_cols else 'NULL'
+
+    joins = """
+        LEFT JOIN character_corporate_affiliations a ON a.affiliation_id = (
+            SELECT affiliation_id FROM character_corporate_affiliations
+            WHERE character_id = c.character_id
+            ORDER BY is_current DESC, affiliation_id
+            LIMIT 1
+        )
+        LEFT JOIN corporations corp ON a.corp_id = corp.corp_id"""
+    if has_divisions:
+        joins += "\n        LEFT JOIN divisions d ON a.division_id = d.division_id"
+    if has_locations:
+        joins += "\n        LEFT JOIN locations l ON c.current_location_id = l.location_id"
+
+    return f"""
+        INSERT OR REPLACE INTO character_cards ({', '.join(CARD_COLUMNS)})
+        SELECT
+            c.rowid,
+            c.character_id,
+            c.character_name,
+            c.codename,
+            {primary_role},
+            c.status,
+            c.faction,
+            corp.corp_name,
+            {'d.division_name' if has_divisions else 'NULL'},
+            a.position_title,
+            {klevel},
+            {rrl_tier},
+            {sigil_kanji},
+            {'l.location_name' if has_locations else 'NULL'}
+        FROM characters c{joins}
+        WHERE {where};"""
+
+
+def drop_card_triggers(cursor):
+    """Drop every trigger created by this module"""
+    cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_cards_%'"
+    )
+    for (name,) in cursor.fetchall():
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def create_card_triggers(cursor) -> int:
+    """
+    Create triggers that refresh the cards affected by each write.
+
+    Returns:
+        Number of triggers created
+    """
+    drop_card_triggers(cursor)
+    triggers = []
+
+    # characters: the row itself
+    triggers.append(("trg_cards_characters_ins", "AFTER INSERT ON characters",
+                     _refresh_sql(cursor, "c.rowid = NEW.rowid")))
+    triggers.append(("trg_cards_characters_upd", "AFTER UPDATE ON characters",
+                     "DELETE FROM character_cards WHERE character_rowid = OLD.rowid;"
+                     + _refresh_sql(cursor, "c.rowid = NEW.rowid")))
+    triggers.append(("trg_cards_characters_del", "AFTER DELETE ON characters",
+                     "DELETE FROM character_cards WHERE character_rowid = OLD.rowid;"))
+
+    # affiliations: old and new owner
+    if table_exists(cursor, 'character_corporate_affiliations'):
+        triggers.append(("trg_cards_affiliations_ins",
+                         "AFTER INSERT ON character_corporate_affiliations",
+                         _refresh_sql(cursor, "c.character_id = NEW.character_id")))
+        triggers.append(("trg_cards_affiliations_upd",
+                         "AFTER UPDATE ON character_corporate_affiliations",
+                         _refresh_sql(cursor, "c.character_id IN (OLD.character_id, NEW.character_id)")))
+        triggers.append(("trg_cards_affiliations_del",
+                         "AFTER DELETE ON character_corporate_affiliations",
+                         _refresh_sql(cursor, "c.character_id = OLD.character_id")))
+
+    # renames of referenced entities: every member
+    if table_exists(cursor, 'corporations'):
+        triggers.append(("trg_cards_corporations_upd",
+                         "AFTER UPDATE OF corp_name ON corporations",
+                         _refresh_sql(cursor, """c.character_id IN (
+            SELECT character_id FROM character_corporate_affiliations WHERE corp_id = NEW.corp_id)""")))
+
+    aff_cols = table_columns(cursor, 'character_corporate_affiliations')
+    if table_exists(cursor, 'divisions') and 'division_id' in aff_cols:
+        triggers.append(("trg_cards_divisions_upd",
+                         "AFTER UPDATE OF division_name ON divisions",
+                         _refresh_sql(cursor, """c.character_id IN (
+            SELECT character_id FROM character_corporate_affiliations WHERE division_id = NEW.division_id)""")))
+
+    if table_exists(cursor, 'locations') and 'current_location_id' in table_columns(cursor, 'characters'):
+        triggers.append(("trg_cards_locations_upd",
+                         "AFTER UPDATE OF location_name ON locations",
+                         _refresh_sql(cursor, "c.current_location_id = NEW.location_id")))
+
+    for name, timing, body in triggers:
+        cursor.execute(f"""
+            CREATE TRIGGER {name}
+            {timing}
+            BEGIN
+            {body}
+            END
+        """)
+
+    return len(triggers)
+
+
+def rebuild_cards_with_cursor(cursor):
+    """Recompute every card from the source tables"""
+    cursor.execute("DELETE FROM character_cards")
+    cursor.execute(_refresh_sql(cursor, "1"))
+
+
+def install_character_cards(db_path: str) -> int:
+    """
+    Create character_cards, its triggers, and build every card.
+
+    Args:
+        db_path: Path to database
+
+    Returns:
+        Number of triggers created
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        create_cards_table(cursor)
+        created = create_card_triggers(cursor)
+        rebuild_cards_with_cursor(cursor)
+        conn.commit()
+    finally:
+        conn.close()
+    return created
+
+
+def rebuild_character_cards(db_path: str):
+    """
+    Recompute every card from scratch.
+
+    Args:
+        db_path: Path to database
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        create_cards_table(cursor)
+        rebuild_cards_with_cursor(cursor)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def cards_installed(cursor) -> bool:
+    """Check whether character_cards exists in the connected database"""
+    return table_exists(cursor, 'character_cards')
+
+
+def get_character_card(db_path: str, character_rowid: int) -> Optional[Dict[str, Any]]:
+    """
+    Get a character card by primary key.
+
+    Args:
+        db_path: Path to database
+        character_rowid: rowid of the character in the characters table
+
+    Returns:
+        Dictionary of card fields or None if not found
+    """
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        row = conn.execute(
+            "SELECT * FROM character_cards WHERE character_rowid = ?", (character_rowid,)
+        ).fetchone()
+        return dict(row) if row else None
+    finally:
+        conn.close()
+
+
+def find_character_card(db_path: str, character_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Get a character card by exact name (indexed).
+
+    Args:
+        db_path: Path to database
+        character_name: Name of the character
+
+    Returns:
+        Dictionary of card fields or None if not found
+    """
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        row = conn.execute(
+            "SELECT * FROM character_cards WHERE character_name = ?", (character_name,)
+        ).fetchone()
+        return dict(row) if row else None
+    finally:
+        conn.close()
+
+
+def list_character_cards(db_path: str, faction: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    List cards, optionally for one faction.
+
+    Args:
+        db_path: Path to database
+        faction: Faction to filter by
+
+    Returns:
+        List of cards ordered by name
+    """
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        if faction is None:
+            rows = conn.execute("SELECT * FROM character_cards ORDER BY character_name")
+        else:
+            rows = conn.execute(
+                "SELECT * FROM character_cards WHERE faction = ? ORDER BY character_name",
+                (faction,)
+            )
+        return [dict(row) for row in rows.fetchall()]
+    finally:
+        conn.close()
+
+
+def print_card(card: Dict[str, Any]):
+    """Print a single card"""
+    print(f"\n🔷 {card['character_name']} ({card['codename'] or 'N/A'})")
+    print(f"   Faction:  {card['faction'] or 'N/A'}")
+    if card['corp_name']:
+        division = f" / {card['division_name']}" if card['division_name'] else ""
+        print(f"   Corp:     {card['corp_name']}{division}")
+    if card['position_title']:
+        print(f"   Position: {card['position_title']}")
+    print(f"   K-Level:  {card['klevel'] or 'N/A'} | RRL: {card['rrl_tier'] or 'N/A'}")
+    if card['sigil_kanji']:
+        print(f"   Sigil:    {card['sigil_kanji']}")
+    if card['current_location']:
+        print(f"   Location: {card['current_location']}")
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[2] not in ('install', 'rebuild', 'show'):
+        print("Usage: python character_cards.py <database_path> install|rebuild|show [name]")
+        sys.exit(1)
+
+    db_path, command = sys.argv[1], sys.argv[2]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    if command == 'install':
+        created = install_character_cards(db_path)
+        print(f"✓ Installed character_cards with {created} triggers")
+    elif command == 'rebuild':
+        rebuild_character_cards(db_path)
+        print("✓ Rebuilt character_cards")
+    elif len(sys.argv) > 3:
+        card = find_character_card(db_path, sys.argv[3])
+        if not card:
+            print(f"Character '{sys.argv[3]}' not found.")
+            sys.exit(1)
+        print_card(card)
+        return
+
+    for card in list_character_cards(db_path):
+        print_card(card)
+
+
+if __name__ == "__main__":
+    main()
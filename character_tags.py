@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Character Aliases & Tags
+========================
+characters.aliases and the tag column (story_tags in the full schema, tags
+in the Phase 5 one) are comma-joined strings, so "who is tagged
+sigil_bearer" was a LIKE scan that also matched 'sigil_bearer_candidate'.
+This module normalizes them:
+
+    character_aliases   (character_id, alias_key) → alias as written
+    character_tags      (tag, character_id) posting lists, WITHOUT ROWID so
+                        each tag's characters are contiguous on disk
+    character_tag_changes  append-only log of characters whose tags changed
+
+Triggers on characters keep both tables in step with every insert, update
+and delete (comma lists and JSON arrays are both accepted), and append to
+the change log.
+
+TagIndex loads the postings into per-tag bitmaps (one bit per character) so
+tagged(all=[...], any=[...], none=[...]) is a handful of big-integer
+AND/OR/NOT operations regardless of how many tags are combined. sync()
+applies only the characters logged since the last sync.
+
+Usage:
+    python character_tags.py <database_path> install
+    python character_tags.py <database_path> tagged [+all] [any] [-none] ...
+    python character_tags.py <database_path> alias <alias>
+"""
+
+import sqlite3
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from database_utils import table_columns
+
+
+TAG_COLUMNS = ['story_tags', 'tags']
+
+
+def _split_sql(value: str) -> str:
+    """
+    json_each() over a comma list or JSON array, yielding one `value` per item.
+
+    Comma lists are rewritten into a JSON array (quotes and backslashes
+    escaped); anything that still is not valid JSON yields no rows rather
+    than failing the write.
+
+    Args:
+        value: SQL expression holding the list (e.g. NEW.tags)
+    """
+    as_array = (f"""'["' || replace(replace(replace(COALESCE({value}, ''), '\\', '\\\\'), """
+                f"""'"', '\\"'), ',', '","') || '"]'""")
+    return f"""json_each(CASE
+            WHEN json_valid({value}) AND json_type({value}) = 'array' THEN {value}
+            WHEN json_valid({as_array}) THEN {as_array}
+            ELSE '[]' END)"""
+
+
+def _sync_body(cursor, row: str) -> str:
+    """Trigger statements that (re)write one character's aliases and tags"""
+    keyed = f"trim(value) <> '' AND {row}.character_id IS NOT NULL"
+    columns = table_columns(cursor, 'characters')
+    body = ""
+    if 'aliases' in columns:
+        body += f"""
+            INSERT OR IGNORE INTO character_aliases (character_id, alias_key, alias)
+            SELECT {row}.character_id, lower(trim(value)), trim(value)
+            FROM {_split_sql(f'{row}.aliases')} WHERE {keyed};"""
+    for column in TAG_COLUMNS:
+        if column in columns:
+            body += f"""
+            INSERT OR IGNORE INTO character_tags (tag, character_id)
+            SELECT lower(trim(value)), {row}.character_id
+            FROM {_split_sql(f'{row}.{column}')} WHERE {keyed};"""
+    return body
+
+
+def create_tag_tables(cursor):
+    """Create alias, tag and change-log tables"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS character_aliases (
+            character_id NOT NULL,
+            alias_key TEXT NOT NULL,
+            alias TEXT NOT NULL,
+            PRIMARY KEY (character_id, alias_key)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_character_aliases_key ON character_aliases(alias_key)")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS character_tags (
+            tag TEXT NOT NULL,
+            character_id NOT NULL,
+            PRIMARY KEY (tag, character_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_character_tags_character ON character_tags(character_id)")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS character_tag_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            character_id NOT NULL
+        )
+    """)
+
+
+def create_tag_triggers(cursor) -> int:
+    """
+    Create triggers keeping character_aliases / character_tags in sync.
+
+    Characters without a character_id (Phase 5 importers insert those) are
+    not indexed until they get one. With neither an aliases nor a tag
+    column there is nothing to re-derive on update, so that trigger is
+    skipped.
+
+    Returns:
+        Number of triggers created
+    """
+    columns = table_columns(cursor, 'characters')
+    watched = [c for c in ['aliases'] + TAG_COLUMNS if c in columns]
+    clear = """
+            DELETE FROM character_aliases WHERE character_id = OLD.character_id;
+            DELETE FROM character_tags WHERE character_id = OLD.character_id;"""
+
+    def log(row: str) -> str:
+        return f"""
+            INSERT INTO character_tag_changes (character_id)
+            SELECT {row}.character_id WHERE {row}.character_id IS NOT NULL;"""
+
+    triggers = [
+        ("trg_tags_characters_ins", "AFTER INSERT ON characters",
+         _sync_body(cursor, 'NEW') + log('NEW')),
+        ("trg_tags_characters_upd",
+         f"AFTER UPDATE OF character_id, {', '.join(watched)} ON characters",
+         clear + _sync_body(cursor, 'NEW') + log('OLD') + log('NEW')),
+        ("trg_tags_characters_del", "AFTER DELETE ON characters", clear + log('OLD')),
+    ]
+    if not watched:
+        cursor.execute("DROP TRIGGER IF EXISTS trg_tags_characters_upd")
+        triggers = [t for t in triggers if t[0] != "trg_tags_characters_upd"]
+    for name, timing, body in triggers:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"""
+            CREATE TRIGGER {name}
+            {timing}
+            BEGIN{body}
+            END
+        """)
+    return len(triggers)
+
+
+def rebuild_tags_with_cursor(cursor):
+    """Re-derive every alias and tag row from the characters table"""
+    cursor.execute("DELETE FROM character_aliases")
+    cursor.execute("DELETE FROM character_tags")
+    columns = table_columns(cursor, 'characters')
+    if 'aliases' in columns:
+        cursor.execute(f"""
+            INSERT OR IGNORE INTO character_aliases (character_id, alias_key, alias)
+            SELECT c.character_id, lower(trim(value)), trim(value)
+            FROM characters c, {_split_sql('c.aliases')}
+            WHERE trim(value) <> '' AND c.character_id IS NOT NULL
+        """)
+    for column in TAG_COLUMNS:
+        if column in columns:
+            cursor.execute(f"""
+                INSERT OR IGNORE INTO character_tags (tag, character_id)
+                SELECT lower(trim(value)), c.character_id
+                FROM characters c, {_split_sql(f'c.{column}')}
+                WHERE trim(value) <> '' AND c.character_id IS NOT NULL
+            """)
+    cursor.execute("DELETE FROM character_tag_changes")
+
+
+def install_character_tags(db_path: str) -> int:
+    """
+    Create the alias/tag tables and triggers, then populate them.
+
+    Args:
+        db_path: Path to database
+
+    Returns:
+        Number of triggers created
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        create_tag_tables(cursor)
+        created = create_tag_triggers(cursor)
+        rebuild_tags_with_cursor(cursor)
+        conn.commit()
+        return created
+    finally:
+        conn.close()
+
+
+def find_by_alias(db_path: str, alias: str) -> List[object]:
+    """
+    Characters carrying an alias (case-insensitive, indexed).
+
+    Args:
+        db_path: Path to database
+        alias: Alias text
+
+    Returns:
+        List of character_ids
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.execute("SELECT character_id FROM character_aliases WHERE alias_key = ?",
+                              (alias.strip().lower(),))
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+class TagIndex:
+    """Per-tag bitmaps over character slots, synced from the change log"""
+
+    def __init__(self, db_path: str = "universe.db"):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.slots: Dict[object, int] = {}           # character_id → bit position
+        self.ids: List[object] = []                  # bit position → character_id
+        self.postings: Dict[str, int] = {}           # tag → bitmap
+        self.tags_of: Dict[object, List[str]] = {}
+        self.universe = 0
+        self.last_seq = 0
+        self.rebuild()
+
+    def close(self):
+        """Close database connection"""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # ──────────────────────────────────────────────────────────
+    # Maintenance
+    # ──────────────────────────────────────────────────────────
+
+    def _slot(self, character_id) -> int:
+        slot = self.slots.get(character_id)
+        if slot is None:
+            slot = self.slots[character_id] = len(self.ids)
+            self.ids.append(character_id)
+        return slot
+
+    def _set(self, character_id, tags: Iterable[str]):
+        bit = 1 << self._slot(character_id)
+        for tag in self.tags_of.pop(character_id, []):
+            self.postings[tag] &= ~bit
+            if not self.postings[tag]:
+                del self.postings[tag]
+        tags = list(tags)
+        for tag in tags:
+            self.postings[tag] = self.postings.get(tag, 0) | bit
+        self.tags_of[character_id] = tags
+        self.universe |= bit
+
+    def _drop(self, character_id):
+        slot = self.slots.get(character_id)
+        if slot is None:
+            return
+        self._set(character_id, [])
+        del self.tags_of[character_id]
+        self.universe &= ~(1 << slot)
+
+    def rebuild(self):
+        """Load every character and posting list"""
+        cursor = self.conn.cursor()
+        self.slots, self.ids, self.postings, self.tags_of, self.universe = {}, [], {}, {}, 0
+        cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM character_tag_changes")
+        self.last_seq = cursor.fetchone()[0]
+        cursor.execute("SELECT character_id FROM characters WHERE character_id IS NOT NULL ORDER BY rowid")
+        for (character_id,) in cursor.fetchall():
+            self._set(character_id, [])
+
+        bitmaps: Dict[str, List[int]] = {}
+        cursor.execute("SELECT tag, character_id FROM character_tags")
+        for tag, character_id in cursor.fetchall():
+            bitmaps.setdefault(tag, []).append(self._slot(character_id))
+            self.tags_of.setdefault(character_id, []).append(tag)
+        for tag, slots in bitmaps.items():
+            bitmap = 0
+            for slot in slots:
+                bitmap |= 1 << slot
+            self.postings[tag] = bitmap
+
+    def sync(self) -> int:
+        """
+        Apply characters logged in character_tag_changes since the last sync.
+
+        Returns:
+            Number of characters re-read
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT seq, character_id FROM character_tag_changes WHERE seq > ? ORDER BY seq",
+                       (self.last_seq,))
+        changes = cursor.fetchall()
+        if not changes:
+            return 0
+        self.last_seq = changes[-1][0]
+        changed = list(dict.fromkeys(character_id for _, character_id in changes))
+
+        for character_id in changed:
+            cursor.execute("SELECT 1 FROM characters WHERE character_id = ?", (character_id,))
+            if cursor.fetchone() is None:
+                self._drop(character_id)
+                continue
+            cursor.execute("SELECT tag FROM character_tags WHERE character_id = ?", (character_id,))
+            self._set(character_id, [row[0] for row in cursor.fetchall()])
+        return len(changed)
+
+    def prune_changes(self):
+        """Delete change-log entries this index has already applied"""
+        self.conn.execute("DELETE FROM character_tag_changes WHERE seq <= ?", (self.last_seq,))
+        self.conn.commit()
+
+    # ──────────────────────────────────────────────────────────
+    # Queries
+    # ──────────────────────────────────────────────────────────
+
+    def mask(self, all: Optional[List[str]] = None, any: Optional[List[str]] = None,
+             none: Optional[List[str]] = None) -> int:
+        """Bitmap of characters matching the tag expression"""
+        result = self.universe
+        for tag in all or []:
+            result &= self.postings.get(tag.strip().lower(), 0)
+        if any:
+            union = 0
+            for tag in any:
+                union |= self.postings.get(tag.strip().lower(), 0)
+            result &= union
+        for tag in none or []:
+            result &= ~self.postings.get(tag.strip().lower(), 0)
+        return result
+
+    def tagged(self, all: Optional[List[str]] = None, any: Optional[List[str]] = None,
+               none: Optional[List[str]] = None, limit: Optional[int] = None) -> List[object]:
+        """
+        Characters having every `all` tag, at least one `any` tag and no `none` tag.
+
+        Args:
+            all: Tags that must all be present
+            any: Tags of which one must be present (ignored when empty)
+            none: Tags that must be absent
+            limit: Stop after this many characters
+
+        Returns:
+            List of character_ids in insertion order
+        """
+        bitmap = self.mask(all, any, none)
+        result = []
+        size = (bitmap.bit_length() + 63) // 64 * 8
+        words = struct.iter_unpack('<Q', bitmap.to_bytes(size, 'little'))
+        for word_index, (word,) in enumerate(words):
+            while word:
+                low = word & -word
+                result.append(self.ids[word_index * 64 + low.bit_length() - 1])
+                if limit is not None and len(result) >= limit:
+                    return result
+                word ^= low
+        return result
+
+    def count(self, all: Optional[List[str]] = None, any: Optional[List[str]] = None,
+              none: Optional[List[str]] = None) -> int:
+        """Number of characters matching the tag expression"""
+        return bin(self.mask(all, any, none)).count('1')
+
+    def tag_counts(self) -> Dict[str, int]:
+        """Characters per tag"""
+        return {tag: bin(bitmap).count('1') for tag, bitmap in sorted(self.postings.items())}
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[2] not in ('install', 'tagged', 'alias'):
+        print("Usage: python character_tags.py <database_path> install")
+        print("       python character_tags.py <database_path> tagged [+all] [any] [-none] ...")
+        print("       python character_tags.py <database_path> alias <alias>")
+        sys.exit(1)
+
+    db_path, command = sys.argv[1], sys.argv[2]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    if command == 'install':
+        created = install_character_tags(db_path)
+        print(f"✓ Installed {created} triggers")
+        with TagIndex(db_path) as index:
+            for tag, count in index.tag_counts().items():
+                print(f"  {tag}: {count}")
+        return
+
+    if command == 'alias':
+        for character_id in find_by_alias(db_path, ' '.join(sys.argv[3:])):
+            print(f"  • {character_id}")
+        return
+
+    terms = sys.argv[3:]
+    with TagIndex(db_path) as index:
+        matches = index.tagged(all=[t[1:] for t in terms if t.startswith('+')],
+                               any=[t for t in terms if t[0] not in '+-'],
+                               none=[t[1:] for t in terms if t.startswith('-')])
+    for character_id in matches:
+        print(f"  • {character_id}")
+    print(f"✓ {len(matches)} characters")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Importer / Trigger Compatibility Check
+======================================
+The trigger-maintained modules (history, tags, ...) fire on every write the
+importers make, including Phase 5 rows inserted without a character_id. This
+script runs the importers twice on scratch copies of a committed database:
+once untouched (the baseline) and once with every module installed, and
+fails if the installed run errors or imports different row counts. Derived
+tables that are rebuilt by hand rather than by triggers (palettes) are
+rebuilt after the installed run and must not fail either.
+
+Usage:
+    python check_importer_triggers.py
+"""
+
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from authorization import Authorizer
+from character_tags import install_character_tags
+from palette_index import import_palettes
+from temporal_history import install_history
+
+
+ROOT = Path(__file__).resolve().parent
+
+# name -> installer(db_path)
+INSTALLERS = {
+    'temporal_history': install_history,
+    'character_tags': install_character_tags,
+    'authorization': lambda db_path: Authorizer(db_path).close(),
+    'palette_index': import_palettes,
+}
+
+# name -> refresh(db_path), run again once the importers are done
+REFRESHERS = {
+    'palette_index': import_palettes,
+}
+
+# (database, [(importer script, arguments after the database path)])
+SCENARIOS = [
+    ('universe_with_rivalries.db', [
+        ('import_cmm_klevels.py', ['cmm']),
+        ('import_full_roster.py', ['identifiers_delta04_full_canon.json']),
+    ]),
+]
+
+COUNTED_TABLES = ['characters', 'character_corporate_affiliations', 'corporations', 'divisions']
+
+
+def run_importers(db_path: str, steps) -> list:
+    """
+    Run importer scripts in order against a database.
+
+    Returns:
+        List of (script, error output) for every step that failed
+    """
+    failures = []
+    for script, args in steps:
+        cmd = [sys.executable, str(ROOT / script), db_path] + [str(ROOT / arg) for arg in args]
+        result = subprocess.run(cmd, capture_output=True, text=True, cwd=ROOT)
+        if result.returncode != 0:
+            failures.append((script, (result.stderr or result.stdout).strip().splitlines()[-1:]))
+    return failures
+
+
+def row_counts(db_path: str) -> dict:
+    """Row count of each COUNTED_TABLES table present"""
+    conn = sqlite3.connect(db_path)
+    try:
+        counts = {}
+        for table in COUNTED_TABLES:
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                            (table,)).fetchone():
+                counts[table] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        return counts
+    finally:
+        conn.close()
+
+
+def check_scenario(database: str, steps) -> bool:
+    """Run one scenario with and without the installed modules and compare"""
+    workdir = tempfile.mkdtemp(prefix='importer_check_')
+    try:
+        baseline = str(Path(workdir) / 'baseline.db')
+        installed = str(Path(workdir) / 'installed.db')
+        shutil.copy(ROOT / database, baseline)
+        shutil.copy(ROOT / database, installed)
+        for install in INSTALLERS.values():
+            install(installed)
+
+        print(f"\n{database}: {', '.join(script for script, _ in steps)}")
+        ok = True
+        baseline_failures = run_importers(baseline, steps)
+        for script, error in baseline_failures:
+            print(f"  ⚠ baseline {script} failed: {' '.join(error)}")
+
+        for script, error in run_importers(installed, steps):
+            if script not in dict(baseline_failures):
+                print(f"  ✗ {script} failed with {', '.join(INSTALLERS)} installed: {' '.join(error)}")
+                ok = False
+
+        for name, refresh in REFRESHERS.items():
+            try:
+                refresh(installed)
+            except sqlite3.Error as e:
+                print(f"  ✗ {name} refresh failed after the importers: {e}")
+                ok = False
+
+        expected, actual = row_counts(baseline), row_counts(installed)
+        for table, count in expected.items():
+            if actual.get(table) != count:
+                print(f"  ✗ {table}: {actual.get(table)} rows, baseline {count}")
+                ok = False
+
+        if ok:
+            print(f"  ✓ same result as baseline ({expected.get('characters', 0)} characters)")
+        return ok
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    ok = True
+    for database, steps in SCENARIOS:
+        ok = check_scenario(database, steps) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,12 @@
 Quick schema diagnostic
 """
 
-import sqlite3
 import sys
 
+from database_utils import connect, read_profile
+
 def check_schema(db_path):
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path, read_profile(db_path))
     cursor = conn.cursor()
     
     print("=" * 70)
@@ -9,33 +9,340 @@ Usage:
     from database_utils import DatabaseConnection, add_character, search_characters, etc.
 """
 
+import os
+import random
 import sqlite3
+import threading
+import time
 from datetime import datetime
+from pathlib import Path
 from typing import Optional, List, Dict, Any
 from contextlib import contextmanager
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONNECTION PROFILES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+BUSY_TIMEOUT_MS = 5000             # how long one statement waits for a lock
+RETRY_ATTEMPTS = 5                  # BEGIN IMMEDIATE attempts before giving up
+RETRY_BASE_DELAY = 0.05             # seconds; doubled per attempt, with jitter
+RETRY_MAX_DELAY = 2.0
+CHECKPOINT_INTERVAL = 30.0          # seconds between scheduled WAL checkpoints
+
+# SQLite clamps mmap_size to its compile-time SQLITE_MAX_MMAP_SIZE (2 GiB in
+# stock builds), so asking for more is harmless
+READ_PRAGMAS = {
+    'busy_timeout': BUSY_TIMEOUT_MS,
+    'query_only': 'ON',
+    'mmap_size': 1 << 34,
+    'cache_size': -262144,          # KiB, i.e. 256 MiB of page cache
+    'temp_store': 'MEMORY',
+}
+
+CONNECTION_PROFILES = {
+    # Read-write; what every script used before profiles existed
+    'default': {
+        'uri': None,
+        'pragmas': {'busy_timeout': BUSY_TIMEOUT_MS, 'foreign_keys': 'ON'},
+    },
+    # Writers sharing the file with readers and other writers. WAL is
+    # persistent, so once any connection opens this way readers stop
+    # blocking the writer (and vice versa). synchronous=NORMAL is durable
+    # against crashes of the process; a power cut may drop the last commits.
+    'concurrent': {
+        'uri': None,
+        'pragmas': {'busy_timeout': BUSY_TIMEOUT_MS, 'journal_mode': 'WAL', 'synchronous': 'NORMAL'},
+    },
+    # Read-only queries against a database other processes may still write
+    'read': {
+        'uri': 'mode=ro',
+        'pragmas': READ_PRAGMAS,
+    },
+    # Frozen snapshots (universe_FINAL.db): no locks, no change detection.
+    # Only safe when nothing writes the file while it is open.
+    'snapshot': {
+        'uri': 'immutable=1',
+        'pragmas': READ_PRAGMAS,
+    },
+}
+
+
+def connect(db_path: str, profile: str = 'default', row_factory=None, **options) -> sqlite3.Connection:
+    """
+    Open a connection using one of the CONNECTION_PROFILES.
+    
+    Read profiles open the file through a URI, so a missing database raises
+    sqlite3.OperationalError instead of silently creating an empty one.
+    
+    Args:
+        db_path: Path to database
+        profile: 'default', 'concurrent', 'read' or 'snapshot'
+        row_factory: Optional row factory (e.g. sqlite3.Row)
+        **options: Passed to sqlite3.connect (e.g. check_same_thread)
+    
+    Returns:
+        Open sqlite3 connection
+    """
+    spec = CONNECTION_PROFILES[profile]
+    if spec['uri']:
+        uri = f"{Path(db_path).resolve().as_uri()}?{spec['uri']}"
+        conn = sqlite3.connect(uri, uri=True, **options)
+    else:
+        conn = sqlite3.connect(db_path, **options)
+    if row_factory is not None:
+        conn.row_factory = row_factory
+    try:
+        for name, value in spec['pragmas'].items():
+            # journal_mode can meet a peer's close-time checkpoint, which
+            # fails fast instead of waiting in the busy handler
+            retry_on_busy(lambda: conn.execute(f"PRAGMA {name} = {value}"))
+    except sqlite3.Error:
+        conn.close()
+        raise
+    return conn
+
+
+def read_profile(db_path: str) -> str:
+    """
+    Pick the read-only profile for a database.
+    
+    A file nobody may write (chmod a-w universe_FINAL.db) with no pending
+    WAL is treated as a frozen snapshot; anything else gets 'read', which
+    still takes shared locks and sees other writers' commits.
+    
+    Args:
+        db_path: Path to database
+    
+    Returns:
+        'snapshot' or 'read'
+    """
+    path = Path(db_path)
+    if (path.exists() and not os.access(path, os.W_OK)
+            and not Path(f"{path}-wal").exists()):
+        return 'snapshot'
+    return 'read'
+
+
+def database_stamp(db_path: str) -> tuple:
+    """
+    Change stamp for caches keyed on a database file.
+    
+    In WAL mode commits append to the -wal file and leave the main file's
+    mtime alone until a checkpoint, so the stamp covers both files.
+    
+    Args:
+        db_path: Path to database
+    
+    Returns:
+        (mtime_ns, size) of the database and of its -wal file (None if absent)
+    """
+    def stat(path):
+        try:
+            info = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return info.st_mtime_ns, info.st_size
+    return stat(db_path), stat(f"{db_path}-wal")
+
+
+def is_busy(error: Exception) -> bool:
+    """Check whether an error means another connection holds the lock"""
+    message = str(error)
+    return isinstance(error, sqlite3.OperationalError) and (
+        'locked' in message or 'busy' in message)
+
+
+def retry_on_busy(action, attempts: int = RETRY_ATTEMPTS):
+    """
+    Call `action` until it stops failing with "database is locked".
+    
+    Each attempt already waits up to busy_timeout inside SQLite; between
+    attempts the delay doubles, with jitter so competing processes do not
+    retry in lockstep. Only use it for steps that are safe to repeat.
+    
+    Args:
+        action: Callable with no arguments
+        attempts: Attempts before the last error is raised
+    
+    Returns:
+        Whatever `action` returns
+    """
+    for attempt in range(attempts):
+        try:
+            return action()
+        except sqlite3.OperationalError as e:
+            if not is_busy(e) or attempt == attempts - 1:
+                raise
+            delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)
+            time.sleep(delay * random.uniform(0.5, 1.0))
+
+
+def begin_write(conn: sqlite3.Connection, attempts: int = RETRY_ATTEMPTS):
+    """
+    Start a write transaction, retrying with backoff while another writer holds the lock.
+    
+    BEGIN IMMEDIATE takes the write lock before anything is read, so the
+    statements that follow cannot fail with "database is locked" halfway
+    through (which a deferred transaction can, and which is not safe to
+    retry statement by statement).
+    
+    Args:
+        conn: Connection with no open transaction
+        attempts: Attempts before the last error is raised
+    """
+    retry_on_busy(lambda: conn.execute("BEGIN IMMEDIATE"), attempts)
+
+
+def checkpoint(db_path: str, mode: str = 'PASSIVE') -> tuple:
+    """
+    Checkpoint the WAL of a database.
+    
+    The journal mode is left as it is: a database not in WAL mode reports
+    (0, -1, -1).
+    
+    Args:
+        db_path: Path to database
+        mode: 'PASSIVE' (never waits), 'FULL', 'RESTART' or 'TRUNCATE'
+    
+    Returns:
+        (busy, wal_pages, checkpointed_pages) as reported by SQLite
+    
+    Raises:
+        FileNotFoundError: If the database does not exist
+    """
+    if not Path(db_path).exists():
+        raise FileNotFoundError(f"Database file '{db_path}' not found")
+    conn = connect(db_path)
+    try:
+        return tuple(conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone())
+    finally:
+        conn.close()
+
+
+class Checkpointer:
+    """
+    Background thread that checkpoints the WAL on a schedule.
+    
+    SQLite's automatic checkpoint runs inside whichever commit crosses
+    wal_autocheckpoint pages, so one unlucky writer pays for it, and it
+    cannot finish while readers are active. A long import or server
+    process runs a Checkpointer instead: PASSIVE checkpoints every
+    `interval` seconds, and a TRUNCATE on stop so the -wal file does not
+    stay at its high-water mark. A one-shot import gains nothing from it
+    (one long transaction leaves nothing to checkpoint until it commits);
+    call checkpoint(db_path, 'TRUNCATE') after each step instead.
+    
+    Usage:
+        with Checkpointer(db_path):
+            ...writes...
+    """
+    
+    def __init__(self, db_path: str, interval: float = CHECKPOINT_INTERVAL):
+        self.db_path = db_path
+        self.interval = interval
+        self.runs = 0
+        self.last = None                # (busy, wal_pages, checkpointed_pages)
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """
+        Start checkpointing in a daemon thread.
+        
+        Raises:
+            FileNotFoundError: If the database does not exist
+        """
+        if not Path(self.db_path).exists():
+            raise FileNotFoundError(f"Database file '{self.db_path}' not found")
+        self._stop.clear()
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name='wal-checkpointer', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """
+        Stop the thread after a final TRUNCATE checkpoint.
+        
+        Raises:
+            sqlite3.Error: The error that ended the thread, if any
+        """
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+    
+    def _run(self):
+        try:
+            conn = connect(self.db_path)
+            try:
+                while not self._stop.wait(self.interval):
+                    self.last = tuple(conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone())
+                    self.runs += 1
+                self.last = tuple(conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone())
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self.error = e
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.stop()
+            return
+        # Don't mask the caller's exception with the thread's
+        try:
+            self.stop()
+        except sqlite3.Error:
+            pass
+
+
 class DatabaseConnection:
-    """Context manager for database connections"""
+    """
+    Context manager for database connections.
+    
+    Opens read-write with the 'default' profile unless another profile is
+    given; the read helpers below pass read_profile(db_path) to open
+    read-only. write=True takes the write lock up front (begin_write). No
+    profile but 'concurrent' changes the journal mode: WAL is a persistent
+    property of the file, so it is left to writers that opt in (the
+    importers, writer_service), after which every connection uses it.
+    """
     
-    def __init__(self, db_path="universe.db"):
+    def __init__(self, db_path="universe.db", profile=None, write=False):
         self.db_path = db_path
+        self.profile = profile
+        self.write = write
         self.conn = None
         self.cursor = None
     
     def __enter__(self):
-        self.conn = sqlite3.connect(self.db_path)
-        self.conn.row_factory = sqlite3.Row
+        self.conn = connect(self.db_path, self.profile or 'default', row_factory=sqlite3.Row)
         self.cursor = self.conn.cursor()
         self.cursor.execute("PRAGMA foreign_keys = ON")
+        if self.write:
+            try:
+                begin_write(self.conn)
+            except sqlite3.Error:
+                self.conn.close()
+                raise
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if exc_type is None:
-            self.conn.commit()
-        else:
-            self.conn.rollback()
-        self.conn.close()
+        try:
+            if exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        finally:
+            self.conn.close()
     
     def execute(self, query, params=None):
         """Execute a query and return cursor"""
@@ -56,6 +363,51 @@ class DatabaseConnection:
 # CHARACTER FUNCTIONS
 # ═══════════════════════════════════════════════════════════════════════════════
 
+CHARACTER_QUERY = "SELECT * FROM characters WHERE character_name = ?"
+
+TIMELINE_QUERY = """
+SELECT 
+    e.*,
+    l.location_name
+FROM character_events e
+JOIN characters c ON e.character_id = c.character_id
+LEFT JOIN locations l ON e.location_id = l.location_id
+WHERE c.character_name = ?
+ORDER BY e.event_year, e.event_date
+"""
+
+# Card columns that are bookkeeping rather than display fields
+CARD_KEY_COLUMNS = ('character_rowid', 'character_id', 'refreshed_at')
+
+
+def character_query(cursor) -> str:
+    """
+    Build the get_character query for the connected database.
+    
+    When character_cards is installed (character_cards.py) the character's
+    card is joined on its primary key, adding the display fields the
+    characters row lacks (corporation, division, position, current
+    location, ...) without re-joining affiliations and locations.
+    
+    Args:
+        cursor: Open sqlite3 cursor
+    
+    Returns:
+        SQL taking the character name as its only parameter
+    """
+    if not table_exists(cursor, 'character_cards'):
+        return CHARACTER_QUERY
+    char_cols = table_columns(cursor, 'characters')
+    extra = [c for c in table_columns(cursor, 'character_cards')
+             if c not in char_cols and c not in CARD_KEY_COLUMNS]
+    return f"""
+        SELECT c.*{''.join(f', card.{column}' for column in extra)}
+        FROM characters c
+        LEFT JOIN character_cards card ON card.character_rowid = c.rowid
+        WHERE c.character_name = ?
+    """
+
+
 def add_character(
     db_path: str,
     character_name: str,
@@ -72,26 +424,41 @@ def add_character(
     Returns:
         character_id if successful, None otherwise
     """
-    with DatabaseConnection(db_path) as db:
-        # Build INSERT statement dynamically
-        fields = ['character_name'] + list(kwargs.keys())
-        placeholders = ','.join(['?' for _ in fields])
-        field_names = ','.join(fields)
-        
-        query = f"INSERT INTO characters ({field_names}) VALUES ({placeholders})"
-        values = [character_name] + list(kwargs.values())
-        
+    with DatabaseConnection(db_path, write=True) as db:
         try:
-            db.execute(query, values)
-            return db.cursor.lastrowid
+            return insert_character(db.cursor, character_name, **kwargs)
         except sqlite3.Error as e:
             print(f"Error adding character: {e}")
             return None
 
 
+def insert_character(cursor, character_name: str, **kwargs) -> int:
+    """
+    Insert a character using an open cursor (the caller owns the transaction).
+    
+    Args:
+        cursor: Open sqlite3 cursor
+        character_name: Name of the character (required)
+        **kwargs: Any other character fields
+    
+    Returns:
+        character_id of the new row (sqlite3.Error is raised on failure)
+    """
+    # Build INSERT statement dynamically
+    fields = ['character_name'] + list(kwargs.keys())
+    placeholders = ','.join(['?' for _ in fields])
+    field_names = ','.join(fields)
+    
+    query = f"INSERT INTO characters ({field_names}) VALUES ({placeholders})"
+    values = [character_name] + list(kwargs.values())
+    
+    cursor.execute(query, values)
+    return cursor.lastrowid
+
+
 def get_character(db_path: str, character_name: str) -> Optional[Dict[str, Any]]:
     """
-    Get a character by name.
+    Get a character by name, with its card fields when cards are installed.
     
     Args:
         db_path: Path to database
@@ -100,11 +467,8 @@ def get_character(db_path: str, character_name: str) -> Optional[Dict[str, Any]]
     Returns:
         Dictionary of character data or None if not found
     """
-    with DatabaseConnection(db_path) as db:
-        db.execute(
-            "SELECT * FROM characters WHERE character_name = ?",
-            (character_name,)
-        )
+    with DatabaseConnection(db_path, read_profile(db_path)) as db:
+        db.execute(character_query(db.cursor), (character_name,))
         row = db.fetchone()
         return dict(row) if row else None
 
@@ -124,19 +488,28 @@ def search_characters(
     Returns:
         List of matching characters
     """
-    with DatabaseConnection(db_path) as db:
-        if not filters:
-            query = "SELECT * FROM characters"
-            db.execute(query)
-        else:
-            conditions = [f"{field} = ?" for field in filters.keys()]
-            where_clause = " AND ".join(conditions)
-            query = f"SELECT * FROM characters WHERE {where_clause}"
-            db.execute(query, tuple(filters.values()))
-        
+    with DatabaseConnection(db_path, read_profile(db_path)) as db:
+        db.execute(*character_search_query(**filters))
         return [dict(row) for row in db.fetchall()]
 
 
+def character_search_query(**filters) -> tuple:
+    """
+    Build the search_characters query.
+    
+    Args:
+        **filters: Field names and values to filter by
+    
+    Returns:
+        (sql, params)
+    """
+    if not filters:
+        return "SELECT * FROM characters", ()
+    conditions = [f"{field} = ?" for field in filters.keys()]
+    where_clause = " AND ".join(conditions)
+    return f"SELECT * FROM characters WHERE {where_clause}", tuple(filters.values())
+
+
 def update_character(
     db_path: str,
     character_name: str,
@@ -153,22 +526,40 @@ def update_character(
     Returns:
         True if successful, False otherwise
     """
-    with DatabaseConnection(db_path) as db:
-        if not updates:
-            return False
-        
-        set_clause = ", ".join([f"{field} = ?" for field in updates.keys()])
-        query = f"UPDATE characters SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE character_name = ?"
-        values = list(updates.values()) + [character_name]
-        
+    if not updates:
+        return False
+    
+    with DatabaseConnection(db_path, write=True) as db:
         try:
-            db.execute(query, values)
-            return db.cursor.rowcount > 0
+            return modify_character(db.cursor, character_name, **updates)
         except sqlite3.Error as e:
             print(f"Error updating character: {e}")
             return False
 
 
+def modify_character(cursor, character_name: str, **updates) -> bool:
+    """
+    Update a character's fields using an open cursor.
+    
+    Args:
+        cursor: Open sqlite3 cursor
+        character_name: Name of the character to update
+        **updates: Fields to update
+    
+    Returns:
+        True if a row was updated (sqlite3.Error is raised on failure)
+    """
+    if not updates:
+        return False
+    
+    set_clause = ", ".join([f"{field} = ?" for field in updates.keys()])
+    query = f"UPDATE characters SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE character_name = ?"
+    values = list(updates.values()) + [character_name]
+    
+    cursor.execute(query, values)
+    return cursor.rowcount > 0
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # EVENT FUNCTIONS
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -197,34 +588,60 @@ def add_event(
     Returns:
         event_id if successful, None otherwise
     """
-    with DatabaseConnection(db_path) as db:
-        # Get character_id
-        db.execute("SELECT character_id FROM characters WHERE character_name = ?", (character_name,))
-        char_row = db.fetchone()
-        if not char_row:
-            print(f"Character '{character_name}' not found")
-            return None
-        character_id = char_row['character_id']
-        
-        # Get location_id if location provided
-        location_id = None
-        if location_name:
-            db.execute("SELECT location_id FROM locations WHERE location_name = ?", (location_name,))
-            loc_row = db.fetchone()
-            if loc_row:
-                location_id = loc_row['location_id']
-        
+    with DatabaseConnection(db_path, write=True) as db:
         try:
-            db.execute(
-                """INSERT INTO character_events 
-                   (character_id, event_year, event_date, event_type, description, location_id)
-                   VALUES (?, ?, ?, ?, ?, ?)""",
-                (character_id, event_year, event_date, event_type, description, location_id)
-            )
-            return db.cursor.lastrowid
+            event_id = insert_event(db.cursor, character_name, event_year, description,
+                                    event_type, event_date, location_name)
         except sqlite3.Error as e:
             print(f"Error adding event: {e}")
             return None
+        if event_id is None:
+            print(f"Character '{character_name}' not found")
+        return event_id
+
+
+def insert_event(
+    cursor,
+    character_name: str,
+    event_year: int,
+    description: str,
+    event_type: Optional[str] = None,
+    event_date: Optional[str] = None,
+    location_name: Optional[str] = None
+) -> Optional[int]:
+    """
+    Insert a timeline event using an open cursor.
+    
+    Args:
+        cursor: Open sqlite3 cursor
+        (the rest as for add_event)
+    
+    Returns:
+        event_id, or None if the character does not exist
+        (sqlite3.Error is raised on failure)
+    """
+    # Get character_id
+    cursor.execute("SELECT character_id FROM characters WHERE character_name = ?", (character_name,))
+    char_row = cursor.fetchone()
+    if not char_row:
+        return None
+    character_id = char_row[0]
+    
+    # Get location_id if location provided
+    location_id = None
+    if location_name:
+        cursor.execute("SELECT location_id FROM locations WHERE location_name = ?", (location_name,))
+        loc_row = cursor.fetchone()
+        if loc_row:
+            location_id = loc_row[0]
+    
+    cursor.execute(
+        """INSERT INTO character_events 
+           (character_id, event_year, event_date, event_type, description, location_id)
+           VALUES (?, ?, ?, ?, ?, ?)""",
+        (character_id, event_year, event_date, event_type, description, location_id)
+    )
+    return cursor.lastrowid
 
 
 def get_character_timeline(
@@ -241,18 +658,8 @@ def get_character_timeline(
     Returns:
         List of events
     """
-    with DatabaseConnection(db_path) as db:
-        query = """
-        SELECT 
-            e.*,
-            l.location_name
-        FROM character_events e
-        JOIN characters c ON e.character_id = c.character_id
-        LEFT JOIN locations l ON e.location_id = l.location_id
-        WHERE c.character_name = ?
-        ORDER BY e.event_year, e.event_date
-        """
-        db.execute(query, (character_name,))
+    with DatabaseConnection(db_path, read_profile(db_path)) as db:
+        db.execute(TIMELINE_QUERY, (character_name,))
         return [dict(row) for row in db.fetchall()]
 
 
@@ -276,22 +683,32 @@ def add_corporation(
     Returns:
         corp_id if successful, None otherwise
     """
-    with DatabaseConnection(db_path) as db:
-        fields = ['corp_name'] + list(kwargs.keys())
-        placeholders = ','.join(['?' for _ in fields])
-        field_names = ','.join(fields)
-        
-        query = f"INSERT INTO corporations ({field_names}) VALUES ({placeholders})"
-        values = [corp_name] + list(kwargs.values())
-        
+    with DatabaseConnection(db_path, write=True) as db:
         try:
-            db.execute(query, values)
-            return db.cursor.lastrowid
+            return insert_corporation(db.cursor, corp_name, **kwargs)
         except sqlite3.Error as e:
             print(f"Error adding corporation: {e}")
             return None
 
 
+def insert_corporation(cursor, corp_name: str, **kwargs) -> int:
+    """
+    Insert a corporation using an open cursor.
+    
+    Returns:
+        corp_id of the new row (sqlite3.Error is raised on failure)
+    """
+    fields = ['corp_name'] + list(kwargs.keys())
+    placeholders = ','.join(['?' for _ in fields])
+    field_names = ','.join(fields)
+    
+    query = f"INSERT INTO corporations ({field_names}) VALUES ({placeholders})"
+    values = [corp_name] + list(kwargs.values())
+    
+    cursor.execute(query, values)
+    return cursor.lastrowid
+
+
 def get_corporation_employees(
     db_path: str,
     corp_name: str,
@@ -308,7 +725,7 @@ def get_corporation_employees(
     Returns:
         List of employees with affiliation details
     """
-    with DatabaseConnection(db_path) as db:
+    with DatabaseConnection(db_path, read_profile(db_path)) as db:
         query = """
         SELECT 
             c.character_name,
@@ -349,22 +766,32 @@ def add_location(
     Returns:
         location_id if successful, None otherwise
     """
-    with DatabaseConnection(db_path) as db:
-        fields = ['location_name'] + list(kwargs.keys())
-        placeholders = ','.join(['?' for _ in fields])
-        field_names = ','.join(fields)
-        
-        query = f"INSERT INTO locations ({field_names}) VALUES ({placeholders})"
-        values = [location_name] + list(kwargs.values())
-        
+    with DatabaseConnection(db_path, write=True) as db:
         try:
-            db.execute(query, values)
-            return db.cursor.lastrowid
+            return insert_location(db.cursor, location_name, **kwargs)
         except sqlite3.Error as e:
             print(f"Error adding location: {e}")
             return None
 
 
+def insert_location(cursor, location_name: str, **kwargs) -> int:
+    """
+    Insert a location using an open cursor.
+    
+    Returns:
+        location_id of the new row (sqlite3.Error is raised on failure)
+    """
+    fields = ['location_name'] + list(kwargs.keys())
+    placeholders = ','.join(['?' for _ in fields])
+    field_names = ','.join(fields)
+    
+    query = f"INSERT INTO locations ({field_names}) VALUES ({placeholders})"
+    values = [location_name] + list(kwargs.values())
+    
+    cursor.execute(query, values)
+    return cursor.lastrowid
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # AFFILIATION FUNCTIONS
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -389,47 +816,127 @@ def add_affiliation(
     Returns:
         affiliation_id if successful, None otherwise
     """
-    with DatabaseConnection(db_path) as db:
-        # Get character_id
-        db.execute("SELECT character_id FROM characters WHERE character_name = ?", (character_name,))
-        char_row = db.fetchone()
-        if not char_row:
-            print(f"Character '{character_name}' not found")
-            return None
-        character_id = char_row['character_id']
-        
-        # Get corp_id
-        db.execute("SELECT corp_id FROM corporations WHERE corp_name = ?", (corp_name,))
-        corp_row = db.fetchone()
-        if not corp_row:
-            print(f"Corporation '{corp_name}' not found")
-            return None
-        corp_id = corp_row['corp_id']
-        
-        # Insert affiliation
-        fields = ['character_id', 'corp_id', 'affiliation_type'] + list(kwargs.keys())
-        placeholders = ','.join(['?' for _ in fields])
-        field_names = ','.join(fields)
-        
-        query = f"INSERT INTO character_corporate_affiliations ({field_names}) VALUES ({placeholders})"
-        values = [character_id, corp_id, affiliation_type] + list(kwargs.values())
-        
+    with DatabaseConnection(db_path, write=True) as db:
         try:
-            db.execute(query, values)
-            return db.cursor.lastrowid
+            return insert_affiliation(db.cursor, character_name, corp_name, affiliation_type,
+                                      on_missing=print, **kwargs)
         except sqlite3.Error as e:
             print(f"Error adding affiliation: {e}")
             return None
 
 
+def insert_affiliation(
+    cursor,
+    character_name: str,
+    corp_name: str,
+    affiliation_type: str = "Employee",
+    on_missing=None,
+    **kwargs
+) -> Optional[int]:
+    """
+    Insert a corporate affiliation using an open cursor.
+    
+    Args:
+        cursor: Open sqlite3 cursor
+        on_missing: Optional callable given a message naming what was not found
+        (the rest as for add_affiliation)
+    
+    Returns:
+        affiliation_id, or None if the character or corporation does not
+        exist (sqlite3.Error is raised on failure)
+    """
+    # Get character_id
+    cursor.execute("SELECT character_id FROM characters WHERE character_name = ?", (character_name,))
+    char_row = cursor.fetchone()
+    if not char_row:
+        if on_missing:
+            on_missing(f"Character '{character_name}' not found")
+        return None
+    character_id = char_row[0]
+    
+    # Get corp_id
+    cursor.execute("SELECT corp_id FROM corporations WHERE corp_name = ?", (corp_name,))
+    corp_row = cursor.fetchone()
+    if not corp_row:
+        if on_missing:
+            on_missing(f"Corporation '{corp_name}' not found")
+        return None
+    corp_id = corp_row[0]
+    
+    # Insert affiliation
+    fields = ['character_id', 'corp_id', 'affiliation_type'] + list(kwargs.keys())
+    placeholders = ','.join(['?' for _ in fields])
+    field_names = ','.join(fields)
+    
+    query = f"INSERT INTO character_corporate_affiliations ({field_names}) VALUES ({placeholders})"
+    values = [character_id, corp_id, affiliation_type] + list(kwargs.values())
+    
+    cursor.execute(query, values)
+    return cursor.lastrowid
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # UTILITY FUNCTIONS
 # ═══════════════════════════════════════════════════════════════════════════════
 
+def table_exists(cursor, table_name: str) -> bool:
+    """
+    Check whether a table (or view) exists in the connected database.
+    
+    Args:
+        cursor: Open sqlite3 cursor
+        table_name: Name of the table
+    
+    Returns:
+        True if the table exists
+    """
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?",
+        (table_name,)
+    )
+    return cursor.fetchone() is not None
+
+
+def table_columns(cursor, table_name: str) -> List[str]:
+    """
+    Get the column names of a table.
+    
+    The scripts in this repo run against several generations of the schema
+    (INTEGER ids in universe_database_schema.sql, TEXT ids in the Phase 5
+    databases), so features that add triggers check columns before use.
+    
+    Args:
+        cursor: Open sqlite3 cursor
+        table_name: Name of the table
+    
+    Returns:
+        List of column names (empty if the table does not exist)
+    """
+    cursor.execute(f"PRAGMA table_info({table_name})")
+    return [row[1] for row in cursor.fetchall()]
+
+
+def rtree_available(cursor) -> bool:
+    """
+    Check whether this SQLite build includes the R*Tree module.
+
+    Args:
+        cursor: Open sqlite3 cursor
+
+    Returns:
+        True if R*Tree virtual tables can be created
+    """
+    cursor.execute("PRAGMA compile_options")
+    return any(row[0] == 'ENABLE_RTREE' for row in cursor.fetchall())
+
+
 def get_database_stats(db_path: str) -> Dict[str, int]:
     """
     Get statistics about the database.
-    
+
+    Uses the trigger-maintained stats_counters table when installed
+    (python stats_counters.py <db> install), otherwise runs COUNT(*).
+
     Args:
         db_path: Path to database
     
@@ -445,7 +952,19 @@ def get_database_stats(db_path: str) -> Dict[str, int]:
     ]
     
     stats = {}
-    with DatabaseConnection(db_path) as db:
+    with DatabaseConnection(db_path, read_profile(db_path)) as db:
+        # Trigger-maintained counters (see stats_counters.py) avoid full scans
+        if table_exists(db.cursor, 'stats_counters'):
+            placeholders = ','.join(['?' for _ in tables])
+            db.execute(
+                f"SELECT key, count FROM stats_counters WHERE scope = 'table' AND key IN ({placeholders})",
+                tables
+            )
+            stats = {row['key']: row['count'] for row in db.fetchall()}
+            if len(stats) == len(tables):
+                return stats
+            stats = {}
+        
         for table in tables:
             db.execute(f"SELECT COUNT(*) as count FROM {table}")
             stats[table] = db.fetchone()['count']
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Epoch Interval Index
+=====================
+Temporal data across the lore tables is free text:
+
+    identities_epochs.csv      epoch_range       "2022-2025"
+    land_war_events            epoch, date       "1.5", "2023-03-XX"
+    land_war_theaters          period            "2023–2024"
+    land_war_map / _property   epoch_reference   "Epoch 2 — Land War Phase I"
+    lineage_frost              epoch_reference   "Pre-Epoch 0 (foundation of Vault Age)"
+    shion_bio                  epoch_reference   "Epoch 0–2"
+    rivalries                  origin_year       "1970s – Adolescent Crucibles"
+    relationships_romantic     origin_year       2013
+
+This normalization pass parses all of them into numeric [start_year,
+end_year] intervals (both ends inclusive) with a precision flag, stores them
+in temporal_intervals, and indexes them with an R*Tree so overlap and
+containment queries across every entity type are index lookups.
+
+Precision flags:
+    day / month / year   parsed from an explicit date or year
+    decade               "1970s"
+    epoch                mapped through EPOCH_YEARS
+    before / after       "Pre-Epoch 0" / "Post-Epoch 2" (open-ended)
+
+Usage:
+    python epoch_intervals.py <database_path> [identities_epochs.csv]
+    python epoch_intervals.py <database_path> --active <year>
+"""
+
+import csv
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from database_utils import table_exists, rtree_available
+
+
+MIN_YEAR = 0
+MAX_YEAR = 9999
+
+# Epoch -> story years (inclusive). Anchors: Shion awakens 2022-05-01
+# (Epoch 0); Black Data Night 2023 (Epoch 1); the Land War 2023–2025
+# (Epoch 2); Epoch 3 is the current, still-open era.
+EPOCH_YEARS = {
+    0.0: (2022, 2022),
+    1.0: (2023, 2024),
+    1.5: (2024, 2024),
+    2.0: (2023, 2025),
+    3.0: (2025, MAX_YEAR),
+}
+
+# (table, id column, field, entity_type)
+TABLE_SOURCES = [
+    ('land_war_events', 'id', 'epoch', 'land_war_event'),
+    ('land_war_events', 'id', 'date', 'land_war_event'),
+    ('land_war_theaters', 'id', 'period', 'land_war_theater'),
+    ('land_war_map', 'id', 'epoch_reference', 'land_war_region'),
+    ('land_war_property', 'id', 'epoch_reference', 'land_war_property'),
+    ('lineage_frost', 'id', 'epoch_reference', 'lineage_member'),
+    ('shion_bio', 'id', 'epoch_reference', 'shion_bio'),
+    ('rivalries', 'rivalry_id', 'origin_year', 'rivalry'),
+    ('relationships_romantic', 'relationship_id', 'origin_year', 'relationship'),
+]
+
+DASH = r'\s*[-–—]\s*'
+DATE_RE = re.compile(r'^(\d{4})-(\d{2}|XX)-(\d{2}|XX)$')
+YEAR_RANGE_RE = re.compile(rf'^(\d{{4}})(s?){DASH}(\d{{4}})(s?)\b')
+DECADE_RE = re.compile(r'^(\d{3})0s\b')
+YEAR_RE = re.compile(r'^(\d{4})\b(?!-\d)')
+EPOCH_RE = re.compile(
+    rf'^(Pre-|Post-)?Epoch\s+(\d+(?:\.\d+)?)(?:{DASH}(\d+(?:\.\d+)?))?',
+    re.IGNORECASE
+)
+BARE_EPOCH_RE = re.compile(r'^\d+(?:\.\d+)?$')
+
+
+def epoch_years(epoch: float) -> Optional[Tuple[int, int]]:
+    """Map an epoch number to its (start, end) years, using the nearest lower epoch"""
+    known = [e for e in EPOCH_YEARS if e <= epoch]
+    return EPOCH_YEARS[max(known)] if known else None
+
+
+def parse_interval(value: Any, bare_epoch: bool = False) -> Optional[Tuple[int, int, str]]:
+    """
+    Parse a free-text temporal value into (start_year, end_year, precision).
+
+    Args:
+        value: Raw value ("2022-2025", "1970s – ...", "Epoch 0–2", 2013, ...)
+        bare_epoch: Treat a plain number as an epoch (land_war_events.epoch)
+
+    Returns:
+        Tuple of (start_year, end_year, precision) or None if unparseable
+    """
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return (value, value, 'year')
+
+    text = str(value).strip()
+    if not text:
+        return None
+
+    if bare_epoch and BARE_EPOCH_RE.match(text):
+        years = epoch_years(float(text))
+        return (years[0], years[1], 'epoch') if years else None
+
+    match = DATE_RE.match(text)
+    if match:
+        year = int(match.group(1))
+        if match.group(2) == 'XX':
+            precision = 'year'
+        elif match.group(3) == 'XX':
+            precision = 'month'
+        else:
+            precision = 'day'
+        return (year, year, precision)
+
+    match = YEAR_RANGE_RE.match(text)
+    if match:
+        start = int(match.group(1))
+        end = int(match.group(3)) + (9 if match.group(4) else 0)
+        return (start, end, 'decade' if match.group(2) or match.group(4) else 'year')
+
+    match = DECADE_RE.match(text)
+    if match:
+        start = int(match.group(1)) * 10
+        return (start, start + 9, 'decade')
+
+    match = YEAR_RE.match(text)
+    if match:
+        year = int(match.group(1))
+        return (year, year, 'year')
+
+    match = EPOCH_RE.match(text)
+    if match:
+        modifier = (match.group(1) or '').lower()
+        first = epoch_years(float(match.group(2)))
+        last = epoch_years(float(match.group(3))) if match.group(3) else first
+        if not first or not last:
+            return None
+        if modifier == 'pre-':
+            return (MIN_YEAR, first[0] - 1, 'before')
+        if modifier == 'post-':
+            return (last[1] + 1, MAX_YEAR, 'after')
+        return (min(first[0], last[0]), max(first[1], last[1]), 'epoch')
+
+    return None
+
+
+def create_interval_table(cursor) -> bool:
+    """
+    Create temporal_intervals and its interval index.
+
+    Returns:
+        True if the R*Tree index is used, False for the B-tree fallback
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS temporal_intervals (
+            interval_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entity_type TEXT NOT NULL,
+            entity_id TEXT NOT NULL,
+            field TEXT NOT NULL,
+            raw_value TEXT,
+            start_year INTEGER NOT NULL,
+            end_year INTEGER NOT NULL,
+            precision TEXT NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_temporal_intervals_entity
+        ON temporal_intervals(entity_type, entity_id)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_temporal_intervals_type_start
+        ON temporal_intervals(entity_type, start_year, end_year)
+    """)
+
+    if rtree_available(cursor):
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS temporal_intervals_rtree
+            USING rtree(interval_id, start_year, end_year)
+        """)
+        return True
+
+    # Sorted-endpoint fallback
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_temporal_intervals_start
+        ON temporal_intervals(start_year, end_year)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_temporal_intervals_end
+        ON temporal_intervals(end_year, start_year)
+    """)
+    return False
+
+
+def _collect(cursor, identities_epochs: Optional[Path]) -> Tuple[List[tuple], List[tuple]]:
+    """Gather (entity_type, entity_id, field, raw) rows from every source"""
+    raw_rows = []
+
+    for table, id_col, field, entity_type in TABLE_SOURCES:
+        if not table_exists(cursor, table):
+            continue
+        cursor.execute(f"SELECT {id_col}, {field} FROM {table}")
+        for entity_id, raw in cursor.fetchall():
+            raw_rows.append((entity_type, str(entity_id), field, raw))
+
+    if identities_epochs and identities_epochs.exists():
+        with open(identities_epochs, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                raw_rows.append(('identity', row['identity_id'], 'epoch_range', row['epoch_range']))
+
+    parsed, unparsed = [], []
+    for entity_type, entity_id, field, raw in raw_rows:
+        interval = parse_interval(raw, bare_epoch=(field == 'epoch'))
+        if interval:
+            parsed.append((entity_type, entity_id, field,
+                           None if raw is None else str(raw), *interval))
+        elif raw not in (None, ''):
+            unparsed.append((entity_type, entity_id, field, raw))
+    return parsed, unparsed
+
+
+def normalize_intervals(db_path: str, identities_epochs: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Rebuild temporal_intervals from every temporal source.
+
+    Args:
+        db_path: Path to database
+        identities_epochs: Optional path to identities_epochs.csv
+
+    Returns:
+        {'intervals': count, 'unparsed': [(entity_type, entity_id, field, raw), ...]}
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        use_rtree = create_interval_table(cursor)
+        parsed, unparsed = _collect(cursor, Path(identities_epochs) if identities_epochs else None)
+
+        cursor.execute("DELETE FROM temporal_intervals")
+        if use_rtree:
+            cursor.execute("DELETE FROM temporal_intervals_rtree")
+
+        cursor.executemany("""
+            INSERT INTO temporal_intervals
+                (entity_type, entity_id, field, raw_value, start_year, end_year, precision)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, parsed)
+
+        if use_rtree:
+            cursor.execute("""
+                INSERT INTO temporal_intervals_rtree (interval_id, start_year, end_year)
+                SELECT interval_id, start_year, end_year FROM temporal_intervals
+            """)
+
+        conn.commit()
+        return {'intervals': len(parsed), 'unparsed': unparsed}
+    finally:
+        conn.close()
+
+
+def _query(db_path: str, condition_rtree: str, condition_plain: str, params: List[Any],
+           entity_type: Optional[str]) -> List[Dict[str, Any]]:
+    """Run an interval predicate through the R*Tree when present"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        cursor = conn.cursor()
+        if table_exists(cursor, 'temporal_intervals_rtree'):
+            query = f"""
+                SELECT t.* FROM temporal_intervals_rtree r
+                JOIN temporal_intervals t ON t.interval_id = r.interval_id
+                WHERE {condition_rtree}
+            """
+        else:
+            query = f"SELECT t.* FROM temporal_intervals t WHERE {condition_plain}"
+
+        if entity_type is not None:
+            query += " AND t.entity_type = ?"
+            params = params + [entity_type]
+        query += " ORDER BY t.start_year, t.end_year, t.entity_type, t.entity_id"
+
+        cursor.execute(query, params)
+        return [dict(row) for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+def active_during(db_path: str, year: int, entity_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Intervals that include a year ("active during year X").
+
+    Args:
+        db_path: Path to database
+        year: Story year
+        entity_type: Optional filter ('land_war_event', 'identity', 'rivalry', ...)
+
+    Returns:
+        List of interval rows
+    """
+    return overlapping(db_path, year, year, entity_type)
+
+
+def overlapping(db_path: str, start: int, end: int,
+                entity_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Intervals that overlap [start, end].
+
+    Args:
+        db_path: Path to database
+        start: First year (inclusive)
+        end: Last year (inclusive)
+        entity_type: Optional filter
+
+    Returns:
+        List of interval rows
+    """
+    return _query(
+        db_path,
+        "r.start_year <= ? AND r.end_year >= ?",
+        "t.start_year <= ? AND t.end_year >= ?",
+        [end, start], entity_type
+    )
+
+
+def containing(db_path: str, start: int, end: int,
+               entity_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Intervals that fully contain [start, end].
+
+    Args:
+        db_path: Path to database
+        start: First year (inclusive)
+        end: Last year (inclusive)
+        entity_type: Optional filter
+
+    Returns:
+        List of interval rows
+    """
+    return _query(
+        db_path,
+        "r.start_year <= ? AND r.end_year >= ?",
+        "t.start_year <= ? AND t.end_year >= ?",
+        [start, end], entity_type
+    )
+
+
+def within(db_path: str, start: int, end: int,
+           entity_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Intervals that lie entirely inside [start, end].
+
+    Args:
+        db_path: Path to database
+        start: First year (inclusive)
+        end: Last year (inclusive)
+        entity_type: Optional filter
+
+    Returns:
+        List of interval rows
+    """
+    return _query(
+        db_path,
+        "r.start_year >= ? AND r.end_year <= ?",
+        "t.start_year >= ? AND t.end_year <= ?",
+        [start, end], entity_type
+    )
+
+
+def _print_rows(rows: List[Dict[str, Any]]):
+    for row in rows:
+        end = 'open' if row['end_year'] >= MAX_YEAR else row['end_year']
+        print(f"  • [{row['start_year']}–{end}] {row['entity_type']}:{row['entity_id']}"
+              f" ({row['field']} = {row['raw_value']!r}, {row['precision']})")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python epoch_intervals.py <database_path> [identities_epochs.csv]")
+        print("       python epoch_intervals.py <database_path> --active <year>")
+        sys.exit(1)
+
+    db_path = sys.argv[1]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    if len(sys.argv) == 4 and sys.argv[2] == '--active':
+        year = int(sys.argv[3])
+        print(f"\n━━━ Active during {year} ━━━")
+        _print_rows(active_during(db_path, year))
+        return
+
+    csv_path = sys.argv[2] if len(sys.argv) > 2 else str(Path(__file__).parent / 'cmm' / 'identities_epochs.csv')
+    result = normalize_intervals(db_path, csv_path)
+
+    print(f"✓ Normalized {result['intervals']} intervals")
+    if result['unparsed']:
+        print(f"⚠ {len(result['unparsed'])} values could not be parsed:")
+        for entity_type, entity_id, field, raw in result['unparsed']:
+            print(f"   • {entity_type}:{entity_id} {field} = {raw!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Event Participants Import Stage
+================================
+land_war_events.participants is a "Reika Hyōka Frost; Shion" string and
+rivalries / relationships_romantic name people in free text, so questions
+like "every war event involving Kage Ishigawa" were LIKE scans plus Python
+splitting. This stage parses those references once into an indexed join
+table:
+
+    event_participants(source, event_id, participant_name, character_id, role)
+
+    source          'land_war_event' | 'rivalry' | 'relationship'
+    event_id        id / rivalry_id / relationship_id in the source table
+    character_id    resolved through name_index.py (NULL when unresolved)
+    role            'participant' | 'participant_a' | 'participant_b'
+                    | 'partner_a' | 'partner_b'
+
+Re-run the stage after importing events or characters; it rebuilds the rows
+for each source in one transaction.
+
+Usage:
+    python event_participants.py <database_path> import
+    python event_participants.py <database_path> events <character_name>
+    python event_participants.py <database_path> co <character_name>
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from database_utils import table_exists
+from name_index import NameIndex
+
+
+# (source, table, id column, [(name column, role)], title SQL)
+PARTICIPANT_SOURCES = [
+    ('land_war_event', 'land_war_events', 'id',
+     [('participants', 'participant')], "title"),
+    ('rivalry', 'rivalries', 'rivalry_id',
+     [('participant_a', 'participant_a'), ('participant_b', 'participant_b')],
+     "participant_a || ' vs ' || participant_b || ' (' || origin_year || ')'"),
+    ('relationship', 'relationships_romantic', 'relationship_id',
+     [('character_a', 'partner_a'), ('character_b', 'partner_b')],
+     "character_a || ' & ' || character_b"),
+]
+
+
+def create_participants_table(cursor):
+    """Create the event_participants table and its indexes"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS event_participants (
+            source TEXT NOT NULL,
+            event_id INTEGER NOT NULL,
+            participant_name TEXT NOT NULL,
+            character_id,
+            role TEXT NOT NULL,
+            PRIMARY KEY (source, event_id, participant_name, role)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_event_participants_character
+        ON event_participants(character_id, source, event_id)
+    """)
+
+
+def split_participants(value: Optional[str]) -> List[str]:
+    """Split a "A; B; C" participants string into names"""
+    return [name.strip() for name in (value or '').split(';') if name.strip()]
+
+
+def import_participants(db_path: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Parse participant references from every source into event_participants.
+
+    Args:
+        db_path: Path to database
+
+    Returns:
+        Dictionary of source → (rows written, unresolved names)
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        create_participants_table(cursor)
+        index = NameIndex.from_cursor(cursor)
+        results = {}
+
+        for source, table, id_col, name_columns, _ in PARTICIPANT_SOURCES:
+            if not table_exists(cursor, table):
+                continue
+            cursor.execute("DELETE FROM event_participants WHERE source = ?", (source,))
+            columns = ', '.join(column for column, _ in name_columns)
+            cursor.execute(f"SELECT {id_col}, {columns} FROM {table}")
+
+            rows = []
+            for event_id, *values in cursor.fetchall():
+                for (_, role), value in zip(name_columns, values):
+                    for name in split_participants(value):
+                        rows.append((source, event_id, name, index.resolve(name), role))
+
+            cursor.executemany("""
+                INSERT OR IGNORE INTO event_participants
+                (source, event_id, participant_name, character_id, role)
+                VALUES (?, ?, ?, ?, ?)
+            """, rows)
+            results[source] = (len(rows), sum(1 for row in rows if row[3] is None))
+
+        conn.commit()
+        return results
+    finally:
+        conn.close()
+
+
+def _character_id(cursor, name: str):
+    """
+    Resolve a name for the query helpers.
+
+    An exact character_id or unique character_name hit is a primary-key /
+    single-table lookup; the full NameIndex (aliases, codenames, accents)
+    is only built when neither matches.
+    """
+    cursor.execute("SELECT character_id FROM characters WHERE character_id = ?", (name,))
+    row = cursor.fetchone()
+    if row:
+        return row[0]
+    cursor.execute("SELECT character_id FROM characters WHERE character_name = ? LIMIT 2", (name,))
+    rows = cursor.fetchall()
+    if len(rows) == 1 and rows[0][0] is not None:
+        return rows[0][0]
+    return NameIndex.from_cursor(cursor).resolve(name)
+
+
+def events_for_character(db_path: str, character: str) -> List[Dict[str, Any]]:
+    """
+    Get every event a character participates in.
+
+    Args:
+        db_path: Path to database
+        character: Character name, alias or codename
+
+    Returns:
+        List of {source, event_id, role, title}
+    """
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    try:
+        character_id = _character_id(cursor, character)
+        if character_id is None:
+            return []
+
+        titles = " ".join(
+            f"WHEN '{source}' THEN (SELECT {title} FROM {table} WHERE {id_col} = p.event_id)"
+            for source, table, id_col, _, title in PARTICIPANT_SOURCES
+            if table_exists(cursor, table)
+        )
+        cursor.execute(f"""
+            SELECT p.source, p.event_id, p.role,
+                   CASE p.source {titles} END AS title
+            FROM event_participants p
+            WHERE p.character_id = ?
+            ORDER BY p.source, p.event_id
+        """, (character_id,))
+        return [dict(row) for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+def co_participants(db_path: str, character: str, source: Optional[str] = None) -> List[Tuple[str, int]]:
+    """
+    Count how often other characters share an event with a character.
+
+    Args:
+        db_path: Path to database
+        character: Character name, alias or codename
+        source: Restrict to one source ('land_war_event', 'rivalry', 'relationship')
+
+    Returns:
+        List of (character_name, shared event count), most frequent first
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        character_id = _character_id(cursor, character)
+        if character_id is None:
+            return []
+
+        query = """
+            SELECT c.character_name, COUNT(DISTINCT other.source || ':' || other.event_id) AS shared
+            FROM event_participants me
+            JOIN event_participants other
+              ON other.source = me.source AND other.event_id = me.event_id
+             AND other.character_id != me.character_id
+            JOIN characters c ON c.character_id = other.character_id
+            WHERE me.character_id = ?
+        """
+        params: List[Any] = [character_id]
+        if source:
+            query += " AND me.source = ?"
+            params.append(source)
+        query += " GROUP BY other.character_id ORDER BY shared DESC, c.character_name"
+
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def co_participation_counts(db_path: str, min_count: int = 1) -> List[Tuple[str, str, int]]:
+    """
+    Count shared events for every pair of resolved characters.
+
+    Args:
+        db_path: Path to database
+        min_count: Only return pairs sharing at least this many events
+
+    Returns:
+        List of (character_id_a, character_id_b, shared events) with a < b
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT a.character_id, b.character_id,
+                   COUNT(DISTINCT a.source || ':' || a.event_id) AS shared
+            FROM event_participants a
+            JOIN event_participants b
+              ON b.source = a.source AND b.event_id = a.event_id
+             AND b.character_id > a.character_id
+            GROUP BY a.character_id, b.character_id
+            HAVING shared >= ?
+            ORDER BY shared DESC, a.character_id, b.character_id
+        """, (min_count,))
+        return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def main():
+    commands = ('import', 'events', 'co')
+    if len(sys.argv) < 3 or sys.argv[2] not in commands:
+        print("Usage: python event_participants.py <database_path> import")
+        print("       python event_participants.py <database_path> events <character_name>")
+        print("       python event_participants.py <database_path> co <character_name>")
+        sys.exit(1)
+
+    db_path, command = sys.argv[1], sys.argv[2]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    if command == 'import':
+        for source, (written, unresolved) in import_participants(db_path).items():
+            print(f"✓ {source}: {written} participants ({unresolved} unresolved)")
+        return
+
+    if len(sys.argv) != 4:
+        print(f"Usage: python event_participants.py <database_path> {command} <character_name>")
+        sys.exit(1)
+
+    character = sys.argv[3]
+    if command == 'events':
+        for event in events_for_character(db_path, character):
+            print(f"  • [{event['source']} #{event['event_id']}] {event['title']} ({event['role']})")
+    else:
+        for name, shared in co_participants(db_path, character):
+            print(f"  • {name}: {shared}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,10 +8,14 @@ Usage:
     python explore_database.py universe.db
 """
 
-import sqlite3
+import json
 import sys
 from pathlib import Path
 
+from character_cards import cards_installed
+from database_utils import connect, read_profile
+from stats_counters import counters_installed, read_counters
+
 
 def print_header(title):
     """Print a nice header"""
@@ -25,14 +29,16 @@ def query_character_roster(cursor):
     print_header("CHARACTER ROSTER BY FACTION")
     
     # Get faction counts
-    cursor.execute("""
-        SELECT faction, COUNT(*) as count
-        FROM characters
-        GROUP BY faction
-        ORDER BY count DESC
-    """)
-    
-    faction_counts = cursor.fetchall()
+    if counters_installed(cursor):
+        faction_counts = list(read_counters(cursor, 'faction').items())
+    else:
+        cursor.execute("""
+            SELECT faction, COUNT(*) as count
+            FROM characters
+            GROUP BY faction
+            ORDER BY count DESC
+        """)
+        faction_counts = cursor.fetchall()
     
     print("📊 Faction Summary:")
     for faction, count in faction_counts:
@@ -45,42 +51,50 @@ def query_character_roster(cursor):
         print(f"\n🔷 {faction}")
         print("-" * 70)
         
-        cursor.execute("""
-            SELECT 
-                character_name,
-                codename,
-                primary_role,
-                status,
-                character_secrets
-            FROM characters
-            WHERE faction = ?
-            ORDER BY character_name
-        """, (faction,))
-        
-        chars = cursor.fetchall()
+        if cards_installed(cursor):
+            # Materialized cards already carry the parsed K-Level
+            cursor.execute("""
+                SELECT character_name, codename, primary_role, status, klevel
+                FROM character_cards
+                WHERE faction = ?
+                ORDER BY character_name
+            """, (faction,))
+            chars = cursor.fetchall()
+        else:
+            cursor.execute("""
+                SELECT 
+                    character_name,
+                    codename,
+                    primary_role,
+                    status,
+                    character_secrets
+                FROM characters
+                WHERE faction = ?
+                ORDER BY character_name
+            """, (faction,))
+            chars = [row[:4] + (_secret_klevel(row[4]),) for row in cursor.fetchall()]
         
-        for name, codename, role, status, secrets in chars:
+        for name, codename, role, status, klevel in chars:
             status_icon = "✓" if status == "Active" else "✗"
             
             # Handle None values
             codename = codename or "N/A"
             role = role or "N/A"
-            
-            # Parse K-Level from secrets if available
-            klevel = ""
-            if secrets:
-                try:
-                    import json
-                    secrets_dict = json.loads(secrets)
-                    klevel = secrets_dict.get('klevel', '')
-                    if klevel:
-                        klevel = f" [K{klevel}]"
-                except:
-                    pass
+            klevel = f" [K{klevel}]" if klevel else ""
             
             print(f"   {status_icon} {name:25s} | {codename:20s} | {role}{klevel}")
 
 
+def _secret_klevel(secrets):
+    """Parse K-Level from character_secrets if available"""
+    if secrets:
+        try:
+            return json.loads(secrets).get('klevel', '')
+        except (ValueError, AttributeError):
+            pass
+    return ''
+
+
 def query_corporate_structure(cursor):
     """Show corporations and their divisions"""
     print_header("CORPORATE STRUCTURE")
@@ -252,7 +266,20 @@ def query_character_secrets(cursor):
 def query_statistics(cursor):
     """Show database statistics"""
     print_header("DATABASE STATISTICS")
-    
+
+    # Use trigger-maintained counters when installed (stats_counters.py)
+    if counters_installed(cursor):
+        tables = read_counters(cursor, 'table')
+        print(f"📊 Total Characters:     {tables.get('characters', 0)}")
+        print(f"🏢 Total Corporations:   {tables.get('corporations', 0)}")
+        print(f"🔹 Total Divisions:      {tables.get('divisions', 0)}")
+        print(f"🔗 Total Affiliations:   {tables.get('character_corporate_affiliations', 0)}")
+        print()
+        print("Character Status:")
+        for status, count in read_counters(cursor, 'status').items():
+            print(f"   • {status}: {count}")
+        return
+
     # Character count
     cursor.execute("SELECT COUNT(*) FROM characters")
     char_count = cursor.fetchone()[0]
@@ -296,7 +323,7 @@ def main():
         print(f"❌ Error: Database file '{db_path}' not found!")
         sys.exit(1)
     
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path, read_profile(db_path))
     cursor = conn.cursor()
     
     print("\n" + "=" * 70)
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+Genealogy Engine
+================
+House lineage tables (lineage_frost today) list family members with
+origin/legacy prose but no links a program can follow, and
+characters.family_notes is free text. This module keeps a generic family
+model next to them:
+
+    lineage_members     member_id, house, name, character_id, source table/id
+    lineage_edges       parent → child and spouse links, with epoch_reference
+                        and start/end years parsed by epoch_intervals.py
+    lineage_closure     every (ancestor, descendant, depth) pair, including
+                        each member with itself at depth 0
+
+The closure is maintained by triggers on lineage_members and lineage_edges,
+so ancestors(), descendants(), common_ancestor() and generation_distance()
+are single indexed reads. Parent links that would create a cycle are
+rejected.
+
+Any house table can be imported by adding it to HOUSE_TABLES; parent and
+spouse links come from CANON_LINKS and from family_notes phrases such as
+"Wife of Haruto Frost (deceased), mother of Reika Frost".
+
+Usage:
+    python genealogy.py <database_path> install
+    python genealogy.py <database_path> ancestors <name>
+    python genealogy.py <database_path> descendants <name>
+    python genealogy.py <database_path> common <name> <name>
+"""
+
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from database_utils import table_exists, table_columns
+from epoch_intervals import parse_interval
+from name_index import NameIndex, normalize_name
+
+
+# House lineage tables: table → column mapping
+HOUSE_TABLES = {
+    'lineage_frost': {
+        'house': 'Frost',
+        'id': 'id',
+        'name': 'name_en',
+        'epoch': 'epoch_reference',
+    },
+}
+
+# (from member, to member, relation, epoch_reference) for canon the tables don't encode
+CANON_LINKS = [
+    ('haruto_frost', 'mitsuko_frost', 'spouse', 'Pre-Epoch 0'),
+    ('haruto_frost', 'reika_frost', 'parent', None),
+    ('mitsuko_frost', 'reika_frost', 'parent', None),
+]
+
+# family_notes phrase → (relation, note subject is the 'from' end)
+FAMILY_PHRASES = [
+    (re.compile(r'\b(?:wife|husband|spouse|partner) of ([^,;()]+)', re.IGNORECASE), 'spouse', True),
+    (re.compile(r'\b(?:mother|father|parent) of ([^,;()]+)', re.IGNORECASE), 'parent', True),
+    (re.compile(r'\b(?:daughter|son|child) of ([^,;()]+)', re.IGNORECASE), 'parent', False),
+]
+
+
+def create_genealogy_tables(cursor):
+    """Create lineage tables, indexes and closure-maintenance triggers"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS lineage_members (
+            member_id TEXT PRIMARY KEY,
+            house TEXT,
+            name TEXT NOT NULL,
+            character_id,
+            source_table TEXT,
+            source_id TEXT
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_lineage_members_name ON lineage_members(name)")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_lineage_members_character
+        ON lineage_members(character_id)
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS lineage_edges (
+            from_id TEXT NOT NULL,
+            to_id TEXT NOT NULL,
+            relation TEXT NOT NULL CHECK (relation IN ('parent', 'spouse')),
+            epoch_reference TEXT,
+            start_year INTEGER,
+            end_year INTEGER,
+            PRIMARY KEY (from_id, to_id, relation),
+            FOREIGN KEY (from_id) REFERENCES lineage_members(member_id),
+            FOREIGN KEY (to_id) REFERENCES lineage_members(member_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_lineage_edges_to ON lineage_edges(to_id, relation)")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS lineage_closure (
+            ancestor_id TEXT NOT NULL,
+            descendant_id TEXT NOT NULL,
+            depth INTEGER NOT NULL,
+            PRIMARY KEY (ancestor_id, descendant_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_lineage_closure_descendant
+        ON lineage_closure(descendant_id, depth)
+    """)
+
+    # Paths through a new parent link: ancestors(from) × descendants(to)
+    link_paths = """
+            INSERT INTO lineage_closure (ancestor_id, descendant_id, depth)
+            SELECT a.ancestor_id, d.descendant_id, a.depth + d.depth + 1
+            FROM lineage_closure a, lineage_closure d
+            WHERE a.descendant_id = {row}.from_id AND d.ancestor_id = {row}.to_id
+            ON CONFLICT (ancestor_id, descendant_id)
+            DO UPDATE SET depth = MIN(depth, excluded.depth);"""
+
+    # Removing from → to only affects pairs (a, d) with d under `to` and a outside
+    # that subtree; drop those, then re-derive them through the remaining links
+    # into the subtree (ancestors outside the subtree are unaffected).
+    unlink_paths = """
+            DELETE FROM lineage_closure
+            WHERE descendant_id IN (SELECT descendant_id FROM lineage_closure
+                                    WHERE ancestor_id = OLD.to_id)
+              AND ancestor_id NOT IN (SELECT descendant_id FROM lineage_closure
+                                      WHERE ancestor_id = OLD.to_id);
+            INSERT INTO lineage_closure (ancestor_id, descendant_id, depth)
+            SELECT a.ancestor_id, d.descendant_id, a.depth + d.depth + 1
+            FROM lineage_edges e
+            JOIN lineage_closure a ON a.descendant_id = e.from_id
+            JOIN lineage_closure d ON d.ancestor_id = e.to_id
+            WHERE e.relation = 'parent'
+              AND e.to_id IN (SELECT descendant_id FROM lineage_closure
+                              WHERE ancestor_id = OLD.to_id)
+              AND e.from_id NOT IN (SELECT descendant_id FROM lineage_closure
+                                    WHERE ancestor_id = OLD.to_id)
+            ON CONFLICT (ancestor_id, descendant_id)
+            DO UPDATE SET depth = MIN(depth, excluded.depth);"""
+
+    triggers = {
+        'trg_lineage_members_ins': """
+            AFTER INSERT ON lineage_members
+            BEGIN
+            INSERT OR IGNORE INTO lineage_closure VALUES (NEW.member_id, NEW.member_id, 0);
+            END""",
+        'trg_lineage_members_del': """
+            AFTER DELETE ON lineage_members
+            BEGIN
+            DELETE FROM lineage_edges WHERE from_id = OLD.member_id OR to_id = OLD.member_id;
+            DELETE FROM lineage_closure
+            WHERE ancestor_id = OLD.member_id OR descendant_id = OLD.member_id;
+            END""",
+        'trg_lineage_edges_cycle': """
+            BEFORE INSERT ON lineage_edges
+            WHEN NEW.relation = 'parent' AND EXISTS (
+                SELECT 1 FROM lineage_closure
+                WHERE ancestor_id = NEW.to_id AND descendant_id = NEW.from_id)
+            BEGIN
+            SELECT RAISE(ABORT, 'lineage cycle: child is already an ancestor of parent');
+            END""",
+        'trg_lineage_edges_ins': f"""
+            AFTER INSERT ON lineage_edges
+            WHEN NEW.relation = 'parent'
+            BEGIN{link_paths.format(row='NEW')}
+            END""",
+        'trg_lineage_edges_del': f"""
+            AFTER DELETE ON lineage_edges
+            WHEN OLD.relation = 'parent'
+            BEGIN{unlink_paths}
+            END""",
+    }
+    for name, body in triggers.items():
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"CREATE TRIGGER {name} {body}")
+
+
+def _years(epoch_reference: Optional[str]):
+    """(start_year, end_year) for an epoch reference, or (None, None)"""
+    interval = parse_interval(epoch_reference) if epoch_reference else None
+    return (interval[0], interval[1]) if interval else (None, None)
+
+
+def add_member(cursor, member_id: str, name: str, house: Optional[str] = None,
+               character_id=None, source_table: Optional[str] = None,
+               source_id: Optional[str] = None):
+    """Add or update a lineage member"""
+    cursor.execute("""
+        INSERT INTO lineage_members (member_id, house, name, character_id, source_table, source_id)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (member_id) DO UPDATE SET
+            house = excluded.house, name = excluded.name,
+            character_id = COALESCE(excluded.character_id, character_id),
+            source_table = excluded.source_table, source_id = excluded.source_id
+    """, (member_id, house, name, character_id, source_table, source_id))
+
+
+def add_link(cursor, from_id: str, to_id: str, relation: str,
+             epoch_reference: Optional[str] = None):
+    """
+    Add a parent (from = parent, to = child) or spouse link.
+
+    Raises:
+        sqlite3.IntegrityError: If a parent link would create a cycle
+    """
+    if relation == 'spouse':
+        from_id, to_id = sorted((from_id, to_id))
+    cursor.execute("""
+        INSERT OR IGNORE INTO lineage_edges
+        (from_id, to_id, relation, epoch_reference, start_year, end_year)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (from_id, to_id, relation, epoch_reference, *_years(epoch_reference)))
+
+
+def remove_link(cursor, from_id: str, to_id: str, relation: str):
+    """Remove a parent or spouse link (the closure is repaired by trigger)"""
+    if relation == 'spouse':
+        from_id, to_id = sorted((from_id, to_id))
+    cursor.execute(
+        "DELETE FROM lineage_edges WHERE from_id = ? AND to_id = ? AND relation = ?",
+        (from_id, to_id, relation)
+    )
+
+
+def _import_family_notes(cursor, names: NameIndex) -> int:
+    """Add links parsed from characters.family_notes; returns links added"""
+    if 'family_notes' not in table_columns(cursor, 'characters'):
+        return 0
+
+    cursor.execute("SELECT member_id, name, character_id FROM lineage_members")
+    members = {}
+    for member_id, name, character_id in cursor.fetchall():
+        members[normalize_name(name)] = member_id
+        if character_id is not None:
+            members[character_id] = member_id
+
+    def member_for(name: str, character_id=None) -> Optional[str]:
+        character_id = character_id if character_id is not None else names.resolve(name)
+        member_id = members.get(character_id) or members.get(normalize_name(name))
+        if member_id is None and character_id is not None:
+            member_id = f"character:{character_id}"
+            add_member(cursor, member_id, names.names.get(character_id, name),
+                       character_id=character_id, source_table='characters',
+                       source_id=str(character_id))
+            members[character_id] = member_id
+        return member_id
+
+    cursor.execute("""
+        SELECT character_id, character_name, family_notes FROM characters
+        WHERE family_notes IS NOT NULL AND family_notes != ''
+    """)
+    added = 0
+    for character_id, character_name, notes in cursor.fetchall():
+        subject = member_for(character_name, character_id)
+        for pattern, relation, subject_first in FAMILY_PHRASES:
+            for other_name in pattern.findall(notes):
+                other = member_for(other_name.strip())
+                if subject is None or other is None or other == subject:
+                    continue
+                from_id, to_id = (subject, other) if subject_first else (other, subject)
+                try:
+                    add_link(cursor, from_id, to_id, relation)
+                    added += cursor.rowcount
+                except sqlite3.IntegrityError as e:
+                    print(f"  ⚠ Skipped {relation} link {from_id} → {to_id}: {e}")
+    return added
+
+
+def install_genealogy(db_path: str) -> Dict[str, int]:
+    """
+    Create the lineage model and import every configured house table.
+
+    Args:
+        db_path: Path to database
+
+    Returns:
+        Dictionary with members, links and closure row counts
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        create_genealogy_tables(cursor)
+        names = NameIndex.from_cursor(cursor)
+
+        for table, spec in HOUSE_TABLES.items():
+            if not table_exists(cursor, table):
+                continue
+            cursor.execute(f"SELECT {spec['id']}, {spec['name']} FROM {table}")
+            for member_id, name in cursor.fetchall():
+                character_id = member_id if member_id in names.names else names.resolve(name)
+                add_member(cursor, str(member_id), name, spec['house'], character_id,
+                           table, str(member_id))
+
+        cursor.execute("SELECT member_id FROM lineage_members")
+        known = {row[0] for row in cursor.fetchall()}
+        for from_id, to_id, relation, epoch_reference in CANON_LINKS:
+            if from_id in known and to_id in known:
+                add_link(cursor, from_id, to_id, relation, epoch_reference)
+
+        _import_family_notes(cursor, names)
+        conn.commit()
+
+        counts = {}
+        for table in ('lineage_members', 'lineage_edges', 'lineage_closure'):
+            counts[table] = cursor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        return counts
+    finally:
+        conn.close()
+
+
+# ──────────────────────────────────────────────────────────
+# Queries
+# ──────────────────────────────────────────────────────────
+
+def _member_id(cursor, member: str) -> Optional[str]:
+    """Find a member by member_id, name or character_id"""
+    cursor.execute("""
+        SELECT member_id FROM lineage_members
+        WHERE member_id = ? OR name = ? OR character_id = ?
+        LIMIT 1
+    """, (member, member, member))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _query(db_path: str, sql: str, members: List[str]) -> List[Dict[str, Any]]:
+    """Resolve members and run a query with their ids as parameters"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    try:
+        ids = [_member_id(cursor, member) for member in members]
+        if None in ids:
+            return []
+        cursor.execute(sql, ids)
+        return [dict(row) for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+def ancestors(db_path: str, member: str, max_depth: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Get a member's ancestors, nearest generation first.
+
+    Args:
+        db_path: Path to database
+        member: member_id, name or character_id
+        max_depth: Only this many generations up
+
+    Returns:
+        List of member dictionaries with 'depth' (1 = parent)
+    """
+    rows = _query(db_path, """
+        SELECT m.*, c.depth FROM lineage_closure c
+        JOIN lineage_members m ON m.member_id = c.ancestor_id
+        WHERE c.descendant_id = ? AND c.depth > 0
+        ORDER BY c.depth, m.name
+    """, [member])
+    return [row for row in rows if max_depth is None or row['depth'] <= max_depth]
+
+
+def descendants(db_path: str, member: str, max_depth: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Get a member's descendants, nearest generation first.
+
+    Args:
+        db_path: Path to database
+        member: member_id, name or character_id
+        max_depth: Only this many generations down
+
+    Returns:
+        List of member dictionaries with 'depth' (1 = child)
+    """
+    rows = _query(db_path, """
+        SELECT m.*, c.depth FROM lineage_closure c
+        JOIN lineage_members m ON m.member_id = c.descendant_id
+        WHERE c.ancestor_id = ? AND c.depth > 0
+        ORDER BY c.depth, m.name
+    """, [member])
+    return [row for row in rows if max_depth is None or row['depth'] <= max_depth]
+
+
+def spouses(db_path: str, member: str) -> List[Dict[str, Any]]:
+    """Get a member's spouses with the link's epoch"""
+    return _query(db_path, """
+        SELECT m.*, e.epoch_reference, e.start_year, e.end_year
+        FROM lineage_edges e
+        JOIN lineage_members m
+          ON m.member_id = CASE WHEN e.from_id = ?1 THEN e.to_id ELSE e.from_id END
+        WHERE e.relation = 'spouse' AND (e.from_id = ?1 OR e.to_id = ?1)
+        ORDER BY m.name
+    """, [member])
+
+
+def common_ancestor(db_path: str, a: str, b: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the nearest common ancestor of two members.
+
+    A member counts as its own ancestor, so if one is an ancestor of the
+    other, that member is returned.
+
+    Returns:
+        Member dictionary with depth_a and depth_b, or None
+    """
+    rows = _query(db_path, """
+        SELECT m.*, ca.depth AS depth_a, cb.depth AS depth_b
+        FROM lineage_closure ca
+        JOIN lineage_closure cb ON cb.ancestor_id = ca.ancestor_id AND cb.descendant_id = ?2
+        JOIN lineage_members m ON m.member_id = ca.ancestor_id
+        WHERE ca.descendant_id = ?1
+        ORDER BY ca.depth + cb.depth, m.name
+        LIMIT 1
+    """, [a, b])
+    return rows[0] if rows else None
+
+
+def generation_distance(db_path: str, a: str, b: str) -> Optional[int]:
+    """
+    Get how many generations b is below a.
+
+    Positive when b is in a younger generation (a child of a is +1),
+    negative when older, 0 for the same generation (e.g. siblings).
+    Measured through the nearest common ancestor.
+
+    Returns:
+        Generation difference, or None if the members are unrelated
+    """
+    ancestor = common_ancestor(db_path, a, b)
+    if ancestor is None:
+        return None
+    return ancestor['depth_b'] - ancestor['depth_a']
+
+
+def main():
+    commands = ('install', 'ancestors', 'descendants', 'common')
+    if len(sys.argv) < 3 or sys.argv[2] not in commands:
+        print("Usage: python genealogy.py <database_path> install")
+        print("       python genealogy.py <database_path> ancestors <name>")
+        print("       python genealogy.py <database_path> descendants <name>")
+        print("       python genealogy.py <database_path> common <name> <name>")
+        sys.exit(1)
+
+    db_path, command = sys.argv[1], sys.argv[2]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    if command == 'install':
+        counts = install_genealogy(db_path)
+        print(f"✓ {counts['lineage_members']} members, {counts['lineage_edges']} links, "
+              f"{counts['lineage_closure']} closure rows")
+    elif command in ('ancestors', 'descendants') and len(sys.argv) == 4:
+        lookup = ancestors if command == 'ancestors' else descendants
+        for row in lookup(db_path, sys.argv[3]):
+            print(f"  {row['depth']}  {row['name']} ({row['house'] or 'no house'})")
+    elif command == 'common' and len(sys.argv) == 5:
+        ancestor = common_ancestor(db_path, sys.argv[3], sys.argv[4])
+        if ancestor is None:
+            print("  ✗ No common ancestor")
+        else:
+            print(f"  {ancestor['name']} (up {ancestor['depth_a']} / {ancestor['depth_b']}); "
+                  f"generation distance {ancestor['depth_b'] - ancestor['depth_a']}")
+    else:
+        print(f"❌ Wrong arguments for '{command}'")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Character Graph Metrics (Batch Job)
+====================================
+Ranks characters by how connected they are, over the relationship graph
+from relationship_graph.py, and persists the scores in an indexed table:
+
+    character_graph_metrics
+        character_id            one row per character
+        component_signature     hash of the component's members and edges
+        component_size          characters in the same connected component
+        pagerank                weighted PageRank, scaled so the average
+                                character in a component scores 1.0
+        betweenness             sampled Brandes betweenness (unweighted)
+        degree                  distinct neighbours
+        weighted_degree         sum of edge weights
+        degree_<edge type>      neighbours per edge type
+
+Groups too large to expand pairwise are hub nodes in the graph (see
+relationship_graph.py). PageRank and betweenness treat a hub exactly as
+the clique it stands for, except that a pair sharing a hub and another
+link counts as two shortest paths. For degrees, a hub contributes its
+other members once per hub without de-duplicating them against the
+character's other neighbours.
+
+Every metric is computed per connected component, so a component's scores
+depend only on that component. Each run hashes every component and only
+recomputes the ones whose signature is not already stored; unchanged
+components keep their rows untouched.
+
+Usage:
+    python graph_metrics.py <database_path> [--full] [--samples N]
+    python graph_metrics.py <database_path> top [metric] [limit]
+"""
+
+import hashlib
+import random
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from relationship_graph import EDGE_NAMES, EDGE_TYPES, RelationshipGraph
+
+
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-9
+PAGERANK_MAX_ITERATIONS = 100
+BETWEENNESS_SAMPLES = 64
+
+METRICS = ['pagerank', 'betweenness', 'degree', 'weighted_degree'] + \
+    [f"degree_{name}" for name in EDGE_TYPES]
+
+
+def create_metrics_table(cursor):
+    """Create the character_graph_metrics table and its indexes"""
+    degree_columns = ''.join(f"            degree_{name} INTEGER NOT NULL DEFAULT 0,\n"
+                             for name in EDGE_TYPES)
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS character_graph_metrics (
+            character_id PRIMARY KEY,
+            component_signature TEXT NOT NULL,
+            component_size INTEGER NOT NULL,
+            pagerank REAL NOT NULL,
+            betweenness REAL NOT NULL,
+            degree INTEGER NOT NULL,
+            weighted_degree REAL NOT NULL,
+{degree_columns}            computed_at TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_graph_metrics_pagerank
+        ON character_graph_metrics(pagerank DESC)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_graph_metrics_betweenness
+        ON character_graph_metrics(betweenness DESC)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_graph_metrics_component
+        ON character_graph_metrics(component_signature)
+    """)
+
+
+def component_signature(graph: RelationshipGraph, members: List[int]) -> str:
+    """Hash of a component's members and (typed, weighted) edges"""
+    digest = hashlib.sha1()
+    for n in sorted(members, key=lambda m: str(graph.node_ids[m])):
+        digest.update(repr(graph.node_ids[n]).encode())
+        edges = sorted(
+            (str(graph.node_ids[graph.targets[i]]), graph.types[i], graph.weights[i])
+            for i in range(graph.offsets[n], graph.offsets[n + 1])
+        )
+        digest.update(repr(edges).encode())
+    return digest.hexdigest()
+
+
+def _component_hubs(graph: RelationshipGraph, members: List[int]) -> List[int]:
+    """Hub nodes attached to a component's members"""
+    return sorted({graph.targets[i] for n in members
+                   for i in range(graph.offsets[n], graph.offsets[n + 1])
+                   if graph.is_hub(graph.targets[i])})
+
+
+def pagerank(graph: RelationshipGraph, members: List[int]) -> Dict[int, float]:
+    """
+    Weighted PageRank within one component.
+
+    Dangling mass and teleports stay inside the component, and scores are
+    scaled so they average 1.0 over the component.
+    """
+    size = len(members)
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    hubs = _component_hubs(graph, members)
+    # A hub edge of weight w stands for an edge of weight w to every other member
+    out_weight = {
+        n: sum(weights[i] * (offsets[targets[i] + 1] - offsets[targets[i]] - 1)
+               if graph.is_hub(targets[i]) else weights[i]
+               for i in range(offsets[n], offsets[n + 1]))
+        for n in members
+    }
+    rank = {n: 1.0 / size for n in members}
+
+    for _ in range(PAGERANK_MAX_ITERATIONS):
+        dangling = sum(rank[n] for n in members if out_weight[n] == 0)
+        base = (1 - PAGERANK_DAMPING + PAGERANK_DAMPING * dangling) / size
+        new_rank = dict.fromkeys(members, base)
+        pooled = dict.fromkeys(hubs, 0.0)
+        for n in members:
+            if out_weight[n]:
+                share = PAGERANK_DAMPING * rank[n] / out_weight[n]
+                for i in range(offsets[n], offsets[n + 1]):
+                    v = targets[i]
+                    if v in pooled:
+                        pooled[v] += share * weights[i]
+                    else:
+                        new_rank[v] += share * weights[i]
+        # Every member receives the hub's pooled share minus its own
+        for hub, total in pooled.items():
+            for i in range(offsets[hub], offsets[hub + 1]):
+                n = targets[i]
+                if out_weight[n]:
+                    total_own = PAGERANK_DAMPING * rank[n] / out_weight[n] * weights[i]
+                    new_rank[n] += total - total_own
+                else:
+                    new_rank[n] += total
+        delta = sum(abs(new_rank[n] - rank[n]) for n in members)
+        rank = new_rank
+        if delta < PAGERANK_TOLERANCE:
+            break
+
+    return {n: score * size for n, score in rank.items()}
+
+
+def sampled_betweenness(graph: RelationshipGraph, members: List[int], samples: int,
+                        seed: str) -> Dict[int, float]:
+    """
+    Brandes betweenness within one component from a sample of sources.
+
+    Exact when the component has no more members than samples; otherwise the
+    dependencies of the sampled sources are scaled up by size / samples.
+    The sample is seeded by the component signature so reruns are stable.
+    """
+    offsets, targets = graph.offsets, graph.targets
+    sources = members if len(members) <= samples else \
+        random.Random(seed).sample(members, samples)
+    scale = len(members) / len(sources) / 2  # undirected: each path counted twice
+    centrality = dict.fromkeys(members, 0.0)
+
+    for s in sources:
+        # Lengths are doubled so a hub sits half-way between its members:
+        # character → character costs 2, character → hub and hub → member 1
+        sigma = {s: 1}
+        distance = {s: 0}
+        predecessors: Dict[int, List[int]] = {s: []}
+        order = []
+        levels = [[s]]
+        level = 0
+        while level < len(levels):
+            for u in levels[level]:
+                if distance[u] != level:
+                    continue  # moved to a lower level after being queued here
+                order.append(u)
+                for i in range(offsets[u], offsets[u + 1]):
+                    v = targets[i]
+                    reach = level + (1 if graph.is_hub(u) or graph.is_hub(v) else 2)
+                    if v not in distance or reach < distance[v]:
+                        distance[v] = reach
+                        sigma[v] = 0
+                        predecessors[v] = []
+                        while len(levels) <= reach:
+                            levels.append([])
+                        levels[reach].append(v)
+                    # Parallel edges to v are adjacent in u's CSR row, so the
+                    # last predecessor is enough to count u once (hubs can
+                    # have huge predecessor lists)
+                    if distance[v] == reach and (not predecessors[v] or predecessors[v][-1] != u):
+                        sigma[v] += sigma[u]
+                        predecessors[v].append(u)
+            level += 1
+
+        dependency = dict.fromkeys(order, 0.0)
+        for w in reversed(order):
+            # Hubs pass dependency through but are not path endpoints
+            endpoint = 0 if graph.is_hub(w) else 1
+            for u in predecessors[w]:
+                dependency[u] += sigma[u] / sigma[w] * (endpoint + dependency[w])
+            if w != s and not graph.is_hub(w):
+                centrality[w] += dependency[w]
+
+    return {n: value * scale for n, value in centrality.items()}
+
+
+def degree_metrics(graph: RelationshipGraph, n: int) -> Dict[str, Any]:
+    """Degree, weighted degree and per-type degree of one node"""
+    neighbours = set()
+    per_type = {name: set() for name in EDGE_TYPES}
+    hub_degree = dict.fromkeys(EDGE_TYPES, 0)
+    weighted = 0.0
+    for i in range(graph.offsets[n], graph.offsets[n + 1]):
+        v, name = graph.targets[i], EDGE_NAMES[graph.types[i]]
+        if graph.is_hub(v):
+            others = graph.offsets[v + 1] - graph.offsets[v] - 1
+            hub_degree[name] += others
+            weighted += graph.weights[i] * others
+            continue
+        neighbours.add(v)
+        per_type[name].add(v)
+        weighted += graph.weights[i]
+    metrics = {'degree': len(neighbours) + sum(hub_degree.values()), 'weighted_degree': weighted}
+    metrics.update({f"degree_{name}": len(nodes) + hub_degree[name]
+                    for name, nodes in per_type.items()})
+    return metrics
+
+
+def compute_metrics(db_path: str, full: bool = False,
+                    samples: int = BETWEENNESS_SAMPLES) -> Tuple[int, int]:
+    """
+    Recompute metrics for components that changed since the last run.
+
+    Args:
+        db_path: Path to database
+        full: Recompute every component regardless of stored signatures
+        samples: Betweenness source samples per component
+
+    Returns:
+        (components recomputed, components unchanged)
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        create_metrics_table(cursor)
+        graph = RelationshipGraph.from_cursor(cursor)
+
+        cursor.execute("SELECT DISTINCT component_signature FROM character_graph_metrics")
+        stored = set() if full else {row[0] for row in cursor.fetchall()}
+
+        current, recomputed, unchanged = set(), 0, 0
+        now = datetime.now().isoformat(timespec='seconds')
+        columns = ['character_id', 'component_signature', 'component_size'] + METRICS + ['computed_at']
+        insert = f"""
+            INSERT OR REPLACE INTO character_graph_metrics ({', '.join(columns)})
+            VALUES ({', '.join('?' for _ in columns)})
+        """
+
+        for component in graph.connected_components():
+            members = [graph.index[character_id] for character_id in component]
+            signature = component_signature(graph, members)
+            current.add(signature)
+            if signature in stored:
+                unchanged += 1
+                continue
+
+            ranks = pagerank(graph, members)
+            between = sampled_betweenness(graph, members, samples, signature)
+            rows = []
+            for n in members:
+                metrics = degree_metrics(graph, n)
+                metrics.update(pagerank=ranks[n], betweenness=between[n])
+                rows.append((graph.node_ids[n], signature, len(members),
+                             *(metrics[m] for m in METRICS), now))
+            cursor.executemany(insert, rows)
+            recomputed += 1
+
+        # Rows left over from components that no longer exist (merged, split, removed)
+        cursor.execute("SELECT DISTINCT component_signature FROM character_graph_metrics")
+        for (signature,) in cursor.fetchall():
+            if signature not in current:
+                cursor.execute(
+                    "DELETE FROM character_graph_metrics WHERE component_signature = ?",
+                    (signature,)
+                )
+
+        conn.commit()
+        return recomputed, unchanged
+    finally:
+        conn.close()
+
+
+def top_characters(db_path: str, metric: str = 'pagerank', limit: int = 10) -> List[Tuple[str, float]]:
+    """
+    Get the highest-scoring characters for a metric.
+
+    Args:
+        db_path: Path to database
+        metric: One of METRICS
+        limit: Number of characters
+
+    Returns:
+        List of (character_name, score)
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}' (expected one of {', '.join(METRICS)})")
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT COALESCE(c.character_name, m.character_id), m.{metric}
+            FROM character_graph_metrics m
+            LEFT JOIN characters c ON c.character_id = m.character_id
+            ORDER BY m.{metric} DESC
+            LIMIT ?
+        """, (limit,))
+        return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python graph_metrics.py <database_path> [--full] [--samples N]")
+        print("       python graph_metrics.py <database_path> top [metric] [limit]")
+        sys.exit(1)
+
+    db_path = sys.argv[1]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    if len(sys.argv) > 2 and sys.argv[2] == 'top':
+        metric = sys.argv[3] if len(sys.argv) > 3 else 'pagerank'
+        limit = int(sys.argv[4]) if len(sys.argv) > 4 else 10
+        for name, score in top_characters(db_path, metric, limit):
+            print(f"  {score:10.4f}  {name}")
+        return
+
+    samples = BETWEENNESS_SAMPLES
+    if '--samples' in sys.argv:
+        samples = int(sys.argv[sys.argv.index('--samples') + 1])
+    recomputed, unchanged = compute_metrics(db_path, full='--full' in sys.argv, samples=samples)
+    print(f"✓ Recomputed {recomputed} component(s), {unchanged} unchanged")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Fuzzy Identity Matcher
+======================
+Names drift between sources: import_corporate_structure renames people
+(Voss Tarran → Voss Harland), json_importer title-cases snake ids
+("Reika Hyoka Frost" vs "Reika Hyōka Frost"), and an exact
+character_name = ? lookup that misses quietly creates a duplicate row.
+
+IdentityMatcher indexes every known name of every character (the
+name_index variants plus character_aliases when installed) by trigram.
+A query collects candidates from the posting lists of its rarest
+trigrams only (prefix filtering), scores them by trigram Jaccard
+similarity and keeps the best variant per character. A shared surname
+alone is not a match: candidates whose given name (first word) does not
+resemble the query's are dropped, so relatives such as Ayana and Akira
+Miyara never rank against each other, and neither do designations that
+differ only in their numbers (Unit S-11 and Unit S-17). match() turns the ranking into a
+decision:
+
+    exact    the normalized name is a known character_name
+    alias    it is a known codename, alias or other derived name
+    auto     best score >= AUTO_THRESHOLD with as many name parts (a
+             spelling drift, not an added middle name) and clearly ahead
+             of the runner-up
+    review   a plausible near-duplicate exists
+    new      nothing similar is known
+
+Importers build one matcher per run, call match() before creating a
+character and add() after, so duplicates inside a single batch are caught
+too. Only exact and auto are treated as the existing character; alias and
+review hits are still created and listed for review, since distinct
+people can share a codename.
+
+Usage:
+    python identity_matcher.py <database_path> <name> [<name> ...]
+    python identity_matcher.py <database_path> duplicates
+"""
+
+import math
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple
+
+from database_utils import table_exists, table_columns
+from name_index import AMBIGUOUS, NameIndex, normalize_name, name_variants
+
+
+AUTO_THRESHOLD = 0.8
+REVIEW_THRESHOLD = 0.6
+AUTO_MARGIN = 0.15
+GIVEN_THRESHOLD = 0.5
+
+
+def trigrams(key: str) -> List[str]:
+    """
+    Distinct trigrams of a normalized name, padded so word edges count.
+
+    Args:
+        key: Normalized name
+
+    Returns:
+        Sorted list of trigrams
+    """
+    grams = set()
+    for word in key.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return sorted(grams)
+
+
+def given_name(key: str) -> frozenset:
+    """Trigrams of the first word of a normalized name"""
+    return frozenset(trigrams(key.split()[0])) if key else frozenset()
+
+
+def numbers(key: str) -> List[str]:
+    """Digit runs of a normalized name (unit numbers, designations)"""
+    return re.findall(r'\d+', key)
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    """Jaccard similarity of two trigram sets"""
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+class Candidate(NamedTuple):
+    character_id: Any
+    character_name: str
+    matched: str
+    score: float
+
+
+class Match(NamedTuple):
+    status: str                     # exact | alias | auto | review | new
+    character_id: Any               # set for exact, alias and auto
+    candidates: List[Candidate]
+
+
+class IdentityMatcher:
+    """Trigram index over every known name and alias"""
+
+    def __init__(self):
+        self.keys: List[str] = []                    # entry → normalized name
+        self.owners: List[Any] = []                  # entry → character_id
+        self.grams: List[frozenset] = []             # entry → trigrams
+        self.given: List[frozenset] = []             # entry → given-name trigrams
+        self.postings: Dict[str, List[int]] = {}     # trigram → entries
+        self.exact = NameIndex()
+        self.names: Dict[Any, str] = self.exact.names
+        self._seen = set()
+
+    def add(self, name: str, character_id, level: int = 1):
+        """
+        Register a name (or alias) for a character.
+
+        Args:
+            name: Name as written
+            character_id: Owner
+            level: name_index level (0 name, 1 alias/derived); level 2
+                   first-name keys are too weak for fuzzy matching
+        """
+        self.exact.add(name, character_id, level)
+        key = normalize_name(name)
+        if not key or level > 1 or (key, character_id) in self._seen:
+            return
+        self._seen.add((key, character_id))
+        entry = len(self.keys)
+        grams = trigrams(key)
+        self.keys.append(key)
+        self.owners.append(character_id)
+        self.grams.append(frozenset(grams))
+        self.given.append(given_name(key))
+        for gram in grams:
+            self.postings.setdefault(gram, []).append(entry)
+
+    def add_character(self, character_id, character_name: str, **fields):
+        """Register a character row (name plus codename/aliases/kanji if given)"""
+        self.names[character_id] = character_name
+        for variant, level in name_variants({'character_name': character_name, **fields}):
+            self.add(variant, character_id, level)
+
+    @classmethod
+    def from_cursor(cls, cursor, key: str = 'character_id') -> 'IdentityMatcher':
+        """
+        Build the matcher from the characters (and character_aliases) tables.
+
+        Args:
+            cursor: Database cursor
+            key: Column identifying a character. Importers pass 'rowid':
+                 Phase 5 rows they create have no character_id, and
+                 cursor.lastrowid is then the key of a new row.
+        """
+        matcher = cls()
+        columns = [c for c in ('codename', 'aliases', 'kanji')
+                   if c in table_columns(cursor, 'characters')]
+        cursor.execute(f"SELECT {key}, {', '.join(['character_name'] + columns)} FROM characters")
+        for character_id, name, *values in cursor.fetchall():
+            matcher.add_character(character_id, name or '', **dict(zip(columns, values)))
+        if table_exists(cursor, 'character_aliases'):
+            if key == 'character_id':
+                cursor.execute("SELECT character_id, alias FROM character_aliases")
+            else:
+                cursor.execute(f"""
+                    SELECT c.{key}, a.alias FROM character_aliases a
+                    JOIN characters c ON c.character_id = a.character_id
+                """)
+            for character_id, alias in cursor.fetchall():
+                matcher.add(alias, character_id)
+        return matcher
+
+    @classmethod
+    def load(cls, db_path: str) -> 'IdentityMatcher':
+        """Build the matcher for a database"""
+        conn = sqlite3.connect(db_path)
+        try:
+            return cls.from_cursor(conn.cursor())
+        finally:
+            conn.close()
+
+    # ──────────────────────────────────────────────────────────
+    # Matching
+    # ──────────────────────────────────────────────────────────
+
+    def candidates(self, name: str, limit: int = 5,
+                   min_score: float = REVIEW_THRESHOLD) -> List[Candidate]:
+        """
+        Ranked characters whose known names resemble `name` and whose given
+        name resembles its given name.
+
+        Args:
+            name: Incoming name
+            limit: Maximum candidates
+            min_score: Minimum trigram Jaccard similarity (0..1)
+
+        Returns:
+            Candidates, best first, one per character
+        """
+        key = normalize_name(name)
+        grams = frozenset(trigrams(key))
+        if not grams:
+            return []
+        given = given_name(key)
+        digits = numbers(key)
+        size = len(grams)
+
+        # Jaccard >= t needs overlap >= t * |query|, so an entry must share at
+        # least one of the (|query| - needed + 1) rarest trigrams; entries
+        # outside |query| * t .. |query| / t trigrams cannot qualify either
+        needed = max(1, math.ceil(min_score * size - 1e-9))
+        rarest = sorted(grams, key=lambda g: len(self.postings.get(g, ())))[:size - needed + 1]
+        low, high = min_score * size, size / min_score if min_score else float('inf')
+        seen = set()
+        best: Dict[Any, Candidate] = {}
+        for gram in rarest:
+            for entry in self.postings.get(gram, ()):
+                if entry in seen:
+                    continue
+                seen.add(entry)
+                entry_grams = self.grams[entry]
+                if not low <= len(entry_grams) <= high:
+                    continue
+                overlap = len(grams & entry_grams)
+                score = overlap / (size + len(entry_grams) - overlap)
+                if score < min_score or jaccard(given, self.given[entry]) < GIVEN_THRESHOLD:
+                    continue
+                if numbers(self.keys[entry]) != digits:
+                    continue
+                owner = self.owners[entry]
+                if owner not in best or score > best[owner].score:
+                    best[owner] = Candidate(owner, self.names.get(owner, self.keys[entry]),
+                                            self.keys[entry], round(score, 3))
+        return sorted(best.values(), key=lambda c: (-c.score, str(c.character_id)))[:limit]
+
+    def match(self, name: str, limit: int = 5) -> Match:
+        """
+        Decide whether an incoming name is a known character.
+
+        Args:
+            name: Incoming name
+            limit: Candidates to keep for review
+
+        Returns:
+            Match(status, character_id, candidates)
+        """
+        key = normalize_name(name)
+        candidates = self.candidates(name, limit)
+        for status, level in zip(('exact', 'alias'), self.exact.levels[:2]):
+            if key in level:
+                owner = level[key]
+                if owner is AMBIGUOUS:
+                    return Match('review', None, candidates)
+                return Match(status, owner, candidates)
+        if not candidates:
+            return Match('new', None, [])
+        top = candidates[0]
+        runner_up = candidates[1].score if len(candidates) > 1 else 0.0
+        if (top.score >= AUTO_THRESHOLD and top.score - runner_up >= AUTO_MARGIN
+                and len(top.matched.split()) == len(key.split())):
+            return Match('auto', top.character_id, candidates)
+        return Match('review', None, candidates)
+
+    def reconcile(self, names: Iterable[str]) -> Dict[str, Match]:
+        """
+        Match a batch of names.
+
+        Args:
+            names: Incoming names
+
+        Returns:
+            Dictionary of name → Match
+        """
+        return {name: self.match(name) for name in names}
+
+    def duplicates(self, min_score: float = AUTO_THRESHOLD) -> List[tuple]:
+        """
+        Pairs of existing characters whose names look like the same person.
+
+        Returns:
+            List of (character_id, other_character_id, score), best first
+        """
+        pairs = {}
+        for character_id, name in self.names.items():
+            for candidate in self.candidates(name, limit=10, min_score=min_score):
+                if candidate.character_id == character_id:
+                    continue
+                pair = tuple(sorted((character_id, candidate.character_id), key=str))
+                pairs[pair] = max(pairs.get(pair, 0), candidate.score)
+        return sorted(((a, b, s) for (a, b), s in pairs.items()), key=lambda p: -p[2])
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python identity_matcher.py <database_path> <name> [<name> ...]")
+        print("       python identity_matcher.py <database_path> duplicates")
+        sys.exit(1)
+
+    db_path = sys.argv[1]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    matcher = IdentityMatcher.load(db_path)
+
+    if sys.argv[2:] == ['duplicates']:
+        for a, b, score in matcher.duplicates():
+            print(f"  ⚠ {matcher.names[a]} ({a}) ≈ {matcher.names[b]} ({b}) — {score:.2f}")
+        return
+
+    for name in sys.argv[2:]:
+        result = matcher.match(name)
+        if result.status in ('exact', 'alias', 'auto'):
+            print(f"  ✓ {name} → {matcher.names[result.character_id]} ({result.status})")
+        elif result.status == 'review':
+            print(f"  ⚠ {name}: review — " + ", ".join(
+                f"{c.character_name} {c.score:.2f}" for c in result.candidates))
+        else:
+            print(f"  ✗ {name}: new")
+
+
+if __name__ == "__main__":
+    main()
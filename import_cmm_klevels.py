@@ -17,11 +17,13 @@ Example:
     python import_cmm_klevels.py universe.db ./data
 """
 
-import sqlite3
 import csv
 import sys
 from pathlib import Path
 
+from database_utils import begin_write, connect
+from identity_matcher import IdentityMatcher
+
 
 def read_csv_file(csv_path):
     """Read CSV file and return list of dictionaries"""
@@ -33,7 +35,8 @@ def read_csv_file(csv_path):
 def update_cmm_klevels(db_path, csv_dir):
     """Import CMM k-level system from CSV files"""
     
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path, 'concurrent')
+    begin_write(conn)
     cursor = conn.cursor()
     
     csv_dir = Path(csv_dir)
@@ -100,6 +103,9 @@ def update_cmm_klevels(db_path, csv_dir):
     imported = 0
     updated = 0
     skipped = 0
+    flagged = []
+    # Keyed by rowid: rows the importers create have no character_id
+    matcher = IdentityMatcher.from_cursor(cursor, key='rowid')
     
     for identity in identities:
         identity_id = identity['id']
@@ -131,17 +137,29 @@ def update_cmm_klevels(db_path, csv_dir):
         if command_priority:
             print(f"   Command Priority: {command_priority}")
         
-        # Check if character exists
-        cursor.execute("SELECT character_id FROM characters WHERE character_name = ?", (name,))
-        existing = cursor.fetchone()
+        # Check if character exists (exact name or a clear drifted spelling)
+        match = matcher.match(name)
+        existing = None
+        if match.status in ('exact', 'auto'):
+            cursor.execute("SELECT character_id, character_secrets FROM characters WHERE rowid = ?",
+                           (match.character_id,))
+            existing = cursor.fetchone()
+        elif match.status == 'alias':
+            flagged.append(f"{name} shares a codename/alias with {matcher.names[match.character_id]}")
+            print(f"   ⚠ Shares a codename/alias with {matcher.names[match.character_id]} - flagged for review")
+        elif match.status == 'review':
+            near = ", ".join(f"{c.character_name} ({c.score:.2f})" for c in match.candidates)
+            flagged.append(f"{name} ≈ {near}")
+            print(f"   ⚠ Near-duplicate of {near} - flagged for review")
         
         if existing:
-            char_id = existing[0]
-            print(f"   ℹ Character exists (ID: {char_id}) - Updating...")
+            # Affiliations are keyed by character_id, or by rowid for rows
+            # created without one (as below)
+            char_id = existing[0] if existing[0] is not None else match.character_id
+            print(f"   ℹ Character exists (ID: {char_id}, {matcher.names[match.character_id]}) - Updating...")
             
             # Build character_secrets JSON
-            cursor.execute("SELECT character_secrets FROM characters WHERE character_id = ?", (char_id,))
-            existing_secrets = cursor.fetchone()[0]
+            existing_secrets = existing[1]
             
             import json
             if existing_secrets:
@@ -168,8 +186,8 @@ def update_cmm_klevels(db_path, csv_dir):
                     primary_role = ?,
                     status = ?,
                     character_secrets = ?
-                WHERE character_id = ?
-            """, (codename, faction, role, status, json.dumps(secrets_dict), char_id))
+                WHERE rowid = ?
+            """, (codename, faction, role, status, json.dumps(secrets_dict), match.character_id))
             
             updated += 1
             print(f"   ✓ Updated character")
@@ -199,6 +217,7 @@ def update_cmm_klevels(db_path, csv_dir):
             """, (name, codename, faction, role, status, json.dumps(secrets_dict)))
             
             char_id = cursor.lastrowid
+            matcher.add_character(char_id, name, codename=codename)
             imported += 1
             print(f"   ✓ Created character (ID: {char_id})")
         
@@ -279,6 +298,11 @@ def update_cmm_klevels(db_path, csv_dir):
     for klevel, count in klevel_counts:
         print(f"      K{klevel}: {count}")
     
+    if flagged:
+        print("\n⚠ Imported, but flagged for review:")
+        for entry in flagged:
+            print(f"   • {entry}")
+    
     conn.close()
     return True
 
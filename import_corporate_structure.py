@@ -14,12 +14,14 @@ Example:
     python import_corporate_structure.py universe.db corporate_structure_all.csv
 """
 
-import sqlite3
 import csv
 import sys
 import json
 from pathlib import Path
 
+from database_utils import begin_write, connect
+from identity_matcher import IdentityMatcher
+
 
 def read_csv_file(csv_path):
     """Read CSV file and return list of dictionaries"""
@@ -31,7 +33,8 @@ def read_csv_file(csv_path):
 def reconcile_names(db_path, csv_path):
     """Reconcile character names and import corporate structure"""
     
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path, 'concurrent')
+    begin_write(conn)
     cursor = conn.cursor()
     
     print("=" * 70)
@@ -148,6 +151,9 @@ def reconcile_names(db_path, csv_path):
     print()
     
     position_count = 0
+    flagged = []
+    # Keyed by rowid: rows the importers create have no character_id
+    matcher = IdentityMatcher.from_cursor(cursor, key='rowid')
     
     for entry in corp_data:
         name = entry['Name']
@@ -189,15 +195,33 @@ def reconcile_names(db_path, csv_path):
         print(f"\n📋 {name}")
         print(f"   Position: {position}")
         
-        # Find character
-        cursor.execute("SELECT character_id FROM characters WHERE character_name = ?", (name,))
-        result = cursor.fetchone()
+        # Find character (exact name or a clear drifted spelling)
+        match = matcher.match(name)
+        
+        if match.status == 'alias':
+            print(f"   ⚠ Shares a codename/alias with {matcher.names[match.character_id]} - needs review")
+            flagged.append(f"{name} shares a codename/alias with {matcher.names[match.character_id]}")
+            continue
         
-        if not result:
+        if match.status == 'review':
+            near = ", ".join(f"{c.character_name} ({c.score:.2f})" for c in match.candidates)
+            print(f"   ⚠ Near match only: {near} - needs review")
+            flagged.append(f"{name} ≈ {near}")
+            continue
+        
+        if match.character_id is None:
             print(f"   ⚠ Character not found in database")
             continue
         
-        char_id = result[0]
+        if match.status == 'auto':
+            print(f"   ℹ Matched as {matcher.names[match.character_id]}")
+        
+        # Affiliations are keyed by character_id, or by rowid for rows
+        # created without one
+        cursor.execute("SELECT character_id FROM characters WHERE rowid = ?", (match.character_id,))
+        char_id = cursor.fetchone()[0]
+        if char_id is None:
+            char_id = match.character_id
         
         # Update or create affiliation with position
         cursor.execute("""
@@ -242,6 +266,11 @@ def reconcile_names(db_path, csv_path):
     print(f"   Names Reconciled:         {updated_count}")
     print(f"   Corporate Positions Set:  {position_count}")
     
+    if flagged:
+        print("\n   ⚠ Matches flagged for review:")
+        for near in flagged:
+            print(f"      • {near}")
+    
     # Show Nexus Enraenra structure
     print("\n   Nexus Enraenra Public Structure:")
     cursor.execute("""
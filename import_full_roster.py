@@ -10,11 +10,13 @@ Imports ALL 30 characters from identifiers_delta04_full_canon.json
 Author: Phase 5B Full Import
 """
 
-import sqlite3
 import json
 import sys
 from pathlib import Path
 
+from database_utils import begin_write, connect
+from identity_matcher import IdentityMatcher
+
 
 def title_case_name(name: str) -> str:
     """Convert lowercase name to Title Case"""
@@ -24,7 +26,8 @@ def title_case_name(name: str) -> str:
 def import_full_roster(db_path: str, json_path: str):
     """Import all 30 characters from JSON"""
     
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path, 'concurrent')
+    begin_write(conn)
     cursor = conn.cursor()
     
     print("📥 Phase 5B: Importing Full 30-Character Roster\n")
@@ -76,6 +79,9 @@ def import_full_roster(db_path: str, json_path: str):
     imported = 0
     updated = 0
     skipped = 0
+    flagged = []
+    # Keyed by rowid: rows this importer creates have no character_id
+    matcher = IdentityMatcher.from_cursor(cursor, key='rowid')
     
     print("=" * 70)
     
@@ -105,17 +111,29 @@ def import_full_roster(db_path: str, json_path: str):
         print(f"\n📝 Processing: {name} ({codename})")
         print(f"   Faction: {faction} | Role: {role} | Status: {status}")
         
-        # Check if character exists
-        cursor.execute("SELECT character_id FROM characters WHERE character_name = ?", (name,))
-        existing = cursor.fetchone()
+        # Check if character exists (exact name or a clear drifted spelling)
+        match = matcher.match(name)
+        existing = None
+        if match.status in ('exact', 'auto'):
+            cursor.execute("SELECT character_id, character_secrets FROM characters WHERE rowid = ?",
+                           (match.character_id,))
+            existing = cursor.fetchone()
+        elif match.status == 'alias':
+            flagged.append(f"{name} shares a codename/alias with {matcher.names[match.character_id]}")
+            print(f"   ⚠ Shares a codename/alias with {matcher.names[match.character_id]} - flagged for review")
+        elif match.status == 'review':
+            near = ", ".join(f"{c.character_name} ({c.score:.2f})" for c in match.candidates)
+            flagged.append(f"{name} ≈ {near}")
+            print(f"   ⚠ Near-duplicate of {near} - flagged for review")
         
         if existing:
-            char_id = existing[0]
-            print(f"   ℹ Character exists (ID: {char_id}) - Updating...")
+            # Affiliations are keyed by character_id, or by rowid for rows
+            # created without one (as below)
+            char_id = existing[0] if existing[0] is not None else match.character_id
+            print(f"   ℹ Character exists (ID: {char_id}, {matcher.names[match.character_id]}) - Updating...")
             
             # Get existing secrets and merge with new data
-            cursor.execute("SELECT character_secrets FROM characters WHERE character_id = ?", (char_id,))
-            existing_secrets = cursor.fetchone()[0]
+            existing_secrets = existing[1]
             
             if existing_secrets:
                 try:
@@ -138,8 +156,8 @@ def import_full_roster(db_path: str, json_path: str):
                     primary_role = ?,
                     status = ?,
                     character_secrets = ?
-                WHERE character_id = ?
-            """, (codename, faction, role, status, json.dumps(secrets_dict), char_id))
+                WHERE rowid = ?
+            """, (codename, faction, role, status, json.dumps(secrets_dict), match.character_id))
             
             updated += 1
             print(f"   ✓ Updated existing character")
@@ -167,6 +185,7 @@ def import_full_roster(db_path: str, json_path: str):
             ))
             
             char_id = cursor.lastrowid
+            matcher.add_character(char_id, name, codename=codename)
             imported += 1
             print(f"   ✓ Created character (ID: {char_id})")
         
@@ -263,6 +282,11 @@ def import_full_roster(db_path: str, json_path: str):
     print(f"   Unknown Faction:       {unknown_count}")
     print(f"   Total Affiliations:    {total_affiliations}")
     
+    if flagged:
+        print("\n⚠ Imported, but flagged for review:")
+        for entry in flagged:
+            print(f"   • {entry}")
+    
     conn.close()
     return True
 
@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 """Shadow Core Resonance System Import"""
-import sqlite3, csv, sys, json
+import csv, sys, json
 from pathlib import Path
 
+from database_utils import begin_write, connect
+from identity_matcher import IdentityMatcher
+
 def read_csv(path):
     with open(path, 'r', encoding='utf-8') as f:
         return list(csv.DictReader(f))
@@ -13,7 +16,8 @@ def main():
         sys.exit(1)
     
     db_path, csv_dir = sys.argv[1], Path(sys.argv[2])
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path, 'concurrent')
+    begin_write(conn)
     cursor = conn.cursor()
     
     print("=" * 70)
@@ -36,6 +40,10 @@ def main():
     # Create Sigil lookup
     sigils_by_bearer = {s['bearer_id']: s for s in sigils}
     
+    # Keyed by rowid: rows the importers create have no character_id
+    matcher = IdentityMatcher.from_cursor(cursor, key='rowid')
+    flagged = []
+    
     # Process holders
     for h in holders:
         holder_id = h['holder_id']
@@ -55,14 +63,28 @@ def main():
             print(f"   Sigil: {sigil.get('id')} ({sigil.get('kanji')})")
             print(f"   Aspect: {sigil.get('aspect')}")
         
-        # Update character
-        cursor.execute("SELECT character_id, character_secrets FROM characters WHERE character_name = ?", (name,))
-        result = cursor.fetchone()
-        if not result:
+        # Update character (exact name or a clear drifted spelling)
+        match = matcher.match(name)
+        if match.status == 'alias':
+            flagged.append(f"{name} shares a codename/alias with {matcher.names[match.character_id]}")
+            print(f"   ⚠ Shares a codename/alias with {matcher.names[match.character_id]} - flagged for review\n")
+            continue
+        if match.status == 'review':
+            near = ", ".join(f"{c.character_name} ({c.score:.2f})" for c in match.candidates)
+            flagged.append(f"{name} ≈ {near}")
+            print(f"   ⚠ Near-duplicate of {near} - flagged for review\n")
+            continue
+        if match.status == 'new':
             print(f"   ⚠ Not found - run Phase 5B first\n")
             continue
         
-        char_id, secrets = result
+        cursor.execute("SELECT character_id, character_secrets FROM characters WHERE rowid = ?",
+                       (match.character_id,))
+        char_id, secrets = cursor.fetchone()
+        # Affiliations are keyed by character_id, or by rowid for rows
+        # created without one
+        if char_id is None:
+            char_id = match.character_id
         secrets_dict = json.loads(secrets) if secrets else {}
         
         # Add RRL + Sigil data
@@ -82,8 +104,8 @@ def main():
                 'curse': sigil.get('curse')
             }
         
-        cursor.execute("UPDATE characters SET character_secrets = ? WHERE character_id = ?",
-                      (json.dumps(secrets_dict), char_id))
+        cursor.execute("UPDATE characters SET character_secrets = ? WHERE rowid = ?",
+                      (json.dumps(secrets_dict), match.character_id))
         
         # Update affiliation
         cursor.execute("UPDATE character_corporate_affiliations SET clearance_level = ? WHERE character_id = ?",
@@ -92,6 +114,11 @@ def main():
         print(f"   ✓ Updated\n")
     
     conn.commit()
+    if flagged:
+        print("⚠ Not updated, flagged for review:")
+        for entry in flagged:
+            print(f"   • {entry}")
+        print()
     print("=" * 70)
     print("✅ COMPLETE!")
     print("=" * 70)
@@ -18,6 +18,9 @@ import sys
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from database_utils import begin_write, connect
+from identity_matcher import IdentityMatcher
+
 
 class CharacterImporter:
     """Imports characters from JSON into database"""
@@ -43,14 +46,17 @@ class CharacterImporter:
         self.skipped_count = 0
         self.error_count = 0
         self.errors = []
+        self.flagged = []
+        self.matcher = None
         
     def connect(self):
         """Connect to database"""
         try:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row
+            self.conn = connect(self.db_path, 'concurrent', row_factory=sqlite3.Row)
             self.cursor = self.conn.cursor()
             self.cursor.execute("PRAGMA foreign_keys = ON")
+            # Keyed by rowid: rows this importer creates have no character_id
+            self.matcher = IdentityMatcher.from_cursor(self.cursor, key='rowid')
             print(f"✓ Connected to database: {self.db_path}")
             return True
         except sqlite3.Error as e:
@@ -74,14 +80,6 @@ class CharacterImporter:
             print(f"✗ Error loading JSON: {e}")
             return False
     
-    def character_exists(self, name: str) -> bool:
-        """Check if character already exists"""
-        self.cursor.execute(
-            "SELECT character_id FROM characters WHERE character_name = ?",
-            (name,)
-        )
-        return self.cursor.fetchone() is not None
-    
     def get_corporation_id(self, corp_name: str) -> Optional[int]:
         """Get corporation ID by name"""
         self.cursor.execute(
@@ -118,11 +116,20 @@ class CharacterImporter:
                 self.skipped_count += 1
                 return False
             
-            # Check if already exists
-            if self.character_exists(name):
-                print(f"  ⚠ Skipping {name} (already exists)")
+            # Check if already exists, under this or a drifted spelling
+            match = self.matcher.match(name)
+            if match.status in ('exact', 'auto'):
+                existing = self.matcher.names.get(match.character_id, name)
+                suffix = "" if existing == name else f" as {existing}"
+                print(f"  ⚠ Skipping {name} (already exists{suffix})")
                 self.skipped_count += 1
                 return False
+            if match.status == 'alias':
+                self.flagged.append(
+                    f"{name} shares a codename/alias with {self.matcher.names[match.character_id]}")
+            elif match.status == 'review':
+                near = ", ".join(f"{c.character_name} ({c.score:.2f})" for c in match.candidates)
+                self.flagged.append(f"{name} ≈ {near}")
             
             # Build character fields
             character_fields = {
@@ -165,6 +172,8 @@ class CharacterImporter:
             
             self.cursor.execute(query, values)
             character_id = self.cursor.lastrowid
+            self.matcher.add_character(character_id, name, codename=character_fields['codename'],
+                                       aliases=character_fields['aliases'])
             
             # Add corporate affiliation if faction maps to corporation
             corp_name = self.map_faction_to_corporation(character_fields['faction'])
@@ -215,6 +224,9 @@ class CharacterImporter:
         
         print(f"Found {len(characters_to_import)}/{len(names)} characters in JSON\n")
         
+        if not preview:
+            begin_write(self.conn)
+        
         # Import each character
         for char_data in characters_to_import:
             self.import_character(char_data, preview_only=preview)
@@ -232,6 +244,9 @@ class CharacterImporter:
             print("IMPORTING ALL CHARACTERS")
         print("="*60 + "\n")
         
+        if not preview:
+            begin_write(self.conn)
+        
         for identity in self.data['identities']:
             self.import_character(identity, preview_only=preview)
         
@@ -248,6 +263,11 @@ class CharacterImporter:
         print(f"⚠ Skipped:  {self.skipped_count}")
         print(f"✗ Errors:   {self.error_count}")
         
+        if self.flagged:
+            print("\nImported, but flagged for review:")
+            for flagged in self.flagged:
+                print(f"  • {flagged}")
+        
         if self.errors:
             print("\nErrors:")
             for error in self.errors:
@@ -19,6 +19,8 @@ Default: universe.db
 import subprocess
 import sys
 
+from database_utils import checkpoint
+
 
 def run_step(description, script_name, *args):
     """Run a Python script and report results"""
@@ -58,6 +60,8 @@ def main():
     ):
         print("\n✗ Failed to add corporations")
         return 1
+    # The importers write in WAL mode; fold the step's WAL back into the file
+    checkpoint(db_path, 'TRUNCATE')
     
     # Step 2: Import characters (this will prompt for confirmation)
     print(f"\n{'='*60}")
@@ -72,6 +76,7 @@ def main():
     if result.returncode != 0:
         print("\n✗ Character import cancelled or failed")
         return 1
+    checkpoint(db_path, 'TRUNCATE')
     
     # Step 3: Apply adjustments
     if not run_step(
@@ -81,6 +86,7 @@ def main():
     ):
         print("\n✗ Failed to apply adjustments")
         return 1
+    checkpoint(db_path, 'TRUNCATE')
     
     # Step 4: Verify results
     print(f"\n{'='*60}")
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Character Name / Alias Index
+=============================
+Lore tables refer to people by free text: "Reika Hyōka Frost", "Reika",
+"Shion", "Aaster Mythril‑Hoshitsuzuri" (with a non-breaking hyphen), a
+codename or kanji. This module builds one lookup from every way a
+character is named in the characters table to their character_id.
+
+Keys are normalized (accents folded, case folded, dash variants unified,
+underscores and whitespace collapsed) and tried in three levels: the
+character_name itself, then derived names (parenthetical-stripped names,
+codenames, aliases, kanji), then a bare first name. Within a level a key
+that points at more than one character is ambiguous and never guessed.
+
+Usage:
+    python name_index.py <database_path> <name> [<name> ...]
+"""
+
+import re
+import sqlite3
+import sys
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from database_utils import table_columns
+
+
+DASHES = re.compile(r'[‐‑‒–—−]')
+PARENTHETICAL = re.compile(r'\s*\(([^)]*)\)\s*')
+AMBIGUOUS = object()
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize a name for lookup.
+
+    Args:
+        name: Raw name text
+
+    Returns:
+        Accent-folded, case-folded name with unified dashes, underscores
+        read as spaces, and single spaces
+    """
+    folded = unicodedata.normalize('NFKD', DASHES.sub('-', name).replace('_', ' '))
+    folded = ''.join(ch for ch in folded if not unicodedata.combining(ch))
+    return ' '.join(folded.casefold().split())
+
+
+def name_variants(row: Dict[str, Optional[str]]) -> Iterator[Tuple[str, int]]:
+    """
+    Yield (name, level) for every way a characters row can be referenced.
+
+    Level 0 is the character_name itself, 1 a derived strong key (bare name,
+    parenthetical, codename, kanji, alias) and 2 a weak first-name key.
+
+    Args:
+        row: Dictionary with character_name and optionally codename, aliases, kanji
+    """
+    name = row.get('character_name') or ''
+    yield name, 0
+
+    bare = PARENTHETICAL.sub(' ', name).strip()
+    if bare != name:
+        yield bare, 1
+    for inner in PARENTHETICAL.findall(name):
+        yield inner, 1
+
+    if row.get('codename'):
+        yield row['codename'], 1
+    if row.get('kanji'):
+        yield row['kanji'], 1
+    for alias in (row.get('aliases') or '').split(','):
+        if alias.strip():
+            yield alias.strip(), 1
+
+    parts = normalize_name(bare).split()
+    if len(parts) > 1:
+        yield parts[0], 2
+
+
+class NameIndex:
+    """Normalized name → character_id lookup"""
+
+    LEVELS = 3
+
+    def __init__(self):
+        self.levels: List[Dict[str, Any]] = [{} for _ in range(self.LEVELS)]
+        self.names: Dict[Any, str] = {}
+
+    def add(self, name: str, character_id, level: int = 1):
+        """Register a name for a character; a key claimed by two characters is dropped"""
+        key = normalize_name(name)
+        if not key:
+            return
+        keys = self.levels[level]
+        if key in keys and keys[key] not in (character_id, AMBIGUOUS):
+            keys[key] = AMBIGUOUS
+        elif key not in keys:
+            keys[key] = character_id
+
+    @classmethod
+    def from_cursor(cls, cursor) -> 'NameIndex':
+        """Build the index from the characters table"""
+        index = cls()
+        columns = [c for c in ('character_name', 'codename', 'aliases', 'kanji')
+                   if c in table_columns(cursor, 'characters')]
+        if not columns:
+            return index
+
+        cursor.execute(f"SELECT character_id, {', '.join(columns)} FROM characters")
+        for character_id, *values in cursor.fetchall():
+            row = dict(zip(columns, values))
+            index.names[character_id] = row['character_name']
+            for variant, level in name_variants(row):
+                index.add(variant, character_id, level)
+        return index
+
+    def resolve(self, name: str):
+        """
+        Resolve a free-text name to a character_id.
+
+        Args:
+            name: Name, alias, codename, kanji or unique first name
+
+        Returns:
+            character_id, or None if unknown or ambiguous
+        """
+        keys = [normalize_name(name), normalize_name(PARENTHETICAL.sub(' ', name))]
+        for level in self.levels:
+            for key in keys:
+                if key in level:
+                    found = level[key]
+                    return None if found is AMBIGUOUS else found
+        return None
+
+    def __len__(self) -> int:
+        return sum(len(level) for level in self.levels)
+
+
+def load_name_index(db_path: str) -> NameIndex:
+    """
+    Build a name index for a database.
+
+    Args:
+        db_path: Path to database
+
+    Returns:
+        NameIndex
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        return NameIndex.from_cursor(conn.cursor())
+    finally:
+        conn.close()
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python name_index.py <database_path> <name> [<name> ...]")
+        sys.exit(1)
+
+    db_path = sys.argv[1]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    index = load_name_index(db_path)
+    for name in sys.argv[2:]:
+        character_id = index.resolve(name)
+        if character_id is None:
+            print(f"  ✗ {name}: unresolved")
+        else:
+            print(f"  ✓ {name} → {index.names[character_id]} (id {character_id})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Character Palette Index
+=======================
+Art direction keeps asking "whose palette is close to #00FFFF?" and
+"which members of a faction clash?". The hex colors live as text in
+characters.primary_color / accent_color (Phase 5 schema) or inside
+character_secrets['colors'] (json_importer), so every answer used to be a
+full scan plus hex parsing.
+
+This module converts each palette color to CIE L*a*b* (sRGB, D65) and stores
+it numerically:
+
+    character_palette   (character_rowid, role) → hex, lab_l, lab_a, lab_b
+
+import_palettes() only re-converts colors whose hex changed. PaletteIndex
+loads the Lab points into a 3-d tree, so nearest_palette(hex, k) and radius
+searches cost O(log n) node visits; distances are CIE76 ΔE (Euclidean in
+Lab, ~2.3 is a just-noticeable difference).
+
+Usage:
+    python palette_index.py <database_path> import
+    python palette_index.py <database_path> near <hex> [k]
+    python palette_index.py <database_path> clashes <faction> [delta_e]
+"""
+
+import heapq
+import math
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from database_utils import table_columns, table_exists
+
+
+ROLES = ['primary', 'accent']
+CLASH_DELTA_E = 10.0
+
+# D65 reference white
+WHITE = (0.95047, 1.0, 1.08883)
+
+
+def parse_hex(value: Optional[str]) -> Optional[Tuple[int, int, int]]:
+    """
+    Parse '#RGB', '#RRGGBB' (with or without '#').
+
+    Returns:
+        (r, g, b) in 0..255, or None if not a hex color
+    """
+    if not value:
+        return None
+    text = value.strip().lstrip('#')
+    if len(text) == 3:
+        text = ''.join(ch * 2 for ch in text)
+    if len(text) != 6:
+        return None
+    try:
+        return int(text[0:2], 16), int(text[2:4], 16), int(text[4:6], 16)
+    except ValueError:
+        return None
+
+
+def rgb_to_lab(rgb: Tuple[int, int, int]) -> Tuple[float, float, float]:
+    """Convert 8-bit sRGB to CIE L*a*b* (D65)"""
+    def linear(channel):
+        c = channel / 255.0
+        return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+
+    r, g, b = (linear(c) for c in rgb)
+    xyz = (
+        0.4124564 * r + 0.3575761 * g + 0.1804375 * b,
+        0.2126729 * r + 0.7151522 * g + 0.0721750 * b,
+        0.0193339 * r + 0.1191920 * g + 0.9503041 * b,
+    )
+
+    def f(t):
+        return t ** (1 / 3) if t > (6 / 29) ** 3 else t / (3 * (6 / 29) ** 2) + 4 / 29
+
+    fx, fy, fz = (f(v / w) for v, w in zip(xyz, WHITE))
+    return 116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)
+
+
+def hex_to_lab(value: str) -> Optional[Tuple[float, float, float]]:
+    """Convert a hex color to Lab, or None if unparseable"""
+    rgb = parse_hex(value)
+    return rgb_to_lab(rgb) if rgb else None
+
+
+def delta_e(p: Tuple[float, float, float], q: Tuple[float, float, float]) -> float:
+    """CIE76 color difference"""
+    return math.sqrt((p[0] - q[0]) ** 2 + (p[1] - q[1]) ** 2 + (p[2] - q[2]) ** 2)
+
+
+def create_palette_table(cursor):
+    """Create the character_palette table"""
+    # Keyed by the characters rowid: Phase 5 rows are imported without a
+    # character_id. Palettes stored under the old key are rebuilt.
+    if table_exists(cursor, 'character_palette') and \
+            'character_rowid' not in table_columns(cursor, 'character_palette'):
+        cursor.execute("DROP TABLE character_palette")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS character_palette (
+            character_rowid INTEGER NOT NULL,
+            role TEXT NOT NULL,
+            hex TEXT NOT NULL,
+            lab_l REAL NOT NULL,
+            lab_a REAL NOT NULL,
+            lab_b REAL NOT NULL,
+            PRIMARY KEY (character_rowid, role)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_character_palette_hex ON character_palette(hex)")
+
+
+def _source_colors(cursor) -> Dict[Tuple[Any, str], str]:
+    """(character_rowid, role) → hex, columns first, character_secrets as fallback"""
+    columns = table_columns(cursor, 'characters')
+    expressions = []
+    for role in ROLES:
+        secret = (f"CASE WHEN json_valid(character_secrets) "
+                  f"THEN json_extract(character_secrets, '$.colors.{role}') END"
+                  if 'character_secrets' in columns else 'NULL')
+        column = f"NULLIF({role}_color, '')" if f"{role}_color" in columns else 'NULL'
+        expressions.append(f"COALESCE({column}, {secret})")
+    cursor.execute(f"SELECT rowid, {', '.join(expressions)} FROM characters")
+    colors = {}
+    for rowid, *values in cursor.fetchall():
+        for role, value in zip(ROLES, values):
+            if parse_hex(value):
+                colors[(rowid, role)] = value.strip().upper()
+    return colors
+
+
+def import_palettes(db_path: str) -> Dict[str, int]:
+    """
+    Convert new or changed palette colors to Lab and drop stale ones.
+
+    Args:
+        db_path: Path to database
+
+    Returns:
+        Dictionary with converted, unchanged and removed counts
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        create_palette_table(cursor)
+        colors = _source_colors(cursor)
+        cursor.execute("SELECT character_rowid, role, hex FROM character_palette")
+        stored = {(rowid, role): value for rowid, role, value in cursor.fetchall()}
+
+        removed = [key for key in stored if key not in colors]
+        changed = [(key, value) for key, value in colors.items() if stored.get(key) != value]
+        cursor.executemany("DELETE FROM character_palette WHERE character_rowid = ? AND role = ?", removed)
+        cursor.executemany("""
+            INSERT OR REPLACE INTO character_palette (character_rowid, role, hex, lab_l, lab_a, lab_b)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [(rowid, role, value, *hex_to_lab(value)) for (rowid, role), value in changed])
+        conn.commit()
+        return {'converted': len(changed), 'unchanged': len(colors) - len(changed), 'removed': len(removed)}
+    finally:
+        conn.close()
+
+
+class KDTree:
+    """Static 3-d tree over Lab points (implicit, stored as a permuted array)"""
+
+    def __init__(self, points: List[Tuple[float, float, float]]):
+        self.points = points
+        self.order = list(range(len(points)))
+        self._build(0, len(points), 0)
+
+    def _build(self, lo: int, hi: int, axis: int):
+        # Iterative median split: each node is the middle element of its range
+        stack = [(lo, hi, axis)]
+        while stack:
+            lo, hi, axis = stack.pop()
+            if hi - lo <= 1:
+                continue
+            self.order[lo:hi] = sorted(self.order[lo:hi], key=lambda i: self.points[i][axis])
+            mid = (lo + hi) // 2
+            stack.append((lo, mid, (axis + 1) % 3))
+            stack.append((mid + 1, hi, (axis + 1) % 3))
+
+    def nearest(self, target: Tuple[float, float, float], k: int,
+                accept=None) -> List[Tuple[float, int]]:
+        """
+        k nearest points.
+
+        Args:
+            target: Lab point
+            k: Number of neighbours
+            accept: Optional predicate on point index
+
+        Returns:
+            List of (distance, point index), nearest first
+        """
+        heap: List[Tuple[float, int]] = []      # max-heap via negated distance
+        stack = [(0, len(self.order), 0)]
+        while stack:
+            lo, hi, axis = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            index = self.order[mid]
+            point = self.points[index]
+            if accept is None or accept(index):
+                distance = delta_e(point, target)
+                if len(heap) < k:
+                    heapq.heappush(heap, (-distance, index))
+                elif distance < -heap[0][0]:
+                    heapq.heapreplace(heap, (-distance, index))
+            diff = target[axis] - point[axis]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            if len(heap) < k or abs(diff) < -heap[0][0]:
+                stack.append((*far, (axis + 1) % 3))
+            stack.append((*near, (axis + 1) % 3))
+        return sorted((-d, i) for d, i in heap)
+
+    def within(self, target: Tuple[float, float, float], radius: float) -> List[Tuple[float, int]]:
+        """All points within `radius` of target as (distance, index)"""
+        found = []
+        stack = [(0, len(self.order), 0)]
+        while stack:
+            lo, hi, axis = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            index = self.order[mid]
+            point = self.points[index]
+            distance = delta_e(point, target)
+            if distance <= radius:
+                found.append((distance, index))
+            diff = target[axis] - point[axis]
+            if diff - radius <= 0:
+                stack.append((lo, mid, (axis + 1) % 3))
+            if diff + radius >= 0:
+                stack.append((mid + 1, hi, (axis + 1) % 3))
+        return sorted(found)
+
+
+class PaletteIndex:
+    """Palette colors of every character in a 3-d tree"""
+
+    def __init__(self, rows: List[Tuple]):
+        """
+        Args:
+            rows: (character_rowid, character_id, character_name, faction, role, hex, l, a, b)
+        """
+        self.rows = rows
+        self.tree = KDTree([row[6:9] for row in rows])
+        self.by_character: Dict[Any, List[int]] = {}
+        for i, row in enumerate(rows):
+            self.by_character.setdefault(row[0], []).append(i)
+
+    @classmethod
+    def load(cls, db_path: str) -> 'PaletteIndex':
+        """Load character_palette joined to names and factions"""
+        conn = sqlite3.connect(db_path)
+        try:
+            faction = 'c.faction' if 'faction' in table_columns(conn.cursor(), 'characters') else 'NULL'
+            rows = conn.execute(f"""
+                SELECT p.character_rowid, c.character_id, c.character_name, {faction},
+                       p.role, p.hex, p.lab_l, p.lab_a, p.lab_b
+                FROM character_palette p JOIN characters c ON c.rowid = p.character_rowid
+            """).fetchall()
+            return cls(rows)
+        finally:
+            conn.close()
+
+    def _result(self, distance: float, index: int) -> Dict[str, Any]:
+        _, character_id, name, faction, role, value = self.rows[index][:6]
+        return {'character_id': character_id, 'character_name': name, 'faction': faction,
+                'role': role, 'hex': value, 'delta_e': round(distance, 2)}
+
+    def nearest_palette(self, color: str, k: int = 5, role: Optional[str] = None,
+                        faction: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Characters whose palette has a color closest to `color`.
+
+        Args:
+            color: Hex color
+            k: Number of characters
+            role: Only 'primary' or 'accent' colors
+            faction: Only members of this faction
+
+        Returns:
+            List of {character_id, character_name, faction, role, hex, delta_e}, one
+            per character (its closest color), nearest first
+        """
+        target = hex_to_lab(color)
+        if target is None:
+            raise ValueError(f"Not a hex color: {color}")
+
+        def accept(i):
+            row = self.rows[i]
+            return (role is None or row[4] == role) and (faction is None or row[3] == faction)
+
+        # A character can own several colors; widen until k distinct characters are found
+        wanted = k
+        while True:
+            hits = self.tree.nearest(target, wanted, accept)
+            results, seen = [], set()
+            for distance, index in hits:
+                if self.rows[index][0] not in seen:
+                    seen.add(self.rows[index][0])
+                    results.append(self._result(distance, index))
+            if len(results) >= k or len(hits) < wanted:
+                return results[:k]
+            wanted *= 2
+
+    def clashes(self, faction: Optional[str] = None,
+                threshold: float = CLASH_DELTA_E) -> List[Dict[str, Any]]:
+        """
+        Pairs of characters (within a faction, or all) with colors closer than `threshold`.
+
+        Args:
+            faction: Faction to check, None for everyone
+            threshold: Maximum ΔE counted as a clash
+
+        Returns:
+            List of {a, b, a_name, b_name, a_role, b_role, a_hex, b_hex, delta_e}, closest
+            first; a and b are character_ids (None for characters imported without one)
+        """
+        clashes = {}
+        for i, row in enumerate(self.rows):
+            if faction is not None and row[3] != faction:
+                continue
+            for distance, j in self.tree.within(row[6:9], threshold):
+                other = self.rows[j]
+                if other[0] == row[0] or (faction is not None and other[3] != faction):
+                    continue
+                if row[0] > other[0]:
+                    continue
+                key = (row[0], other[0], row[4], other[4])
+                clashes[key] = {'a': row[1], 'b': other[1], 'a_name': row[2], 'b_name': other[2],
+                                'a_role': row[4], 'b_role': other[4], 'a_hex': row[5], 'b_hex': other[5],
+                                'delta_e': round(distance, 2)}
+        return sorted(clashes.values(), key=lambda c: (c['delta_e'], c['a_name'], c['b_name']))
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[2] not in ('import', 'near', 'clashes'):
+        print("Usage: python palette_index.py <database_path> import")
+        print("       python palette_index.py <database_path> near <hex> [k]")
+        print("       python palette_index.py <database_path> clashes <faction> [delta_e]")
+        sys.exit(1)
+
+    db_path, command = sys.argv[1], sys.argv[2]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    if command == 'import':
+        result = import_palettes(db_path)
+        print(f"✓ Converted {result['converted']} colors "
+              f"({result['unchanged']} unchanged, {result['removed']} removed)")
+        return
+
+    if len(sys.argv) < 4:
+        print(f"❌ Missing argument for '{command}'")
+        sys.exit(1)
+
+    index = PaletteIndex.load(db_path)
+    if command == 'near':
+        k = int(sys.argv[4]) if len(sys.argv) > 4 else 5
+        for hit in index.nearest_palette(sys.argv[3], k):
+            print(f"  ΔE {hit['delta_e']:6.2f}  {hit['hex']} ({hit['role']})  {hit['character_name']}")
+    else:
+        threshold = float(sys.argv[4]) if len(sys.argv) > 4 else CLASH_DELTA_E
+        clashes = index.clashes(sys.argv[3], threshold)
+        for clash in clashes:
+            print(f"  ⚠ {clash['a_name']} {clash['a_role']} {clash['a_hex']} ≈ "
+                  f"{clash['b_name']} {clash['b_role']} {clash['b_hex']}  (ΔE {clash['delta_e']:.2f})")
+        print(f"✓ {len(clashes)} clashes in {sys.argv[3]} (ΔE < {threshold})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+EAV Pivot Engine
+================
+meta_core_vault_conditions and meta_core_telemetry are (category, key,
+value TEXT) rows and character_secrets is a JSON document, so every reader
+re-pivots them in Python. This module turns declarative pivot definitions
+into wide, typed tables kept current by triggers on the source, so a
+vault's full condition set is one row read.
+
+A definition (see PIVOTS) names the target, the source table and its
+layout, the entity the rows belong to, and the columns:
+
+    layout 'eav'    (column, category, key, type)   from category/key/value rows
+    layout 'json'   (column, json path, type)       from a JSON column
+
+    types           TEXT, REAL, INTEGER, BOOLEAN (true/false/1/0),
+                    LIST (JSON array of every matching value, EAV only),
+                    COUNT (length of a JSON array, JSON only)
+
+REAL parsing ignores comparison prefixes, so "<=5" becomes 5.0. Definitions
+with 'materialized': False are created as plain views instead.
+
+Usage:
+    python pivot_engine.py <database_path> install
+    python pivot_engine.py <database_path> show <pivot> [entity]
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from database_utils import table_exists, table_columns
+
+
+PIVOTS = {
+    'vault_conditions_wide': {
+        'source': 'meta_core_vault_conditions',
+        'layout': 'eav',
+        'entity_column': 'vault_id',
+        'entity_source': None,
+        'entity_value': 'vault_heart',
+        'materialized': True,
+        'columns': [
+            ('temperature_c', 'environmental', 'temperature_c', 'REAL'),
+            ('em_noise_floor_dbm', 'environmental', 'em_noise_floor_dbm', 'REAL'),
+            ('vibration_nm_max', 'environmental', 'vibration_nm', 'REAL'),
+            ('light_state', 'environmental', 'light_state', 'TEXT'),
+            ('reika_required', 'biometric_constraints', 'reika_required', 'BOOLEAN'),
+            ('reika_rrl_code', 'biometric_constraints', 'reika_rrl_code', 'TEXT'),
+            ('kage_rrl_code', 'biometric_constraints', 'kage_rrl_code', 'TEXT'),
+            ('bearer_rrl_code_min', 'biometric_constraints', 'bearer_rrl_code_min', 'TEXT'),
+            ('shion_mode', 'shion_state', 'mode', 'TEXT'),
+            ('checksum_gate', 'shion_state', 'checksum_gate', 'TEXT'),
+        ],
+    },
+    'telemetry_config_wide': {
+        'source': 'meta_core_telemetry',
+        'layout': 'eav',
+        'entity_column': 'subsystem',
+        'entity_source': None,
+        'entity_value': 'meta_core',
+        'materialized': False,
+        'columns': [
+            ('sensors', 'sensor', 'sensor', 'LIST'),
+            ('topic_activation', 'event_streams', 'topic_activation', 'TEXT'),
+            ('topic_fail_safe', 'event_streams', 'topic_fail_safe', 'TEXT'),
+            ('topic_audit', 'event_streams', 'topic_audit', 'TEXT'),
+            ('log_policies', 'log_policy', 'policy', 'LIST'),
+        ],
+    },
+    'character_secrets_wide': {
+        'source': 'characters',
+        'layout': 'json',
+        'json_column': 'character_secrets',
+        'entity_column': 'character_id',
+        'entity_source': 'character_id',
+        'materialized': True,
+        'indexes': ['klevel', 'rrl_code', 'sigil_kanji'],
+        'columns': [
+            ('klevel', '$.klevel', 'TEXT'),
+            ('rrl_tier', '$.rrl_tier', 'INTEGER'),
+            ('rrl_code', '$.rrl_code', 'TEXT'),
+            ('rrl_title', '$.rrl_title', 'TEXT'),
+            ('cmm_designation', '$.cmm_designation', 'TEXT'),
+            ('command_priority', '$.command_priority', 'TEXT'),
+            ('verified_by', '$.verified_by', 'TEXT'),
+            ('primary_color', '$.colors.primary', 'TEXT'),
+            ('accent_color', '$.colors.accent', 'TEXT'),
+            ('sigil_id', '$.sigil.id', 'TEXT'),
+            ('sigil_kanji', '$.sigil.kanji', 'TEXT'),
+            ('sigil_aspect', '$.sigil.aspect', 'TEXT'),
+            ('sigil_count', '$.sigils', 'COUNT'),
+        ],
+    },
+}
+
+COLUMN_TYPES = {
+    'TEXT': 'TEXT',
+    'REAL': 'REAL',
+    'INTEGER': 'INTEGER',
+    'BOOLEAN': 'INTEGER',
+    'LIST': 'TEXT',
+    'COUNT': 'INTEGER',
+}
+
+NOW = "strftime('%Y-%m-%d %H:%M:%S', 'now')"
+
+
+def _typed(expr: str, col_type: str) -> str:
+    """SQL casting a text expression to a pivot column type"""
+    if col_type == 'REAL':
+        trimmed = f"ltrim(trim({expr}), '<>=~')"
+        return f"(CASE WHEN {trimmed} GLOB '*[0-9]*' THEN CAST({trimmed} AS REAL) END)"
+    if col_type == 'INTEGER':
+        return f"(CASE WHEN trim({expr}) GLOB '*[0-9]*' THEN CAST(trim({expr}) AS INTEGER) END)"
+    if col_type == 'BOOLEAN':
+        return (f"(CASE lower(trim({expr})) WHEN 'true' THEN 1 WHEN '1' THEN 1 "
+                f"WHEN 'false' THEN 0 WHEN '0' THEN 0 END)")
+    return expr
+
+
+def _entity_expr(spec: Dict[str, Any], row: str = 's') -> str:
+    """SQL for the entity key of a source row"""
+    if spec['entity_source']:
+        return f"{row}.{spec['entity_source']}"
+    return "'" + spec['entity_value'].replace("'", "''") + "'"
+
+
+def _select_sql(spec: Dict[str, Any], where: str = "1 = 1") -> str:
+    """SELECT producing pivoted rows (entity, columns...) for matching source rows"""
+    entity = _entity_expr(spec)
+    if spec['layout'] == 'eav':
+        # Correlated lookups so the most recently written row for a key wins
+        same_entity = ''
+        if spec['entity_source']:
+            same_entity = f" AND v.{spec['entity_source']} = e.pivot_entity"
+        values = []
+        for _, category, key, col_type in spec['columns']:
+            lookup = (f"FROM {spec['source']} v WHERE v.category = '{category}' "
+                      f"AND v.key = '{key}'{same_entity}")
+            if col_type == 'LIST':
+                values.append(f"(SELECT json_group_array(value) FROM "
+                              f"(SELECT v.value {lookup} ORDER BY v.rowid))")
+            else:
+                values.append(f"(SELECT {_typed('v.value', col_type)} {lookup} "
+                              f"ORDER BY v.rowid DESC LIMIT 1)")
+        return f"""
+            SELECT e.pivot_entity, {', '.join(values)}, {NOW}
+            FROM (SELECT DISTINCT {entity} AS pivot_entity
+                  FROM {spec['source']} s WHERE {where}) e
+        """
+
+    doc = f"s.{spec['json_column']}"
+    values = []
+    for _, path, col_type in spec['columns']:
+        if col_type == 'COUNT':
+            values.append(f"json_array_length({doc}, '{path}')")
+        else:
+            values.append(_typed(f"json_extract({doc}, '{path}')", col_type))
+    return f"""
+        SELECT {entity}, {', '.join(values)}, {NOW}
+        FROM {spec['source']} s
+        WHERE json_valid({doc}) AND {where}
+    """
+
+
+def _column_names(spec: Dict[str, Any]) -> List[str]:
+    return [spec['entity_column']] + [column[0] for column in spec['columns']] + ['refreshed_at']
+
+
+def _refresh_sql(spec: Dict[str, Any], target: str, row: str) -> str:
+    """Trigger body statements re-pivoting the entity of row NEW/OLD"""
+    if spec['entity_source']:
+        match = f"s.{spec['entity_source']} = {row}.{spec['entity_source']}"
+        key = f"{row}.{spec['entity_source']}"
+    else:
+        match, key = "1 = 1", _entity_expr(spec)
+    return f"""
+            DELETE FROM {target} WHERE {spec['entity_column']} = {key};
+            INSERT INTO {target} ({', '.join(_column_names(spec))})
+            {_select_sql(spec, match)};"""
+
+
+def install_pivot(cursor, target: str, spec: Dict[str, Any]) -> int:
+    """
+    Create (or recreate) one pivot and populate it.
+
+    Returns:
+        Number of rows in the pivot
+    """
+    for trigger in ('ins', 'upd', 'del'):
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_pivot_{target}_{trigger}")
+    cursor.execute("SELECT type FROM sqlite_master WHERE name = ?", (target,))
+    existing = cursor.fetchone()
+    if existing:
+        cursor.execute(f"DROP {existing[0].upper()} {target}")
+
+    if not spec.get('materialized', True):
+        names = _column_names(spec)
+        cursor.execute(f"CREATE VIEW {target} ({', '.join(names)}) AS {_select_sql(spec)}")
+        return cursor.execute(f"SELECT COUNT(*) FROM {target}").fetchone()[0]
+
+    columns = ',\n'.join(
+        f"            {column[0]} {COLUMN_TYPES[column[-1]]}" for column in spec['columns']
+    )
+    cursor.execute(f"""
+        CREATE TABLE {target} (
+            {spec['entity_column']} PRIMARY KEY,
+{columns},
+            refreshed_at TIMESTAMP
+        )
+    """)
+    for column in spec.get('indexes', []):
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{target}_{column} ON {target}({column})")
+
+    if spec['layout'] == 'eav':
+        cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_{spec['source']}_category_key
+            ON {spec['source']}(category, key)
+        """)
+    cursor.execute(f"INSERT INTO {target} ({', '.join(_column_names(spec))}) {_select_sql(spec)}")
+
+    source = spec['source']
+    watched = ''
+    if spec['layout'] == 'json':
+        watched = f" OF {spec['json_column']}, {spec['entity_source']}"
+    cursor.execute(f"""
+        CREATE TRIGGER trg_pivot_{target}_ins AFTER INSERT ON {source}
+        BEGIN{_refresh_sql(spec, target, 'NEW')}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER trg_pivot_{target}_upd AFTER UPDATE{watched} ON {source}
+        BEGIN{_refresh_sql(spec, target, 'OLD')}{_refresh_sql(spec, target, 'NEW')}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER trg_pivot_{target}_del AFTER DELETE ON {source}
+        BEGIN{_refresh_sql(spec, target, 'OLD')}
+        END
+    """)
+    return cursor.execute(f"SELECT COUNT(*) FROM {target}").fetchone()[0]
+
+
+def install_pivots(db_path: str, names: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Install pivots whose source tables exist.
+
+    Args:
+        db_path: Path to database
+        names: Pivot names to install (default: all in PIVOTS)
+
+    Returns:
+        Dictionary of pivot → row count
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        results = {}
+        for target, spec in PIVOTS.items():
+            if names and target not in names:
+                continue
+            if not table_exists(cursor, spec['source']):
+                continue
+            if spec['layout'] == 'json' and spec['json_column'] not in table_columns(cursor, spec['source']):
+                continue
+            results[target] = install_pivot(cursor, target, spec)
+        conn.commit()
+        return results
+    finally:
+        conn.close()
+
+
+def read_pivot(db_path: str, target: str, entity: Any = None) -> List[Dict[str, Any]]:
+    """
+    Read pivoted rows.
+
+    Args:
+        db_path: Path to database
+        target: Pivot name
+        entity: Only this entity (None = all rows)
+
+    Returns:
+        List of row dictionaries
+    """
+    spec = PIVOTS[target]
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        if entity is None:
+            rows = conn.execute(f"SELECT * FROM {target}")
+        else:
+            rows = conn.execute(
+                f"SELECT * FROM {target} WHERE {spec['entity_column']} = ?", (entity,)
+            )
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[2] not in ('install', 'show'):
+        print("Usage: python pivot_engine.py <database_path> install")
+        print("       python pivot_engine.py <database_path> show <pivot> [entity]")
+        print(f"\nPivots: {', '.join(PIVOTS)}")
+        sys.exit(1)
+
+    db_path, command = sys.argv[1], sys.argv[2]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    if command == 'install':
+        for target, count in install_pivots(db_path).items():
+            kind = 'table' if PIVOTS[target].get('materialized', True) else 'view'
+            print(f"✓ {target} ({kind}): {count} rows")
+        return
+
+    if len(sys.argv) < 4 or sys.argv[3] not in PIVOTS:
+        print(f"❌ Unknown pivot (expected one of {', '.join(PIVOTS)})")
+        sys.exit(1)
+
+    entity = sys.argv[4] if len(sys.argv) > 4 else None
+    for row in read_pivot(db_path, sys.argv[3], entity):
+        print()
+        for column, value in row.items():
+            if value is not None:
+                print(f"  {column:24} {value}")
+
+
+if __name__ == "__main__":
+    main()
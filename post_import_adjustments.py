@@ -7,6 +7,8 @@ Handles special cases that need manual updates after import
 import sqlite3
 import sys
 
+from database_utils import begin_write, connect
+
 
 def apply_adjustments(db_path="universe.db"):
     """Apply special case adjustments"""
@@ -15,10 +17,11 @@ def apply_adjustments(db_path="universe.db"):
     print("APPLYING POST-IMPORT ADJUSTMENTS")
     print("="*60)
     
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path, 'concurrent')
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     cursor.execute("PRAGMA foreign_keys = ON")
+    begin_write(conn)
     
     adjustments = []
     
@@ -96,9 +99,10 @@ def add_mitsuko_frost(db_path="universe.db"):
     print("ADDING MITSUKO FROST")
     print("="*60)
     
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path, 'concurrent')
     cursor = conn.cursor()
     cursor.execute("PRAGMA foreign_keys = ON")
+    begin_write(conn)
     
     # Check if exists
     cursor.execute("SELECT character_id FROM characters WHERE character_name = 'Mitsuko Frost'")
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Character Prefix Index
+======================
+Autocomplete for editors typing partial names ("Kag", "黒", "Black Ven").
+A LIKE '%…%' over character_name and codename cannot use
+idx_characters_name, so this module keeps a sorted array of normalized
+keys in memory and answers prefix queries with a binary search.
+
+Every character contributes keys from character_name, codename, aliases,
+kanji and sigil kanji (sigil_registry when imported, else
+characters.sigil_kanji). Keys are normalized with name_index.normalize_name
+(accents folded, so "hyoka" finds "Hyōka") and long vowels are also spelled
+out in the common romanizations ("hyouka", "hyooka"). Each word of a
+multi-word key is indexed too, so "Frost" finds "Reika Hyōka Frost".
+
+Matches are ranked by: whole-key match before word match, field
+(name > codename > alias > kanji > sigil), then shorter key. refresh()
+re-reads the characters table and re-indexes only rows whose indexed
+fields changed. Characters are keyed by rowid, since the Phase 5 importers
+create rows without a character_id.
+
+Usage:
+    python prefix_index.py <database_path> <prefix> [limit]
+"""
+
+import bisect
+import heapq
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from database_utils import database_stamp, table_exists, table_columns
+from name_index import normalize_name
+
+
+FIELDS = ['character_name', 'codename', 'aliases', 'kanji', 'sigil_kanji']
+FIELD_RANKS = {field: rank for rank, field in enumerate(FIELDS)}
+
+# Long vowels as written with a macron, and their other romanizations
+LONG_VOWELS = {
+    'ō': ('ou', 'oo'),
+    'ū': ('uu',),
+    'ā': ('aa',),
+    'ē': ('ei', 'ee'),
+    'ī': ('ii',),
+}
+
+WHOLE, WORD = 0, 1
+
+
+def romanized_forms(text: str) -> List[str]:
+    """
+    Normalized lookup forms of a name.
+
+    Args:
+        text: Raw name, alias or kanji
+
+    Returns:
+        The accent-folded form first, then long-vowel spellings (if any)
+    """
+    forms = [normalize_name(text)]
+    lowered = text.lower()
+    for macron, spellings in LONG_VOWELS.items():
+        if macron in lowered:
+            for spelling in spellings:
+                forms.append(normalize_name(lowered.replace(macron, spelling)))
+    return [f for i, f in enumerate(forms) if f and f not in forms[:i]]
+
+
+class PrefixIndex:
+    """Sorted array of (key, kind, field rank, length, id, rowid) entries"""
+
+    def __init__(self):
+        self.entries: List[Tuple] = []
+        self.keys_of: Dict[int, List[Tuple]] = {}      # rowid → its entries
+        self.labels: Dict[int, Dict[str, Any]] = {}
+        self.fingerprints: Dict[int, Tuple] = {}
+        self._stamp: Optional[tuple] = None
+
+    # ──────────────────────────────────────────────────────────
+    # Building
+    # ──────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _entries_for(rowid: int, row: Dict[str, Any]) -> List[Tuple]:
+        entries = set()
+        sort_id = '' if row.get('character_id') is None else str(row['character_id'])
+        for field in FIELDS:
+            value = row.get(field)
+            if not value:
+                continue
+            texts = str(value).split(',') if field == 'aliases' else [str(value)]
+            for text in texts:
+                for form in romanized_forms(text):
+                    entries.add((form, WHOLE, FIELD_RANKS[field], len(form), sort_id, rowid))
+                    for word in form.split()[1:]:
+                        entries.add((word, WORD, FIELD_RANKS[field], len(form), sort_id, rowid))
+        return sorted(entries)
+
+    @staticmethod
+    def _fingerprint(row: Dict[str, Any]) -> Tuple:
+        return tuple(row.get(f) for f in ['character_id'] + FIELDS)
+
+    def update(self, rowid: int, row: Dict[str, Any]):
+        """Index (or re-index) one character by its characters rowid"""
+        self.remove(rowid)
+        entries = self._entries_for(rowid, row)
+        for entry in entries:
+            bisect.insort(self.entries, entry)
+        self._track(rowid, row, entries)
+
+    def _track(self, rowid: int, row: Dict[str, Any], entries: List[Tuple]):
+        self.keys_of[rowid] = entries
+        self.labels[rowid] = {'character_id': row.get('character_id'),
+                              'character_name': row.get('character_name'),
+                              'codename': row.get('codename')}
+        self.fingerprints[rowid] = self._fingerprint(row)
+
+    def remove(self, rowid: int):
+        """Drop a character from the index"""
+        for entry in self.keys_of.pop(rowid, []):
+            i = bisect.bisect_left(self.entries, entry)
+            if i < len(self.entries) and self.entries[i] == entry:
+                del self.entries[i]
+        self.labels.pop(rowid, None)
+        self.fingerprints.pop(rowid, None)
+
+    @staticmethod
+    def _read_rows(cursor) -> Dict[int, Dict[str, Any]]:
+        columns = table_columns(cursor, 'characters')
+        if 'character_name' not in columns:
+            return {}
+        selected = [f for f in FIELDS if f in columns and f != 'sigil_kanji']
+        expressions = ['c.' + f for f in selected]
+        fallback = 'c.sigil_kanji' if 'sigil_kanji' in columns else 'NULL'
+        if table_exists(cursor, 'sigil_bearers') and table_exists(cursor, 'sigil_registry'):
+            # Registry first, the denormalized column as fallback
+            expressions.append(f"""COALESCE((SELECT group_concat(r.kanji) FROM sigil_bearers b
+                                   JOIN sigil_registry r ON r.sigil_id = b.sigil_id
+                                   WHERE b.character_id = c.character_id), {fallback})""")
+        else:
+            expressions.append(fallback)
+        selected.append('sigil_kanji')
+
+        cursor.execute(f"SELECT c.rowid, c.character_id, {', '.join(expressions)} FROM characters c")
+        return {rowid: {'character_id': character_id, **dict(zip(selected, values))}
+                for rowid, character_id, *values in cursor.fetchall()}
+
+    def refresh(self, db_path: str, force: bool = False) -> Dict[str, int]:
+        """
+        Bring the index in line with the database, touching only changed rows.
+
+        Args:
+            db_path: Path to database
+            force: Re-read even if the database (and its WAL) is unchanged
+
+        Returns:
+            Dictionary with added, updated and removed counts
+        """
+        stamp = database_stamp(db_path)
+        counts = {'added': 0, 'updated': 0, 'removed': 0}
+        if stamp == self._stamp and not force:
+            return counts
+
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = self._read_rows(conn.cursor())
+        finally:
+            conn.close()
+
+        for rowid in [r for r in self.fingerprints if r not in rows]:
+            self.remove(rowid)
+            counts['removed'] += 1
+        for rowid, row in rows.items():
+            previous = self.fingerprints.get(rowid)
+            if previous is None:
+                counts['added'] += 1
+            elif previous != self._fingerprint(row):
+                counts['updated'] += 1
+            else:
+                continue
+            self.update(rowid, row)
+        self._stamp = stamp
+        return counts
+
+    @classmethod
+    def load(cls, db_path: str) -> 'PrefixIndex':
+        """Build the index for a database (one sort instead of an insort per key)"""
+        index = cls()
+        index._stamp = database_stamp(db_path)
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = index._read_rows(conn.cursor())
+        finally:
+            conn.close()
+        for rowid, row in rows.items():
+            entries = cls._entries_for(rowid, row)
+            index.entries.extend(entries)
+            index._track(rowid, row, entries)
+        index.entries.sort()
+        return index
+
+    # ──────────────────────────────────────────────────────────
+    # Queries
+    # ──────────────────────────────────────────────────────────
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Ranked characters whose names start with a prefix.
+
+        Args:
+            prefix: Partial name, codename, alias or kanji
+            limit: Maximum suggestions
+
+        Returns:
+            List of {character_id, character_name, codename, matched} best first
+        """
+        key = normalize_name(prefix)
+        if not key:
+            return []
+        best: Dict[Any, Tuple] = {}
+        i = bisect.bisect_left(self.entries, (key,))
+        entries = self.entries
+        while i < len(entries) and entries[i][0].startswith(key):
+            entry = entries[i]
+            rank = entry[1:5]
+            rowid = entry[5]
+            if rowid not in best or rank < best[rowid][0]:
+                best[rowid] = (rank, entry[0])
+            i += 1
+
+        ranked = heapq.nsmallest(limit, best.items(), key=lambda item: item[1][0])
+        return [{**self.labels[rowid], 'matched': matched}
+                for rowid, (_, matched) in ranked]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+_cache: Dict[str, PrefixIndex] = {}
+
+
+def get_prefix_index(db_path: str) -> PrefixIndex:
+    """
+    Get the cached prefix index for a database, refreshed if the file changed.
+
+    Args:
+        db_path: Path to database
+
+    Returns:
+        PrefixIndex
+    """
+    index = _cache.get(db_path)
+    if index is None:
+        index = _cache[db_path] = PrefixIndex.load(db_path)
+    else:
+        index.refresh(db_path)
+    return index
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python prefix_index.py <database_path> <prefix> [limit]")
+        sys.exit(1)
+
+    db_path = sys.argv[1]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    limit = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    index = get_prefix_index(db_path)
+    suggestions = index.suggest(sys.argv[2], limit)
+    if not suggestions:
+        print(f"  ✗ No matches for '{sys.argv[2]}'")
+    for suggestion in suggestions:
+        codename = f" [{suggestion['codename']}]" if suggestion['codename'] else ""
+        print(f"  {suggestion['character_name']}{codename} ← {suggestion['matched']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,8 @@ import sqlite3
 import sys
 from datetime import datetime
 
+from database_utils import CARD_KEY_COLUMNS, connect, read_profile, table_columns, table_exists
+
 
 class QueryExamples:
     """Demonstrates common database queries"""
@@ -27,8 +29,8 @@ class QueryExamples:
     def connect(self):
         """Establish connection to SQLite database"""
         try:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row  # Enable column access by name
+            self.conn = connect(self.db_path, read_profile(self.db_path),
+                                row_factory=sqlite3.Row)  # Enable column access by name
             self.cursor = self.conn.cursor()
             return True
         except sqlite3.Error as e:
@@ -174,17 +176,27 @@ class QueryExamples:
         """Get complete profile for a character"""
         self.print_header(f"Full Profile: {character_name}")
         
-        # Basic info
-        query = """
+        # Basic info; the materialized card (character_cards.py), read by
+        # its primary key, supplies the current assignment when installed
+        has_card = table_exists(self.cursor, 'character_cards')
+        if has_card:
+            char_cols = table_columns(self.cursor, 'characters')
+            card_cols = [col for col in table_columns(self.cursor, 'character_cards')
+                         if col not in char_cols and col not in CARD_KEY_COLUMNS]
+            card_select = ''.join(f", card.{col}" for col in card_cols)
+            card_join = "LEFT JOIN character_cards card ON card.character_rowid = c.rowid"
+        else:
+            card_select = ", curr_loc.location_name as current_location"
+            card_join = "LEFT JOIN locations curr_loc ON c.current_location_id = curr_loc.location_id"
+        query = f"""
         SELECT 
             c.*,
             birth_loc.location_name as birth_location,
-            res_loc.location_name as residence_location,
-            curr_loc.location_name as current_location
+            res_loc.location_name as residence_location{card_select}
         FROM characters c
         LEFT JOIN locations birth_loc ON c.place_of_birth_id = birth_loc.location_id
         LEFT JOIN locations res_loc ON c.current_residence_id = res_loc.location_id
-        LEFT JOIN locations curr_loc ON c.current_location_id = curr_loc.location_id
+        {card_join}
         WHERE c.character_name = ?
         """
         
@@ -245,6 +257,14 @@ class QueryExamples:
             print("\n━━━ GOALS ━━━")
             print(char['goals'])
         
+        if has_card and (char['corp_name'] or char['current_location']):
+            print("\n━━━ CURRENT ASSIGNMENT ━━━")
+            for label, key in (('Corporation', 'corp_name'), ('Division', 'division_name'),
+                               ('Position', 'position_title'), ('RRL Tier', 'rrl_tier'),
+                               ('Location', 'current_location')):
+                if key in char.keys() and char[key]:
+                    print(f"{label}: {char[key]}")
+        
         # Get affiliations
         aff_query = """
         SELECT 
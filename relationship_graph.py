@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Relationship Graph (CSR Adjacency)
+===================================
+Rivalries, relationships_romantic, lineage_frost, shared corporations and
+divisions, and land war co-participation together form a social graph.
+This module loads them into a compact in-memory graph in compressed sparse
+row (CSR) form:
+
+    offsets[n] .. offsets[n + 1]    slice of the edge arrays for node n
+    targets[i]                      neighbour node index
+    types[i]                        edge type code (see EDGE_TYPES)
+    weights[i]                      edge weight
+
+The arrays are array.array buffers, so traversal touches flat memory and a
+BFS over the whole graph is a tight Python loop with no per-edge objects.
+Edges are undirected (stored in both directions); parallel edges of the
+same type are merged by summing their weights.
+
+Shared corporations, divisions, war events and the Frost lineage are
+groups. A group of up to CLIQUE_LIMIT members is expanded into an edge
+between every pair of members; a larger one becomes a hub node after the
+character nodes, with one member → hub edge per member, so edge count
+grows with memberships rather than with the square of the group size.
+Traversals step through a hub without counting it as a hop, so two
+members of a hub are one degree apart, exactly as with a clique.
+
+Usage:
+    python relationship_graph.py <database_path> neighbors <name>
+    python relationship_graph.py <database_path> path <name> <name>
+    python relationship_graph.py <database_path> ego <name> [k]
+    python relationship_graph.py <database_path> components
+"""
+
+import sqlite3
+import sys
+from array import array
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from database_utils import table_exists
+from event_participants import split_participants
+from name_index import NameIndex
+
+
+# Edge type name → (code, weight per occurrence)
+EDGE_TYPES = {
+    'rivalry': (0, 1.0),
+    'romance': (1, 1.0),
+    'lineage': (2, 1.0),
+    'corporation': (3, 0.5),
+    'division': (4, 1.0),
+    'war': (5, 1.0),
+}
+EDGE_NAMES = {code: name for name, (code, _) in EDGE_TYPES.items()}
+
+# Largest group expanded pairwise; bigger groups get a hub node
+CLIQUE_LIMIT = 64
+
+
+def edge_mask(edge_types: Optional[Iterable[str]] = None) -> int:
+    """Bitmask for a set of edge type names (None = all types)"""
+    if edge_types is None:
+        return (1 << len(EDGE_TYPES)) - 1
+    mask = 0
+    for name in edge_types:
+        mask |= 1 << EDGE_TYPES[name][0]
+    return mask
+
+
+class RelationshipGraph:
+    """Typed, weighted, undirected character graph in CSR form"""
+
+    def __init__(self, node_ids: List[Any], names: Dict[Any, str],
+                 edges: Dict[Tuple[int, int, int], float],
+                 character_count: Optional[int] = None):
+        """
+        Build CSR arrays from an edge dictionary.
+
+        Args:
+            node_ids: character_id per node index, then one (edge type,
+                      group key) per hub node
+            names: character_id → character_name
+            edges: (node_a, node_b, type code) → weight, one entry per undirected edge
+            character_count: Number of character nodes (default: all nodes)
+        """
+        self.node_ids = node_ids
+        self.character_count = len(node_ids) if character_count is None else character_count
+        self.index = {node_ids[n]: n for n in range(self.character_count)}
+        self.names = names
+        self.resolver: Optional[NameIndex] = None
+
+        degree = [0] * (len(node_ids) + 1)
+        for a, b, _ in edges:
+            degree[a + 1] += 1
+            degree[b + 1] += 1
+        for n in range(len(node_ids)):
+            degree[n + 1] += degree[n]
+        self.offsets = array('l', degree)
+
+        size = self.offsets[-1]
+        self.targets = array('l', bytes(size * array('l').itemsize))
+        self.types = array('b', bytes(size))
+        self.weights = array('d', bytes(size * array('d').itemsize))
+        cursor = list(self.offsets[:-1])
+        for (a, b, code), weight in sorted(edges.items()):
+            for src, dst in ((a, b), (b, a)):
+                i = cursor[src]
+                self.targets[i], self.types[i], self.weights[i] = dst, code, weight
+                cursor[src] += 1
+
+    # ──────────────────────────────────────────────────────────
+    # Loading
+    # ──────────────────────────────────────────────────────────
+
+    @classmethod
+    def from_cursor(cls, cursor) -> 'RelationshipGraph':
+        """Load every relationship source present in the database"""
+        names_index = NameIndex.from_cursor(cursor)
+        node_ids = sorted(names_index.names, key=str)
+        node = {character_id: n for n, character_id in enumerate(node_ids)}
+        character_count = len(node_ids)
+        edges: Dict[Tuple[int, int, int], float] = defaultdict(float)
+
+        def add(edge_type: str, a, b):
+            if a is None or b is None or a == b or a not in node or b not in node:
+                return
+            code, weight = EDGE_TYPES[edge_type]
+            lo, hi = sorted((node[a], node[b]))
+            edges[(lo, hi, code)] += weight
+
+        def add_groups(edge_type: str, groups: Dict[Any, Iterable[Any]]):
+            code, weight = EDGE_TYPES[edge_type]
+            for key, members in groups.items():
+                members = sorted({node[m] for m in members if m in node})
+                if len(members) <= CLIQUE_LIMIT:
+                    for i, a in enumerate(members):
+                        for b in members[i + 1:]:
+                            edges[(a, b, code)] += weight
+                    continue
+                hub = len(node_ids)
+                node_ids.append((edge_type, key))
+                for member in members:
+                    edges[(member, hub, code)] += weight
+
+        if table_exists(cursor, 'rivalries'):
+            cursor.execute("SELECT participant_a, participant_b FROM rivalries")
+            for a, b in cursor.fetchall():
+                add('rivalry', names_index.resolve(a or ''), names_index.resolve(b or ''))
+
+        if table_exists(cursor, 'relationships_romantic'):
+            cursor.execute("SELECT character_a, character_b FROM relationships_romantic")
+            for a, b in cursor.fetchall():
+                add('romance', names_index.resolve(a or ''), names_index.resolve(b or ''))
+
+        if table_exists(cursor, 'lineage_frost'):
+            cursor.execute("SELECT id, name_en FROM lineage_frost")
+            members = [member_id if member_id in node else names_index.resolve(name or '')
+                       for member_id, name in cursor.fetchall()]
+            add_groups('lineage', {'frost': members})
+
+        if table_exists(cursor, 'character_corporate_affiliations'):
+            cursor.execute("""
+                SELECT character_id, corp_id, division_id
+                FROM character_corporate_affiliations
+            """)
+            corps, divisions = defaultdict(list), defaultdict(list)
+            for character_id, corp_id, division_id in cursor.fetchall():
+                if corp_id is not None:
+                    corps[corp_id].append(character_id)
+                if division_id is not None:
+                    divisions[division_id].append(character_id)
+            add_groups('corporation', corps)
+            add_groups('division', divisions)
+
+        if table_exists(cursor, 'event_participants'):
+            cursor.execute("""
+                SELECT event_id, character_id FROM event_participants
+                WHERE source = 'land_war_event' AND character_id IS NOT NULL
+            """)
+            events = defaultdict(list)
+            for event_id, character_id in cursor.fetchall():
+                events[event_id].append(character_id)
+        elif table_exists(cursor, 'land_war_events'):
+            cursor.execute("SELECT id, participants FROM land_war_events")
+            events = {event_id: [names_index.resolve(name) for name in split_participants(value)]
+                      for event_id, value in cursor.fetchall()}
+        else:
+            events = {}
+        add_groups('war', events)
+
+        graph = cls(node_ids, names_index.names, edges, character_count)
+        graph.resolver = names_index
+        return graph
+
+    @classmethod
+    def load(cls, db_path: str) -> 'RelationshipGraph':
+        """Load the graph from a database file"""
+        conn = sqlite3.connect(db_path)
+        try:
+            return cls.from_cursor(conn.cursor())
+        finally:
+            conn.close()
+
+    # ──────────────────────────────────────────────────────────
+    # Queries
+    # ──────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        """Number of characters (hub nodes excluded)"""
+        return self.character_count
+
+    @property
+    def edge_count(self) -> int:
+        """Number of undirected edges stored (member → hub edges included)"""
+        return len(self.targets) // 2
+
+    def is_hub(self, n: int) -> bool:
+        """Whether a node index is a group hub rather than a character"""
+        return n >= self.character_count
+
+    def hub_members(self, hub: int) -> array:
+        """Member node indexes of a hub"""
+        return self.targets[self.offsets[hub]:self.offsets[hub + 1]]
+
+    def node_of(self, character) -> Optional[int]:
+        """Node index for a character_id or any resolvable name"""
+        if character in self.index:
+            return self.index[character]
+        if self.resolver is not None:
+            return self.index.get(self.resolver.resolve(str(character)))
+        return None
+
+    def neighbors(self, character, edge_types: Optional[Iterable[str]] = None
+                  ) -> List[Tuple[Any, str, float]]:
+        """
+        Get a character's direct neighbours.
+
+        Args:
+            character: character_id or character_name
+            edge_types: Edge type names to follow (default: all)
+
+        Returns:
+            List of (character_id, edge type, weight), heaviest first
+        """
+        n = self.node_of(character)
+        if n is None:
+            return []
+        mask = edge_mask(edge_types)
+        merged: Dict[Tuple[int, int], float] = defaultdict(float)
+        for i in range(self.offsets[n], self.offsets[n + 1]):
+            v, code = self.targets[i], self.types[i]
+            if not mask >> code & 1:
+                continue
+            for m in (self.hub_members(v) if self.is_hub(v) else (v,)):
+                if m != n:
+                    merged[(m, code)] += self.weights[i]
+        result = [(self.node_ids[m], EDGE_NAMES[code], weight)
+                  for (m, code), weight in merged.items()]
+        return sorted(result, key=lambda edge: -edge[2])
+
+    def _bfs(self, start: int, mask: int, max_depth: Optional[int] = None,
+             goal: Optional[int] = None) -> Tuple[List[int], List[int]]:
+        """
+        Breadth-first search returning (distance, parent) per node (-1 = unreached).
+
+        Entering a hub costs nothing (0-1 BFS: hubs go to the front of the
+        queue), leaving it to a member costs one hop. Each hub is expanded
+        once, so the search stays linear in the stored edges.
+        """
+        offsets, targets, types = self.offsets, self.targets, self.types
+        characters = self.character_count
+        distance = [-1] * len(self.node_ids)
+        parent = [-1] * len(self.node_ids)
+        distance[start] = 0
+        queue = deque([start])
+        while queue:
+            u = queue.popleft()
+            if u == goal or (max_depth is not None and distance[u] >= max_depth):
+                continue
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                if distance[v] < 0 and mask >> types[i] & 1:
+                    parent[v] = u
+                    if v >= characters:
+                        distance[v] = distance[u]
+                        queue.appendleft(v)
+                        continue
+                    distance[v] = distance[u] + 1
+                    if v == goal:
+                        return distance, parent
+                    queue.append(v)
+        return distance, parent
+
+    def shortest_path(self, source, target, edge_types: Optional[Iterable[str]] = None
+                      ) -> Optional[List[Any]]:
+        """
+        Degrees of separation between two characters (unweighted BFS).
+
+        Args:
+            source: character_id or character_name
+            target: character_id or character_name
+            edge_types: Edge type names to follow (default: all)
+
+        Returns:
+            List of character_ids from source to target, or None if unconnected
+        """
+        start, goal = self.node_of(source), self.node_of(target)
+        if start is None or goal is None:
+            return None
+        distance, parent = self._bfs(start, edge_mask(edge_types), goal=goal)
+        if distance[goal] < 0:
+            return None
+        path = [goal]
+        while path[-1] != start:
+            path.append(parent[path[-1]])
+        return [self.node_ids[n] for n in reversed(path) if not self.is_hub(n)]
+
+    def ego_network(self, character, k: int = 2, edge_types: Optional[Iterable[str]] = None
+                    ) -> Dict[Any, int]:
+        """
+        Get everyone within k hops of a character.
+
+        Args:
+            character: character_id or character_name
+            k: Maximum number of hops
+            edge_types: Edge type names to follow (default: all)
+
+        Returns:
+            Dictionary of character_id → hop distance (including the centre at 0)
+        """
+        start = self.node_of(character)
+        if start is None:
+            return {}
+        distance, _ = self._bfs(start, edge_mask(edge_types), max_depth=k)
+        return {self.node_ids[n]: distance[n] for n in range(self.character_count)
+                if distance[n] >= 0}
+
+    def connected_components(self, edge_types: Optional[Iterable[str]] = None
+                             ) -> List[List[Any]]:
+        """
+        Get connected components, largest first.
+
+        Args:
+            edge_types: Edge type names to follow (default: all)
+
+        Returns:
+            List of components, each a list of character_ids
+        """
+        mask = edge_mask(edge_types)
+        offsets, targets, types = self.offsets, self.targets, self.types
+        component = [-1] * len(self.node_ids)
+        components = []
+        for root in range(self.character_count):
+            if component[root] >= 0:
+                continue
+            component[root] = len(components)
+            members, stack = [root], [root]
+            while stack:
+                u = stack.pop()
+                for i in range(offsets[u], offsets[u + 1]):
+                    v = targets[i]
+                    if component[v] < 0 and mask >> types[i] & 1:
+                        component[v] = len(components)
+                        members.append(v)
+                        stack.append(v)
+            components.append([self.node_ids[n] for n in members if not self.is_hub(n)])
+        return sorted(components, key=len, reverse=True)
+
+
+def main():
+    commands = ('neighbors', 'path', 'ego', 'components')
+    if len(sys.argv) < 3 or sys.argv[2] not in commands:
+        print("Usage: python relationship_graph.py <database_path> neighbors <name>")
+        print("       python relationship_graph.py <database_path> path <name> <name>")
+        print("       python relationship_graph.py <database_path> ego <name> [k]")
+        print("       python relationship_graph.py <database_path> components")
+        sys.exit(1)
+
+    db_path, command = sys.argv[1], sys.argv[2]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    graph = RelationshipGraph.load(db_path)
+    print(f"Graph: {len(graph)} characters, {graph.edge_count} edges\n")
+    name = graph.names.get
+
+    if command == 'neighbors' and len(sys.argv) == 4:
+        for character_id, edge_type, weight in graph.neighbors(sys.argv[3]):
+            print(f"  • {name(character_id)} [{edge_type}] {weight:g}")
+    elif command == 'path' and len(sys.argv) == 5:
+        path = graph.shortest_path(sys.argv[3], sys.argv[4])
+        if path is None:
+            print("  ✗ Not connected")
+        else:
+            print(f"  {len(path) - 1} degree(s): " + " → ".join(name(c) for c in path))
+    elif command == 'ego' and len(sys.argv) in (4, 5):
+        k = int(sys.argv[4]) if len(sys.argv) == 5 else 2
+        ego = graph.ego_network(sys.argv[3], k)
+        for character_id, hops in sorted(ego.items(), key=lambda item: item[1]):
+            print(f"  {hops}  {name(character_id)}")
+    elif command == 'components':
+        for members in graph.connected_components():
+            print(f"  [{len(members)}] " + ", ".join(name(c) for c in members))
+    else:
+        print(f"❌ Wrong arguments for '{command}'")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
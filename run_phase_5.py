@@ -17,6 +17,8 @@ import sys
 import subprocess
 from pathlib import Path
 
+from database_utils import checkpoint
+
 
 def run_command(script: str, args: list):
     """Run a Python script with arguments"""
@@ -76,6 +78,8 @@ def main():
     if not run_command("fix_corporate_structure.py", [db_path]):
         print("\n❌ Phase 5A failed. Aborting Phase 5.")
         sys.exit(1)
+    # The importers write in WAL mode; fold the phase's WAL back into the file
+    checkpoint(db_path, 'TRUNCATE')
     
     print("\n✅ Phase 5A Complete!\n")
     
@@ -87,6 +91,7 @@ def main():
     if not run_command("import_full_roster.py", [db_path, json_path]):
         print("\n❌ Phase 5B failed.")
         sys.exit(1)
+    checkpoint(db_path, 'TRUNCATE')
     
     print("\n✅ Phase 5B Complete!\n")
     
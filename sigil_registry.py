@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Sigil Registry
+==============
+Sigil data lives in five places: shadowcore/sigils_codex.csv, the
+sigils_codex and meta_core_activation_sequence tables, foreign_key_map.json
+(sigil_to_bearer / bearer_to_sigil) and the character_secrets['sigil'] blobs
+written by import_shadow_core_resonance.py. This importer merges them into
+one normalized table set:
+
+    sigil_registry      sigil_id, kanji, aspect, orchid, alignment, power,
+                        curse, symbolism (indexed on kanji and aspect)
+    sigil_bearers       sigil_id → bearer_key (source slug) → character_id
+                        (indexed both ways)
+    sigil_activation    sequence, position → sigil_id, activation phrase
+
+Disagreements between sources are reported, not silently overwritten; the
+first source in IMPORT_ORDER wins. SigilRegistry is the cached in-memory
+view with O(1) lookups by id, kanji, aspect, bearer and position.
+
+Usage:
+    python sigil_registry.py <database_path> import [shadowcore_dir]
+    python sigil_registry.py <database_path> show [sigil | kanji | bearer]
+"""
+
+import csv
+import json
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from database_utils import database_stamp, table_exists, table_columns
+from name_index import NameIndex
+
+
+SIGIL_FIELDS = ['kanji', 'aspect', 'orchid', 'alignment', 'power', 'curse', 'symbolism']
+DEFAULT_SEQUENCE = 'meta_core'
+IMPORT_ORDER = ['sigils_codex table', 'sigils_codex.csv', 'meta_core_activation_sequence',
+                'foreign_key_map.json', 'character_secrets']
+
+
+def create_registry_tables(cursor):
+    """Create the sigil registry tables and indexes"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sigil_registry (
+            sigil_id TEXT PRIMARY KEY,
+            kanji TEXT,
+            aspect TEXT,
+            orchid TEXT,
+            alignment TEXT,
+            power TEXT,
+            curse TEXT,
+            symbolism TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sigil_registry_kanji ON sigil_registry(kanji)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sigil_registry_aspect ON sigil_registry(aspect)")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sigil_bearers (
+            sigil_id TEXT NOT NULL,
+            bearer_key TEXT NOT NULL,
+            character_id,
+            PRIMARY KEY (sigil_id, bearer_key),
+            FOREIGN KEY (sigil_id) REFERENCES sigil_registry(sigil_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sigil_bearers_character ON sigil_bearers(character_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sigil_bearers_key ON sigil_bearers(bearer_key)")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sigil_activation (
+            sequence TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            sigil_id TEXT NOT NULL,
+            activation_phrase TEXT,
+            activation_translation TEXT,
+            PRIMARY KEY (sequence, position),
+            FOREIGN KEY (sigil_id) REFERENCES sigil_registry(sigil_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sigil_activation_sigil ON sigil_activation(sigil_id)")
+
+
+class _Merge:
+    """Collects sigil facts from several sources, first source wins"""
+
+    def __init__(self):
+        self.sigils: Dict[str, Dict[str, Any]] = {}
+        self.bearers: Dict[str, Dict[str, Any]] = {}      # sigil_id → {bearer_key: character_id}
+        self.activation: Dict[int, Tuple] = {}
+        self.conflicts: List[str] = []
+
+    def sigil(self, source: str, sigil_id: str, **fields):
+        record = self.sigils.setdefault(sigil_id, {})
+        for field, value in fields.items():
+            if value in (None, ''):
+                continue
+            if field not in record:
+                record[field] = value
+            elif record[field] != value:
+                self.conflicts.append(f"{sigil_id}.{field}: kept '{record[field]}', {source} has '{value}'")
+
+    def bearer(self, source: str, sigil_id: str, bearer_key: Optional[str], character_id=None):
+        if not bearer_key:
+            return
+        if sigil_id not in self.sigils:
+            self.sigils[sigil_id] = {}
+        bearers = self.bearers.setdefault(sigil_id, {})
+        if bearer_key not in bearers or bearers[bearer_key] is None:
+            bearers[bearer_key] = character_id
+
+    def activate(self, source: str, position: int, sigil_id: str, phrase=None, translation=None):
+        existing = self.activation.get(position)
+        if existing is None:
+            self.activation[position] = (sigil_id, phrase, translation)
+        elif existing[0] != sigil_id:
+            self.conflicts.append(f"activation {position}: kept '{existing[0]}', {source} has '{sigil_id}'")
+
+
+def _read_sources(cursor, shadowcore_dir: Optional[Path]) -> _Merge:
+    """Read every sigil source in IMPORT_ORDER"""
+    merge = _Merge()
+
+    if table_exists(cursor, 'sigils_codex'):
+        cursor.execute(f"SELECT order_num, id, bearer_id, {', '.join(SIGIL_FIELDS)} FROM sigils_codex")
+        for order_num, sigil_id, bearer_id, *values in cursor.fetchall():
+            merge.sigil('sigils_codex table', sigil_id, **dict(zip(SIGIL_FIELDS, values)))
+            merge.bearer('sigils_codex table', sigil_id, bearer_id)
+            if order_num is not None:
+                merge.activate('sigils_codex table', int(order_num), sigil_id)
+
+    csv_path = shadowcore_dir / 'sigils_codex.csv' if shadowcore_dir else None
+    if csv_path and csv_path.exists():
+        with open(csv_path, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                merge.sigil('sigils_codex.csv', row['id'], **{k: row.get(k) for k in SIGIL_FIELDS})
+                merge.bearer('sigils_codex.csv', row['id'], row.get('bearer_id'))
+                if row.get('order'):
+                    merge.activate('sigils_codex.csv', int(row['order']), row['id'])
+
+    if table_exists(cursor, 'meta_core_activation_sequence'):
+        cursor.execute("""
+            SELECT order_num, id, kanji, bearer_id, aspect, activation_phrase, activation_translation
+            FROM meta_core_activation_sequence ORDER BY order_num
+        """)
+        for order_num, sigil_id, kanji, bearer_id, aspect, phrase, translation in cursor.fetchall():
+            merge.sigil('meta_core_activation_sequence', sigil_id, kanji=kanji, aspect=aspect)
+            merge.bearer('meta_core_activation_sequence', sigil_id, bearer_id)
+            merge.activate('meta_core_activation_sequence', int(order_num), sigil_id, phrase, translation)
+            # Phrases only exist here; fill them in if the codex claimed the slot first
+            current = merge.activation[int(order_num)]
+            if current[0] == sigil_id and current[1] is None:
+                merge.activation[int(order_num)] = (sigil_id, phrase, translation)
+
+    map_path = shadowcore_dir / 'foreign_key_map.json' if shadowcore_dir else None
+    if map_path and map_path.exists():
+        with open(map_path, 'r', encoding='utf-8') as f:
+            links = json.load(f).get('links', {})
+        for sigil_id, bearer_key in links.get('sigil_to_bearer', {}).items():
+            merge.bearer('foreign_key_map.json', sigil_id, bearer_key)
+        for bearer_key, sigil_ids in links.get('bearer_to_sigil', {}).items():
+            for sigil_id in sigil_ids:
+                merge.bearer('foreign_key_map.json', sigil_id, bearer_key)
+
+    if 'character_secrets' in table_columns(cursor, 'characters'):
+        cursor.execute("""
+            SELECT character_id, character_secrets FROM characters
+            WHERE json_valid(character_secrets) AND json_extract(character_secrets, '$.sigil.id') IS NOT NULL
+        """)
+        for character_id, secrets in cursor.fetchall():
+            sigil = json.loads(secrets)['sigil']
+            merge.sigil('character_secrets', sigil['id'],
+                        **{k: sigil.get(k) for k in ('kanji', 'aspect', 'orchid', 'power', 'curse')})
+            merge.bearer('character_secrets', sigil['id'], str(character_id), character_id)
+
+    return merge
+
+
+def import_sigils(db_path: str, shadowcore_dir: Optional[str] = 'shadowcore') -> Dict[str, Any]:
+    """
+    Rebuild the sigil registry from every source.
+
+    Args:
+        db_path: Path to database
+        shadowcore_dir: Directory with sigils_codex.csv and foreign_key_map.json
+
+    Returns:
+        Dictionary with sigils, bearers, activation and conflicts
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        create_registry_tables(cursor)
+        merge = _read_sources(cursor, Path(shadowcore_dir) if shadowcore_dir else None)
+        names = NameIndex.from_cursor(cursor)
+
+        cursor.execute("DELETE FROM sigil_activation")
+        cursor.execute("DELETE FROM sigil_bearers")
+        cursor.execute("DELETE FROM sigil_registry")
+        cursor.executemany(f"""
+            INSERT INTO sigil_registry (sigil_id, {', '.join(SIGIL_FIELDS)})
+            VALUES (?, {', '.join('?' for _ in SIGIL_FIELDS)})
+        """, [(sigil_id, *(record.get(f) for f in SIGIL_FIELDS))
+              for sigil_id, record in merge.sigils.items()])
+
+        bearer_rows = []
+        for sigil_id, bearers in merge.bearers.items():
+            for bearer_key, character_id in bearers.items():
+                if character_id is None:
+                    character_id = bearer_key if bearer_key in names.names else names.resolve(bearer_key)
+                bearer_rows.append((sigil_id, bearer_key, character_id))
+        cursor.executemany("INSERT INTO sigil_bearers VALUES (?, ?, ?)", bearer_rows)
+
+        cursor.executemany("""
+            INSERT INTO sigil_activation
+            (sequence, position, sigil_id, activation_phrase, activation_translation)
+            VALUES (?, ?, ?, ?, ?)
+        """, [(DEFAULT_SEQUENCE, position, *values) for position, values in sorted(merge.activation.items())])
+
+        # Keep the Phase 5 denormalized sigil columns on characters in step
+        char_cols = table_columns(cursor, 'characters')
+        if {'sigil_id', 'sigil_kanji', 'sigil_aspect'} <= set(char_cols):
+            has_sigil = ", has_sigil = 1" if 'has_sigil' in char_cols else ""
+            cursor.executemany(f"""
+                UPDATE characters SET sigil_id = ?, sigil_kanji = ?, sigil_aspect = ?{has_sigil}
+                WHERE character_id = ?
+            """, [(sigil_id, merge.sigils[sigil_id].get('kanji'), merge.sigils[sigil_id].get('aspect'),
+                   character_id) for sigil_id, _, character_id in bearer_rows if character_id is not None])
+
+        conn.commit()
+        return {
+            'sigils': len(merge.sigils),
+            'bearers': len(bearer_rows),
+            'unresolved_bearers': sum(1 for row in bearer_rows if row[2] is None),
+            'activation': len(merge.activation),
+            'conflicts': merge.conflicts,
+        }
+    finally:
+        conn.close()
+
+
+class SigilRegistry:
+    """In-memory sigil registry with O(1) lookups in every direction"""
+
+    def __init__(self, sigils: Dict[str, Dict[str, Any]], bearers: List[Tuple], activation: List[Tuple]):
+        self.sigils = sigils
+        self.by_kanji = {s['kanji']: s for s in sigils.values() if s.get('kanji')}
+        self.by_aspect: Dict[str, List[Dict[str, Any]]] = {}
+        for sigil in sigils.values():
+            self.by_aspect.setdefault((sigil.get('aspect') or '').lower(), []).append(sigil)
+
+        self.bearers_of: Dict[str, List[Any]] = {}
+        self.sigils_of: Dict[Any, List[Dict[str, Any]]] = {}
+        for sigil_id, bearer_key, character_id in bearers:
+            for key in {bearer_key, character_id} - {None}:
+                self.sigils_of.setdefault(key, [])
+                if sigils[sigil_id] not in self.sigils_of[key]:
+                    self.sigils_of[key].append(sigils[sigil_id])
+            bearer = character_id if character_id is not None else bearer_key
+            if bearer not in self.bearers_of.setdefault(sigil_id, []):
+                self.bearers_of[sigil_id].append(bearer)
+
+        self.sequences: Dict[str, List[Dict[str, Any]]] = {}
+        self.position_of: Dict[Tuple[str, str], int] = {}
+        for sequence, position, sigil_id, phrase, translation in activation:
+            step = {'position': position, 'phrase': phrase, 'translation': translation, **sigils[sigil_id]}
+            self.sequences.setdefault(sequence, []).append(step)
+            self.position_of[(sequence, sigil_id)] = position
+
+    @classmethod
+    def load(cls, db_path: str) -> 'SigilRegistry':
+        """Load the registry tables into memory"""
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            sigils = {row['sigil_id']: dict(row) for row in conn.execute("SELECT * FROM sigil_registry")}
+            bearers = [tuple(row) for row in conn.execute(
+                "SELECT sigil_id, bearer_key, character_id FROM sigil_bearers ORDER BY sigil_id, bearer_key")]
+            activation = [tuple(row) for row in conn.execute(
+                "SELECT * FROM sigil_activation ORDER BY sequence, position")]
+            return cls(sigils, bearers, activation)
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Sigil by id or kanji"""
+        return self.sigils.get(key) or self.by_kanji.get(key)
+
+    def bearer_of(self, sigil: str) -> List[Any]:
+        """character_ids (or source slugs when unresolved) bearing a sigil id or kanji"""
+        record = self.get(sigil)
+        return self.bearers_of.get(record['sigil_id'], []) if record else []
+
+    def sigil_of(self, bearer) -> List[Dict[str, Any]]:
+        """Sigils borne by a character_id or bearer slug"""
+        return self.sigils_of.get(bearer, [])
+
+    def with_aspect(self, aspect: str) -> List[Dict[str, Any]]:
+        """Sigils of an aspect (case-insensitive)"""
+        return self.by_aspect.get(aspect.lower(), [])
+
+    def activation_order(self, sequence: str = DEFAULT_SEQUENCE) -> List[Dict[str, Any]]:
+        """Steps of an activation sequence in order"""
+        return self.sequences.get(sequence, [])
+
+    def position(self, sigil: str, sequence: str = DEFAULT_SEQUENCE) -> Optional[int]:
+        """Activation position of a sigil id or kanji"""
+        record = self.get(sigil)
+        return self.position_of.get((sequence, record['sigil_id'])) if record else None
+
+
+_cache: Dict[str, Tuple[tuple, SigilRegistry]] = {}
+
+
+def get_registry(db_path: str) -> SigilRegistry:
+    """
+    Get the cached registry for a database, reloading when it (or its WAL) changed.
+
+    Args:
+        db_path: Path to database
+
+    Returns:
+        SigilRegistry
+    """
+    stamp = database_stamp(db_path)
+    cached = _cache.get(db_path)
+    if cached is None or cached[0] != stamp:
+        cached = _cache[db_path] = (stamp, SigilRegistry.load(db_path))
+    return cached[1]
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[2] not in ('import', 'show'):
+        print("Usage: python sigil_registry.py <database_path> import [shadowcore_dir]")
+        print("       python sigil_registry.py <database_path> show [sigil | kanji | bearer]")
+        sys.exit(1)
+
+    db_path, command = sys.argv[1], sys.argv[2]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    if command == 'import':
+        result = import_sigils(db_path, sys.argv[3] if len(sys.argv) > 3 else 'shadowcore')
+        print(f"✓ {result['sigils']} sigils, {result['bearers']} bearer links "
+              f"({result['unresolved_bearers']} unresolved), {result['activation']} activation steps")
+        for conflict in result['conflicts']:
+            print(f"  ⚠ {conflict}")
+        return
+
+    registry = get_registry(db_path)
+    if len(sys.argv) > 3:
+        key = sys.argv[3]
+        sigils = [registry.get(key)] if registry.get(key) else registry.sigil_of(key)
+        for sigil in sigils:
+            print(f"  {sigil['kanji']} {sigil['sigil_id']} ({sigil['aspect']}) — "
+                  f"bearer: {', '.join(map(str, registry.bearer_of(sigil['sigil_id'])))}, "
+                  f"position {registry.position(sigil['sigil_id'])}")
+        return
+
+    for step in registry.activation_order():
+        print(f"  {step['position']}. {step['kanji']} {step['sigil_id']} ({step['aspect']}) — "
+              f"{', '.join(map(str, registry.bearer_of(step['sigil_id'])))}")
+
+
+if __name__ == "__main__":
+    main()
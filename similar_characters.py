@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Similar Character Search
+========================
+"Characters like Kage Ishigawa" by role, skills, personality and tags.
+
+The indexer turns each character's prose columns into a hashed TF-IDF
+vector (terms hashed to 32-bit ids, weights L2-normalized, stored as
+packed arrays) plus a one-permutation MinHash signature of its term set.
+The signature is cut into LSH bands; every (band, bucket) pair is a row in
+an indexed table, so a query reads a few index ranges to get candidates
+and re-ranks only those by exact cosine similarity:
+
+    character_vectors       character_id → content hash, terms, weights, minhash
+    character_vector_df     term → document frequency (for IDF)
+    character_vector_bands  (band, bucket) → character_id
+
+Small rosters (<= EXHAUSTIVE_LIMIT characters) are simply scanned in full.
+
+Indexing is incremental: each run hashes every character's text and only
+re-vectorizes characters whose text changed, adjusting document
+frequencies as it goes. Stored weights keep the IDF of when they were
+computed; --full recomputes everything with current frequencies.
+
+Usage:
+    python similar_characters.py <database_path> index [--full]
+    python similar_characters.py <database_path> like <character> [k]
+"""
+
+import hashlib
+import math
+import re
+import sqlite3
+import sys
+import unicodedata
+import zlib
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from database_utils import table_columns
+from name_index import NameIndex
+
+
+# Prose columns and how much each contributes to term frequency
+TEXT_COLUMNS = {
+    'primary_role': 2.0,
+    'character_archetype': 2.0,
+    'faction': 1.0,
+    'personality_summary': 1.5,
+    'core_values': 1.0,
+    'motivations': 1.0,
+    'fears': 1.0,
+    'flaws': 1.0,
+    'strengths': 1.0,
+    'skill_set': 1.5,
+    'special_abilities': 1.5,
+    'backstory': 0.5,
+    'current_arc': 0.5,
+    'story_tags': 2.0,
+    'tags': 2.0,
+}
+
+STOPWORDS = frozenset("""
+    a an and are as at be but by for from has have he her his in is it its of on or
+    she that the their they this to was were with who whom which into than then
+""".split())
+
+TOKEN_RE = re.compile(r'[a-z0-9]+|[぀-ヿ一-鿿]')
+
+MINHASH_BINS = 64
+BANDS = 16
+ROWS_PER_BAND = MINHASH_BINS // BANDS
+EXHAUSTIVE_LIMIT = 5000
+EMPTY_BIN = 0xFFFFFFFF
+
+
+def tokenize(text: str) -> List[str]:
+    """Accent-folded lowercase word tokens (single CJK characters kept as tokens)"""
+    folded = unicodedata.normalize('NFKD', text)
+    folded = ''.join(ch for ch in folded if not unicodedata.combining(ch)).casefold()
+    return [t for t in TOKEN_RE.findall(folded) if t not in STOPWORDS and (len(t) > 1 or not t.isascii())]
+
+
+def term_id(token: str) -> int:
+    """Stable 32-bit feature id of a token"""
+    return zlib.crc32(token.encode('utf-8'))
+
+
+def term_frequencies(row: Dict[str, Any]) -> Dict[int, float]:
+    """Field-weighted, log-scaled term frequencies of one character"""
+    counts: Dict[int, float] = {}
+    for column, weight in TEXT_COLUMNS.items():
+        for token in tokenize(str(row.get(column) or '')):
+            term = term_id(token)
+            counts[term] = counts.get(term, 0.0) + weight
+    return {term: 1.0 + math.log(count) if count >= 1 else count for term, count in counts.items()}
+
+
+def minhash(terms) -> array:
+    """
+    One-permutation MinHash: each term hash lands in one bin, a bin keeps
+    its smallest value, and empty bins borrow the next non-empty bin.
+    """
+    bins = [EMPTY_BIN] * MINHASH_BINS
+    for term in terms:
+        mixed = (term * 0x9E3779B1) & 0xFFFFFFFF
+        slot, value = mixed % MINHASH_BINS, mixed // MINHASH_BINS
+        if value < bins[slot]:
+            bins[slot] = value
+    filled = [b for b in bins if b != EMPTY_BIN]
+    if filled and len(filled) < MINHASH_BINS:
+        # Densify: an empty bin takes the value of the next non-empty bin
+        source = bins[:]
+        for i in range(MINHASH_BINS):
+            j = i
+            while source[j % MINHASH_BINS] == EMPTY_BIN:
+                j += 1
+            bins[i] = source[j % MINHASH_BINS]
+    return array('I', bins)
+
+
+def band_buckets(signature: array) -> List[Tuple[int, int]]:
+    """(band, bucket) pairs of a MinHash signature"""
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        buckets.append((band, zlib.crc32(rows.tobytes())))
+    return buckets
+
+
+def create_vector_tables(cursor):
+    """Create vector, document-frequency and LSH band tables"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS character_vectors (
+            character_id PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            terms BLOB NOT NULL,
+            weights BLOB NOT NULL,
+            minhash BLOB NOT NULL,
+            indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS character_vector_df (
+            term INTEGER PRIMARY KEY,
+            df INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS character_vector_bands (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            character_id NOT NULL,
+            PRIMARY KEY (band, bucket, character_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_character_vector_bands_character
+        ON character_vector_bands(character_id)
+    """)
+
+
+def _unpack(terms: bytes, weights: bytes) -> Dict[int, float]:
+    return dict(zip(array('I', terms), array('f', weights)))
+
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    """Dot product of two L2-normalized sparse vectors"""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b[t] for t, w in a.items() if t in b)
+
+
+def _read_profiles(cursor) -> Dict[Any, Dict[str, Any]]:
+    columns = [c for c in TEXT_COLUMNS if c in table_columns(cursor, 'characters')]
+    cursor.execute(f"SELECT character_id, {', '.join(columns)} FROM characters")
+    return {character_id: dict(zip(columns, values)) for character_id, *values in cursor.fetchall()}
+
+
+def _content_hash(row: Dict[str, Any]) -> str:
+    digest = hashlib.sha1()
+    for column in TEXT_COLUMNS:
+        digest.update(str(row.get(column) or '').encode('utf-8') + b'\x1f')
+    return digest.hexdigest()
+
+
+def index_characters(db_path: str, full: bool = False) -> Dict[str, int]:
+    """
+    Vectorize new and changed characters and drop deleted ones.
+
+    Args:
+        db_path: Path to database
+        full: Recompute every vector with current document frequencies
+
+    Returns:
+        Dictionary with indexed, unchanged and removed counts
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        create_vector_tables(cursor)
+        if full:
+            for table in ('character_vectors', 'character_vector_df', 'character_vector_bands'):
+                cursor.execute(f"DELETE FROM {table}")
+
+        profiles = _read_profiles(cursor)
+        cursor.execute("SELECT character_id, content_hash, terms FROM character_vectors")
+        stored = {character_id: (content_hash, terms) for character_id, content_hash, terms in cursor.fetchall()}
+        df_delta: Dict[int, int] = {}
+
+        removed = [character_id for character_id in stored if character_id not in profiles]
+        changed = {}
+        for character_id, row in profiles.items():
+            content_hash = _content_hash(row)
+            if character_id not in stored or stored[character_id][0] != content_hash:
+                changed[character_id] = (content_hash, term_frequencies(row))
+
+        # Document frequencies: retract old term sets, add new ones
+        for character_id in removed + [c for c in changed if c in stored]:
+            for term in array('I', stored[character_id][1]):
+                df_delta[term] = df_delta.get(term, 0) - 1
+        for _, frequencies in changed.values():
+            for term in frequencies:
+                df_delta[term] = df_delta.get(term, 0) + 1
+        cursor.executemany("""
+            INSERT INTO character_vector_df (term, df) VALUES (?, ?)
+            ON CONFLICT(term) DO UPDATE SET df = df + excluded.df
+        """, [(term, delta) for term, delta in df_delta.items() if delta])
+        cursor.execute("DELETE FROM character_vector_df WHERE df <= 0")
+
+        documents = len(profiles)
+        terms_needed = {term for _, frequencies in changed.values() for term in frequencies}
+        df: Dict[int, int] = {}
+        terms_list = list(terms_needed)
+        for start in range(0, len(terms_list), 500):
+            chunk = terms_list[start:start + 500]
+            cursor.execute(f"SELECT term, df FROM character_vector_df WHERE term IN ({','.join('?' * len(chunk))})",
+                           chunk)
+            df.update(cursor.fetchall())
+
+        for character_id in removed + list(changed):
+            cursor.execute("DELETE FROM character_vector_bands WHERE character_id = ?", (character_id,))
+        cursor.executemany("DELETE FROM character_vectors WHERE character_id = ?",
+                           [(character_id,) for character_id in removed])
+
+        vector_rows, band_rows = [], []
+        for character_id, (content_hash, frequencies) in changed.items():
+            weights = {term: tf * (math.log((documents + 1) / (df.get(term, 0) + 1)) + 1.0)
+                       for term, tf in frequencies.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            terms = sorted(weights)
+            signature = minhash(terms)
+            vector_rows.append((character_id, content_hash,
+                                array('I', terms).tobytes(),
+                                array('f', (weights[t] / norm for t in terms)).tobytes(),
+                                signature.tobytes()))
+            if terms:
+                band_rows.extend((band, bucket, character_id) for band, bucket in band_buckets(signature))
+
+        cursor.executemany("""
+            INSERT OR REPLACE INTO character_vectors (character_id, content_hash, terms, weights, minhash)
+            VALUES (?, ?, ?, ?, ?)
+        """, vector_rows)
+        cursor.executemany("INSERT OR IGNORE INTO character_vector_bands VALUES (?, ?, ?)", band_rows)
+        conn.commit()
+        return {'indexed': len(changed), 'unchanged': len(profiles) - len(changed), 'removed': len(removed)}
+    finally:
+        conn.close()
+
+
+class SimilarCharacters:
+    """LSH candidate lookup plus exact cosine re-ranking"""
+
+    def __init__(self, db_path: str = "universe.db"):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.names = NameIndex.from_cursor(self.conn.cursor())
+
+    def close(self):
+        """Close database connection"""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _vector(self, character_id) -> Optional[Tuple[Dict[int, float], array]]:
+        row = self.conn.execute(
+            "SELECT terms, weights, minhash FROM character_vectors WHERE character_id = ?",
+            (character_id,)).fetchone()
+        if row is None:
+            return None
+        return _unpack(row[0], row[1]), array('I', row[2])
+
+    def _candidates(self, signature: array) -> List[Any]:
+        cursor = self.conn.cursor()
+        count = cursor.execute("SELECT COUNT(*) FROM character_vectors").fetchone()[0]
+        if count <= EXHAUSTIVE_LIMIT:
+            return [row[0] for row in cursor.execute("SELECT character_id FROM character_vectors")]
+        seen = set()
+        for band, bucket in band_buckets(signature):
+            cursor.execute("SELECT character_id FROM character_vector_bands WHERE band = ? AND bucket = ?",
+                           (band, bucket))
+            seen.update(row[0] for row in cursor.fetchall())
+        return list(seen)
+
+    def _rank(self, query: Dict[int, float], signature: array, k: int, exclude=None
+              ) -> List[Dict[str, Any]]:
+        candidates = [c for c in self._candidates(signature) if c != exclude]
+        scored = []
+        for start in range(0, len(candidates), 500):
+            chunk = candidates[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT character_id, terms, weights FROM character_vectors "
+                f"WHERE character_id IN ({','.join('?' * len(chunk))})", chunk).fetchall()
+            for character_id, terms, weights in rows:
+                score = cosine(query, _unpack(terms, weights))
+                if score > 0:
+                    scored.append((score, character_id))
+        scored.sort(key=lambda s: (-s[0], str(s[1])))
+        return [{'character_id': character_id, 'character_name': self.names.names.get(character_id),
+                 'score': round(score, 4)} for score, character_id in scored[:k]]
+
+    def like(self, character, k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Characters most similar to a character.
+
+        Args:
+            character: character_id or any resolvable name
+            k: Number of results
+
+        Returns:
+            List of {character_id, character_name, score}, best first
+        """
+        character_id = character if character in self.names.names else self.names.resolve(str(character))
+        found = self._vector(character_id) if character_id is not None else None
+        if found is None:
+            return []
+        return self._rank(found[0], found[1], k, exclude=character_id)
+
+    def like_text(self, text: str, k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Characters most similar to a free-text description.
+
+        Uses raw term frequencies (no IDF) for the query side.
+        """
+        frequencies = term_frequencies({'personality_summary': text})
+        norm = math.sqrt(sum(w * w for w in frequencies.values())) or 1.0
+        query = {term: w / norm for term, w in frequencies.items()}
+        return self._rank(query, minhash(sorted(query)), k)
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[2] not in ('index', 'like'):
+        print("Usage: python similar_characters.py <database_path> index [--full]")
+        print("       python similar_characters.py <database_path> like <character> [k]")
+        sys.exit(1)
+
+    db_path, command = sys.argv[1], sys.argv[2]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    if command == 'index':
+        result = index_characters(db_path, full='--full' in sys.argv)
+        print(f"✓ Indexed {result['indexed']} characters "
+              f"({result['unchanged']} unchanged, {result['removed']} removed)")
+        return
+
+    if len(sys.argv) < 4:
+        print("❌ Missing character")
+        sys.exit(1)
+    k = int(sys.argv[4]) if len(sys.argv) > 4 else 5
+    with SimilarCharacters(db_path) as search:
+        results = search.like(sys.argv[3], k)
+        if not results:
+            print(f"  ✗ No vector for '{sys.argv[3]}' (run index first?)")
+        for result in results:
+            print(f"  {result['score']:.3f}  {result['character_name']} ({result['character_id']})")
+
+
+if __name__ == "__main__":
+    main()
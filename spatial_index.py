@@ -0,0 +1,592 @@
+#!/usr/bin/env python3
+"""
+Spatial Location Index
+======================
+Coordinates are stored two ways:
+
+    locations        latitude / longitude columns (numbers or text)
+    land_war_map     coordinates_hint  "Center of Matsumoto Valley — 36.23°N, 137.97°E"
+
+Nothing parsed or indexed them. This importer step parses every coordinate
+into numeric latitude/longitude (adding the columns to land_war_map), puts
+one row per place in spatial_points and indexes it with an R*Tree (a
+(latitude, longitude) B-tree index when R*Tree is not compiled in).
+Values that do not parse are left as written and reported, never nulled.
+
+land_war_events.location is free text ("Matsumoto", "Hyōketsu no Miya —
+Resonance Vault") that rarely equals a place name, so the same step
+resolves it to a place (exact name first, then the place sharing the most
+leading words, e.g. Matsumoto → Matsumoto Valley Rift) and stores the
+result in land_war_events.location_id / region_id.
+
+Queries go through the index first and refine with great-circle distance:
+
+    in_bbox(min_lat, min_lon, max_lat, max_lon)    points inside a box
+    within_radius(lat, lon, km)                    points within a distance
+    nearest(lat, lon, k)                           k closest points
+    characters_near / events_near                  joined through
+                                                   current_location_id,
+                                                   character_events.location_id
+                                                   and land_war_events.location_id
+                                                   / region_id
+
+Usage:
+    python spatial_index.py <database_path>                     # import + index
+    python spatial_index.py <database_path> near <lat> <lon> [k]
+    python spatial_index.py <database_path> radius <lat> <lon> <km>
+"""
+
+import math
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from database_utils import table_exists, table_columns, rtree_available
+from name_index import normalize_name
+
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# 36.23°N, 137.97°E  |  36°13′48″N 137°58′12″E  |  -33.86, 151.21
+HEMISPHERE_RE = re.compile(
+    r"(\d{1,3}(?:\.\d+)?)\s*°\s*(?:(\d{1,2}(?:\.\d+)?)\s*['′]\s*)?(?:(\d{1,2}(?:\.\d+)?)\s*[\"″]\s*)?([NSEW])",
+    re.IGNORECASE
+)
+DECIMAL_PAIR_RE = re.compile(r"(-?\d{1,3}\.\d+)\s*,\s*(-?\d{1,3}\.\d+)")
+# "Hyōketsu no Miya — Resonance Vault" → one place name per segment
+PLACE_SEPARATOR_RE = re.compile(r"\s+-\s+|[,;/()]")
+
+# (entity_type, table, id column, name column)
+POINT_SOURCES = [
+    ('location', 'locations', 'location_id', 'location_name'),
+    ('land_war_region', 'land_war_map', 'id', 'region'),
+]
+
+# entity_type → land_war_events column holding the resolved place
+EVENT_PLACE_COLUMNS = {
+    'location': 'location_id',
+    'land_war_region': 'region_id',
+}
+
+
+def parse_coordinate(value) -> Optional[float]:
+    """
+    Parse one latitude or longitude value.
+
+    Args:
+        value: Number, decimal string or "36.23°N" / "36°13′48″N" style text
+
+    Returns:
+        Signed decimal degrees, or None
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = HEMISPHERE_RE.search(str(value))
+    if match:
+        degrees = float(match.group(1)) + float(match.group(2) or 0) / 60 + float(match.group(3) or 0) / 3600
+        return -degrees if match.group(4).upper() in 'SW' else degrees
+    try:
+        return float(str(value).strip())
+    except ValueError:
+        return None
+
+
+def parse_coordinates(text: Optional[str]) -> Optional[Tuple[float, float]]:
+    """
+    Extract a (latitude, longitude) pair from free text.
+
+    Args:
+        text: e.g. "Center of Matsumoto Valley — 36.23°N, 137.97°E"
+
+    Returns:
+        (latitude, longitude) in signed decimal degrees, or None
+    """
+    if not text:
+        return None
+    latitude = longitude = None
+    for match in HEMISPHERE_RE.finditer(text):
+        degrees = float(match.group(1)) + float(match.group(2) or 0) / 60 + float(match.group(3) or 0) / 3600
+        hemisphere = match.group(4).upper()
+        if hemisphere in 'NS' and latitude is None:
+            latitude = -degrees if hemisphere == 'S' else degrees
+        elif hemisphere in 'EW' and longitude is None:
+            longitude = -degrees if hemisphere == 'W' else degrees
+    if latitude is None or longitude is None:
+        match = DECIMAL_PAIR_RE.search(text)
+        if not match:
+            return None
+        latitude, longitude = float(match.group(1)), float(match.group(2))
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    return latitude, longitude
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlambda = phi2 - phi1, math.radians(lon2 - lon1)
+    h = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+def radius_boxes(lat: float, lon: float, km: float) -> List[Tuple[float, float, float, float]]:
+    """
+    Bounding boxes (min_lat, min_lon, max_lat, max_lon) covering a circle.
+
+    Splits at the antimeridian and widens to all longitudes near the poles.
+    """
+    dlat = km / KM_PER_DEGREE
+    min_lat, max_lat = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if max_lat >= 90 or min_lat <= -90 or cos_lat < 1e-9 or km / (KM_PER_DEGREE * cos_lat) >= 180:
+        return [(min_lat, -180.0, max_lat, 180.0)]
+    dlon = km / (KM_PER_DEGREE * cos_lat)
+    lo, hi = lon - dlon, lon + dlon
+    if lo < -180:
+        return [(min_lat, lo + 360, max_lat, 180.0), (min_lat, -180.0, max_lat, hi)]
+    if hi > 180:
+        return [(min_lat, lo, max_lat, 180.0), (min_lat, -180.0, max_lat, hi - 360)]
+    return [(min_lat, lo, max_lat, hi)]
+
+
+def resolve_place(text: Optional[str], places: List[Tuple[str, Any, str]]) -> Optional[Tuple[str, Any]]:
+    """
+    Resolve free-text event location to a known place.
+
+    Each segment of the text is tried as an exact normalized name first;
+    otherwise the place sharing the most leading words with a segment wins,
+    unless several places tie.
+
+    Args:
+        text: Location text, e.g. "Hyōketsu no Miya — Resonance Vault"
+        places: (entity_type, entity_id, name_key) of every known place
+
+    Returns:
+        (entity_type, entity_id), or None
+    """
+    if not text:
+        return None
+    segments = [part.strip() for part in PLACE_SEPARATOR_RE.split(normalize_name(text)) if part.strip()]
+    by_key = {}
+    for entity_type, entity_id, key in places:
+        by_key.setdefault(key, []).append((entity_type, entity_id))
+    for segment in segments:
+        if len(by_key.get(segment, ())) == 1:
+            return by_key[segment][0]
+
+    for segment in segments:
+        words = segment.split()
+        best, best_shared = [], 0
+        for entity_type, entity_id, key in places:
+            shared = 0
+            for ours, theirs in zip(words, key.split()):
+                if ours != theirs:
+                    break
+                shared += 1
+            if shared and shared > best_shared:
+                best, best_shared = [(entity_type, entity_id)], shared
+            elif shared and shared == best_shared:
+                best.append((entity_type, entity_id))
+        if len(best) == 1:
+            return best[0]
+    return None
+
+
+def create_spatial_tables(cursor) -> bool:
+    """
+    Create spatial_points and its index.
+
+    Returns:
+        True if the R*Tree index is used
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS spatial_points (
+            point_id INTEGER PRIMARY KEY,
+            entity_type TEXT NOT NULL,
+            entity_id NOT NULL,
+            name TEXT,
+            name_key TEXT,
+            latitude REAL NOT NULL,
+            longitude REAL NOT NULL,
+            UNIQUE (entity_type, entity_id)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_spatial_points_name_key ON spatial_points(name_key)")
+
+    if rtree_available(cursor):
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS spatial_points_rtree
+            USING rtree(point_id, min_lat, max_lat, min_lon, max_lon)
+        """)
+        return True
+
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_spatial_points_lat_lon
+        ON spatial_points(latitude, longitude)
+    """)
+    return False
+
+
+def _ensure_numeric_columns(cursor, table: str):
+    columns = table_columns(cursor, table)
+    for column in ('latitude', 'longitude'):
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} REAL")
+
+
+def _resolve_event_places(cursor, points: List[Tuple]) -> List[Tuple[int, str]]:
+    """
+    Store the place each land_war_events.location names.
+
+    Returns:
+        (event id, location text) for locations that named no known place
+    """
+    columns = table_columns(cursor, 'land_war_events')
+    for column in EVENT_PLACE_COLUMNS.values():
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE land_war_events ADD COLUMN {column}")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_land_war_events_{column} ON land_war_events({column})")
+
+    places = [(entity_type, entity_id, key) for entity_type, entity_id, _, key, _, _ in points if key]
+    cursor.execute("SELECT id, location FROM land_war_events")
+    updates, unresolved = [], []
+    for event_id, location in cursor.fetchall():
+        place = resolve_place(location, places)
+        if place is None and location:
+            unresolved.append((event_id, location))
+        values = {column: None for column in EVENT_PLACE_COLUMNS.values()}
+        if place:
+            values[EVENT_PLACE_COLUMNS[place[0]]] = place[1]
+        updates.append((*values.values(), event_id))
+    assignments = ', '.join(f"{column} = ?" for column in EVENT_PLACE_COLUMNS.values())
+    cursor.executemany(f"UPDATE land_war_events SET {assignments} WHERE id = ?", updates)
+    return unresolved
+
+
+def import_coordinates(db_path: str) -> Dict[str, Any]:
+    """
+    Parse coordinates into numeric columns and rebuild the spatial index.
+
+    Args:
+        db_path: Path to database
+
+    Returns:
+        {'points': count, 'unparsed': [(entity_type, entity_id, raw), ...],
+         'unresolved': [(land_war_events id, location), ...]}
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        use_rtree = create_spatial_tables(cursor)
+        points, unparsed = [], []
+
+        if table_exists(cursor, 'land_war_map'):
+            _ensure_numeric_columns(cursor, 'land_war_map')
+            cursor.execute("SELECT id, coordinates_hint FROM land_war_map")
+            updates = []
+            for region_id, hint in cursor.fetchall():
+                parsed = parse_coordinates(hint)
+                updates.append((*(parsed or (None, None)), region_id))
+                if parsed is None and hint:
+                    unparsed.append(('land_war_region', region_id, hint))
+            cursor.executemany("UPDATE land_war_map SET latitude = ?, longitude = ? WHERE id = ?", updates)
+
+        if table_exists(cursor, 'locations'):
+            # latitude/longitude may hold text such as "36.23°N"; normalize to REAL
+            cursor.execute("SELECT location_id, latitude, longitude FROM locations")
+            updates = []
+            for location_id, raw_lat, raw_lon in cursor.fetchall():
+                lat, lon = parse_coordinate(raw_lat), parse_coordinate(raw_lon)
+                failed = any(value is None and raw not in (None, '')
+                             for raw, value in ((raw_lat, lat), (raw_lon, lon)))
+                if failed or (lat is None) != (lon is None):
+                    unparsed.append(('location', location_id, f"{raw_lat}, {raw_lon}"))
+                # Only parsed values are written back; unparseable text is kept
+                new_lat = raw_lat if lat is None else lat
+                new_lon = raw_lon if lon is None else lon
+                if (new_lat, new_lon) != (raw_lat, raw_lon):
+                    updates.append((new_lat, new_lon, location_id))
+            cursor.executemany("UPDATE locations SET latitude = ?, longitude = ? WHERE location_id = ?", updates)
+
+        for entity_type, table, id_col, name_col in POINT_SOURCES:
+            if not table_exists(cursor, table):
+                continue
+            cursor.execute(f"""
+                SELECT {id_col}, {name_col}, latitude, longitude FROM {table}
+                WHERE typeof(latitude) IN ('integer', 'real')
+                  AND typeof(longitude) IN ('integer', 'real')
+            """)
+            for entity_id, name, lat, lon in cursor.fetchall():
+                if -90 <= lat <= 90 and -180 <= lon <= 180:
+                    points.append((entity_type, entity_id, name, normalize_name(name or ''), lat, lon))
+
+        cursor.execute("DELETE FROM spatial_points")
+        cursor.executemany("""
+            INSERT INTO spatial_points (entity_type, entity_id, name, name_key, latitude, longitude)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, points)
+        if use_rtree:
+            cursor.execute("DELETE FROM spatial_points_rtree")
+            cursor.execute("""
+                INSERT INTO spatial_points_rtree (point_id, min_lat, max_lat, min_lon, max_lon)
+                SELECT point_id, latitude, latitude, longitude, longitude FROM spatial_points
+            """)
+
+        unresolved = []
+        if table_exists(cursor, 'land_war_events'):
+            unresolved = _resolve_event_places(cursor, points)
+
+        conn.commit()
+        return {'points': len(points), 'unparsed': unparsed, 'unresolved': unresolved}
+    finally:
+        conn.close()
+
+
+def _box_query(cursor, boxes: List[Tuple[float, float, float, float]],
+               entity_type: Optional[str]) -> List[Dict[str, Any]]:
+    """Points inside any of the boxes, through the R*Tree when present"""
+    use_rtree = table_exists(cursor, 'spatial_points_rtree')
+    rows = []
+    for min_lat, min_lon, max_lat, max_lon in boxes:
+        if use_rtree:
+            # R*Tree stores 32-bit floats, so widen by a hair and re-check exactly
+            query = """
+                SELECT p.* FROM spatial_points_rtree r
+                JOIN spatial_points p ON p.point_id = r.point_id
+                WHERE r.max_lat >= ? AND r.min_lat <= ? AND r.max_lon >= ? AND r.min_lon <= ?
+                  AND p.latitude BETWEEN ? AND ? AND p.longitude BETWEEN ? AND ?
+            """
+            params = [min_lat - 1e-4, max_lat + 1e-4, min_lon - 1e-4, max_lon + 1e-4,
+                      min_lat, max_lat, min_lon, max_lon]
+        else:
+            query = """
+                SELECT p.* FROM spatial_points p
+                WHERE p.latitude BETWEEN ? AND ? AND p.longitude BETWEEN ? AND ?
+            """
+            params = [min_lat, max_lat, min_lon, max_lon]
+        if entity_type is not None:
+            query += " AND p.entity_type = ?"
+            params.append(entity_type)
+        cursor.execute(query, params)
+        rows.extend(dict(row) for row in cursor.fetchall())
+    return rows
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def in_bbox(db_path: str, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+            entity_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Points inside a bounding box (min_lon > max_lon wraps the antimeridian).
+
+    Args:
+        db_path: Path to database
+        min_lat, min_lon, max_lat, max_lon: Box corners in degrees
+        entity_type: Optional filter ('location', 'land_war_region')
+
+    Returns:
+        List of spatial_points rows
+    """
+    boxes = ([(min_lat, min_lon, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon)]
+             if min_lon > max_lon else [(min_lat, min_lon, max_lat, max_lon)])
+    conn = _connect(db_path)
+    try:
+        return sorted(_box_query(conn.cursor(), boxes, entity_type),
+                      key=lambda p: (p['latitude'], p['longitude'], p['point_id']))
+    finally:
+        conn.close()
+
+
+def _within(cursor, lat: float, lon: float, km: float,
+            entity_type: Optional[str]) -> List[Dict[str, Any]]:
+    found = []
+    for point in _box_query(cursor, radius_boxes(lat, lon, km), entity_type):
+        distance = haversine_km(lat, lon, point['latitude'], point['longitude'])
+        if distance <= km:
+            found.append({**point, 'distance_km': round(distance, 3)})
+    return sorted(found, key=lambda p: (p['distance_km'], p['point_id']))
+
+
+def within_radius(db_path: str, lat: float, lon: float, km: float,
+                  entity_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Points within `km` kilometres, nearest first.
+
+    Args:
+        db_path: Path to database
+        lat, lon: Centre in degrees
+        km: Radius in kilometres
+        entity_type: Optional filter
+
+    Returns:
+        List of spatial_points rows with distance_km
+    """
+    conn = _connect(db_path)
+    try:
+        return _within(conn.cursor(), lat, lon, km, entity_type)
+    finally:
+        conn.close()
+
+
+def nearest(db_path: str, lat: float, lon: float, k: int = 5,
+            entity_type: Optional[str] = None, start_km: float = 10.0) -> List[Dict[str, Any]]:
+    """
+    The k nearest points.
+
+    Searches a growing radius until k points are inside it; every point
+    closer than the k-th lies inside that circle, so the result is exact.
+
+    Args:
+        db_path: Path to database
+        lat, lon: Origin in degrees
+        k: Number of points
+        entity_type: Optional filter
+        start_km: First search radius
+
+    Returns:
+        List of spatial_points rows with distance_km, nearest first
+    """
+    conn = _connect(db_path)
+    try:
+        cursor = conn.cursor()
+        total = cursor.execute("SELECT COUNT(*) FROM spatial_points").fetchone()[0]
+        km = start_km
+        while True:
+            found = _within(cursor, lat, lon, km, entity_type)
+            if len(found) >= k or km >= math.pi * EARTH_RADIUS_KM or len(found) >= total:
+                return found[:k]
+            km *= 4
+    finally:
+        conn.close()
+
+
+def characters_near(db_path: str, lat: float, lon: float, km: float) -> List[Dict[str, Any]]:
+    """
+    Characters whose current_location_id lies within `km`.
+
+    Returns:
+        List of {character_id, character_name, location_name, distance_km}
+    """
+    conn = _connect(db_path)
+    try:
+        cursor = conn.cursor()
+        if 'current_location_id' not in table_columns(cursor, 'characters'):
+            return []
+        places = {p['entity_id']: p for p in _within(cursor, lat, lon, km, 'location')}
+        results = []
+        ids = list(places)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            cursor.execute(f"""
+                SELECT character_id, character_name, current_location_id FROM characters
+                WHERE current_location_id IN ({','.join('?' * len(chunk))})
+            """, chunk)
+            for row in cursor.fetchall():
+                place = places[row['current_location_id']]
+                results.append({'character_id': row['character_id'], 'character_name': row['character_name'],
+                                'location_name': place['name'], 'distance_km': place['distance_km']})
+        return sorted(results, key=lambda r: (r['distance_km'], str(r['character_id'])))
+    finally:
+        conn.close()
+
+
+def events_near(db_path: str, lat: float, lon: float, km: float) -> List[Dict[str, Any]]:
+    """
+    Events at places within `km`: character_events by location_id and
+    land_war_events by the location_id / region_id resolved at import.
+
+    Returns:
+        List of {source, event_id, title, place, distance_km}
+    """
+    conn = _connect(db_path)
+    try:
+        cursor = conn.cursor()
+        places = _within(cursor, lat, lon, km, None)
+        results = []
+
+        locations = {p['entity_id']: p for p in places if p['entity_type'] == 'location'}
+        if locations and table_exists(cursor, 'character_events'):
+            ids = list(locations)
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                cursor.execute(f"""
+                    SELECT event_id, description, location_id FROM character_events
+                    WHERE location_id IN ({','.join('?' * len(chunk))})
+                """, chunk)
+                for row in cursor.fetchall():
+                    place = locations[row['location_id']]
+                    results.append({'source': 'character_event', 'event_id': row['event_id'],
+                                    'title': row['description'], 'place': place['name'],
+                                    'distance_km': place['distance_km']})
+
+        if places and table_exists(cursor, 'land_war_events'):
+            columns = table_columns(cursor, 'land_war_events')
+            for entity_type, column in EVENT_PLACE_COLUMNS.items():
+                nearby = {p['entity_id']: p for p in places if p['entity_type'] == entity_type}
+                if not nearby or column not in columns:
+                    continue
+                ids = list(nearby)
+                for start in range(0, len(ids), 500):
+                    chunk = ids[start:start + 500]
+                    cursor.execute(f"""
+                        SELECT id, title, {column} FROM land_war_events
+                        WHERE {column} IN ({','.join('?' * len(chunk))})
+                    """, chunk)
+                    for row in cursor.fetchall():
+                        place = nearby[row[column]]
+                        results.append({'source': 'land_war_event', 'event_id': row['id'],
+                                        'title': row['title'], 'place': place['name'],
+                                        'distance_km': place['distance_km']})
+
+        return sorted(results, key=lambda r: (r['distance_km'], r['source'], r['event_id']))
+    finally:
+        conn.close()
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python spatial_index.py <database_path>")
+        print("       python spatial_index.py <database_path> near <lat> <lon> [k]")
+        print("       python spatial_index.py <database_path> radius <lat> <lon> <km>")
+        sys.exit(1)
+
+    db_path = sys.argv[1]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    if len(sys.argv) >= 5 and sys.argv[2] in ('near', 'radius'):
+        lat, lon = float(sys.argv[3]), float(sys.argv[4])
+        if sys.argv[2] == 'near':
+            points = nearest(db_path, lat, lon, int(sys.argv[5]) if len(sys.argv) > 5 else 5)
+        else:
+            points = within_radius(db_path, lat, lon, float(sys.argv[5]) if len(sys.argv) > 5 else 10.0)
+        for point in points:
+            print(f"  {point['distance_km']:9.3f} km  {point['name']} ({point['entity_type']}:{point['entity_id']})"
+                  f"  {point['latitude']:.4f}, {point['longitude']:.4f}")
+        return
+
+    result = import_coordinates(db_path)
+    print(f"✓ Indexed {result['points']} points")
+    if result['unparsed']:
+        print(f"⚠ {len(result['unparsed'])} coordinates could not be parsed:")
+        for entity_type, entity_id, raw in result['unparsed']:
+            print(f"   • {entity_type}:{entity_id} = {raw!r}")
+    if result['unresolved']:
+        print(f"ℹ {len(result['unresolved'])} event locations name no indexed place:")
+        for event_id, location in result['unresolved']:
+            print(f"   • land_war_events:{event_id} = {location!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Aggregate Counters for Dashboards & Stats
+==========================================
+Maintains a small stats_counters table with triggers so dashboard numbers
+(row counts, characters per faction / status, members per division,
+affiliations per clearance level) are read directly instead of running
+COUNT(*) and GROUP BY over the full tables on every refresh.
+
+Counters are keyed by (scope, key):
+    scope 'table'           key = table name
+    scope 'faction'         key = characters.faction
+    scope 'status'          key = characters.status
+    scope 'division'        key = character_corporate_affiliations.division_id
+    scope 'clearance_level' key = character_corporate_affiliations.clearance_level
+
+NULL values are counted under the NULL_KEY sentinel (a single NUL
+character, which never appears in real names) and returned as None, so
+they stay separate from genuine empty strings.
+
+Usage:
+    python stats_counters.py <database_path> install   # create table + triggers, then rebuild
+    python stats_counters.py <database_path> rebuild   # recompute everything from scratch
+    python stats_counters.py <database_path> show      # print current counters
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from database_utils import table_exists, table_columns
+
+
+# Tables whose total row count is tracked
+COUNTED_TABLES = [
+    'locations',
+    'corporations',
+    'divisions',
+    'characters',
+    'character_events',
+    'character_corporate_affiliations',
+]
+
+# (table, column, scope) - per-value counters
+GROUPED_COLUMNS = [
+    ('characters', 'faction', 'faction'),
+    ('characters', 'status', 'status'),
+    ('character_corporate_affiliations', 'division_id', 'division'),
+    ('character_corporate_affiliations', 'clearance_level', 'clearance_level'),
+]
+
+# Stored in place of NULL, which cannot be part of the primary key
+NULL_KEY = '\x00'
+NULL_KEY_SQL = 'char(0)'
+
+
+def _bump(scope: str, key_expr: str, delta: int) -> str:
+    """Build an upsert statement that adds delta to one counter"""
+    return f"""
+            INSERT INTO stats_counters (scope, key, count)
+            VALUES ('{scope}', COALESCE({key_expr}, {NULL_KEY_SQL}), {delta})
+            ON CONFLICT(scope, key) DO UPDATE SET count = count + ({delta});"""
+
+
+def create_counters_table(cursor):
+    """Create the stats_counters table"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stats_counters (
+            scope TEXT NOT NULL,
+            key TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (scope, key)
+        ) WITHOUT ROWID
+    """)
+
+
+def drop_counter_triggers(cursor):
+    """Drop every trigger created by this module"""
+    cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_stats_%'"
+    )
+    for (name,) in cursor.fetchall():
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def _tracked_columns(cursor, table: str) -> List[tuple]:
+    """Return the (column, scope) pairs that exist on this table"""
+    columns = table_columns(cursor, table)
+    return [
+        (column, scope)
+        for grouped_table, column, scope in GROUPED_COLUMNS
+        if grouped_table == table and column in columns
+    ]
+
+
+def create_counter_triggers(cursor) -> int:
+    """
+    Create insert/update/delete triggers for every tracked table present.
+
+    Returns:
+        Number of triggers created
+    """
+    drop_counter_triggers(cursor)
+    created = 0
+
+    for table in COUNTED_TABLES:
+        if not table_exists(cursor, table):
+            continue
+
+        grouped = _tracked_columns(cursor, table)
+
+        insert_body = _bump('table', f"'{table}'", 1)
+        delete_body = _bump('table', f"'{table}'", -1)
+        for column, scope in grouped:
+            insert_body += _bump(scope, f"NEW.{column}", 1)
+            delete_body += _bump(scope, f"OLD.{column}", -1)
+
+        cursor.execute(f"""
+            CREATE TRIGGER trg_stats_{table}_ins
+            AFTER INSERT ON {table}
+            BEGIN{insert_body}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER trg_stats_{table}_del
+            AFTER DELETE ON {table}
+            BEGIN{delete_body}
+            END
+        """)
+        created += 2
+
+        for column, scope in grouped:
+            cursor.execute(f"""
+                CREATE TRIGGER trg_stats_{table}_upd_{column}
+                AFTER UPDATE OF {column} ON {table}
+                WHEN OLD.{column} IS NOT NEW.{column}
+                BEGIN{_bump(scope, f"OLD.{column}", -1)}{_bump(scope, f"NEW.{column}", 1)}
+                END
+            """)
+            created += 1
+
+    return created
+
+
+def rebuild_counters_with_cursor(cursor):
+    """Recompute every counter from the base tables"""
+    cursor.execute("DELETE FROM stats_counters")
+
+    for table in COUNTED_TABLES:
+        if not table_exists(cursor, table):
+            continue
+
+        cursor.execute(
+            f"INSERT INTO stats_counters (scope, key, count) SELECT 'table', ?, COUNT(*) FROM {table}",
+            (table,)
+        )
+        for column, scope in _tracked_columns(cursor, table):
+            cursor.execute(f"""
+                INSERT INTO stats_counters (scope, key, count)
+                SELECT ?, COALESCE({column}, {NULL_KEY_SQL}), COUNT(*)
+                FROM {table}
+                GROUP BY COALESCE({column}, {NULL_KEY_SQL})
+            """, (scope,))
+
+
+def install_counters(db_path: str) -> int:
+    """
+    Create the counters table and triggers, then populate it.
+
+    Args:
+        db_path: Path to database
+
+    Returns:
+        Number of triggers created
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        create_counters_table(cursor)
+        created = create_counter_triggers(cursor)
+        rebuild_counters_with_cursor(cursor)
+        conn.commit()
+    finally:
+        conn.close()
+    return created
+
+
+def rebuild_counters(db_path: str):
+    """
+    Recompute all counters from scratch (use after bulk loads with
+    triggers disabled, or to repair drift).
+
+    Args:
+        db_path: Path to database
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        create_counters_table(cursor)
+        rebuild_counters_with_cursor(cursor)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def counters_installed(cursor) -> bool:
+    """Check whether stats_counters exists in the connected database"""
+    return table_exists(cursor, 'stats_counters')
+
+
+def read_counters(cursor, scope: str) -> Dict[Optional[str], int]:
+    """
+    Read all non-zero counters for a scope using an open cursor.
+
+    Args:
+        cursor: Open sqlite3 cursor
+        scope: 'table', 'faction', 'status', 'division' or 'clearance_level'
+
+    Returns:
+        Dictionary of key -> count, largest first (NULL_KEY mapped to None)
+    """
+    cursor.execute(
+        "SELECT key, count FROM stats_counters WHERE scope = ? AND count > 0 ORDER BY count DESC, key",
+        (scope,)
+    )
+    return {(key if key != NULL_KEY else None): count for key, count in cursor.fetchall()}
+
+
+def get_counters(db_path: str, scope: str) -> Dict[Optional[str], int]:
+    """
+    Read all non-zero counters for a scope.
+
+    Args:
+        db_path: Path to database
+        scope: 'table', 'faction', 'status', 'division' or 'clearance_level'
+
+    Returns:
+        Dictionary of key -> count
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        return read_counters(conn.cursor(), scope)
+    finally:
+        conn.close()
+
+
+def get_counter(db_path: str, scope: str, key: Optional[str]) -> int:
+    """
+    Read a single counter (primary-key lookup).
+
+    Args:
+        db_path: Path to database
+        scope: Counter scope
+        key: Counter key (None for NULL values)
+
+    Returns:
+        Current count (0 if never seen)
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute(
+            "SELECT count FROM stats_counters WHERE scope = ? AND key = ?",
+            (scope, NULL_KEY if key is None else key)
+        ).fetchone()
+        return row[0] if row else 0
+    finally:
+        conn.close()
+
+
+def print_counters(db_path: str):
+    """Print all counters grouped by scope"""
+    for scope in ['table', 'faction', 'status', 'division', 'clearance_level']:
+        counters = get_counters(db_path, scope)
+        print(f"\n📊 {scope}:")
+        if not counters:
+            print("   (none)")
+        for key, count in counters.items():
+            print(f"   • {key if key is not None else '(none)'}: {count}")
+
+
+def main():
+    if len(sys.argv) != 3 or sys.argv[2] not in ('install', 'rebuild', 'show'):
+        print("Usage: python stats_counters.py <database_path> install|rebuild|show")
+        sys.exit(1)
+
+    db_path, command = sys.argv[1], sys.argv[2]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    if command == 'install':
+        created = install_counters(db_path)
+        print(f"✓ Installed stats_counters with {created} triggers")
+    elif command == 'rebuild':
+        rebuild_counters(db_path)
+        print("✓ Rebuilt stats_counters")
+
+    print_counters(db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Concurrency Stress Test
+=======================
+Runs N reader processes and one writer process against a scratch copy of
+universe_database_schema.sql and reports throughput, latency and errors.
+
+    default      rollback journal, deferred write transactions (how the
+                 scripts behaved before connection profiles)
+    concurrent   WAL, busy_timeout, BEGIN IMMEDIATE with retry/backoff and
+                 a Checkpointer running once a second
+
+Readers mix the database_utils lookups (character by name, faction search,
+timeline join). The writer commits batches the way the importers do: one
+new character plus a run of timeline events per transaction.
+
+Usage:
+    python stress_concurrency.py [readers] [seconds] [default|concurrent|both]
+"""
+
+import multiprocessing
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from database_utils import Checkpointer, DatabaseConnection
+
+
+SCHEMA_FILE = Path(__file__).with_name('universe_database_schema.sql')
+SEED_CHARACTERS = 2000
+SEED_EVENTS = 10
+EVENTS_PER_COMMIT = 50
+FACTIONS = ['Nexus Enraenra', 'Iron Sultura', 'Shadow Core', 'Aethos', 'Unknown']
+
+
+def build_scratch_database(db_path: str, journal_mode: str):
+    """Create the Phase 3 schema and seed characters with timelines"""
+    conn = sqlite3.connect(db_path)
+    try:
+        # Switching to WAL needs an exclusive lock, so it is done once up
+        # front rather than raced by the first burst of connections
+        conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+        conn.executescript(SCHEMA_FILE.read_text(encoding='utf-8'))
+        conn.executemany(
+            "INSERT INTO characters (character_name, faction) VALUES (?, ?)",
+            [(f"Seed {i}", FACTIONS[i % len(FACTIONS)]) for i in range(SEED_CHARACTERS)]
+        )
+        conn.executemany(
+            """INSERT INTO character_events (character_id, event_year, event_type, description)
+               VALUES (?, ?, 'career', ?)""",
+            [(c, 2000 + e, f"Seed event {e}")
+             for c in range(1, SEED_CHARACTERS + 1) for e in range(SEED_EVENTS)]
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def reader(db_path: str, profile: str, seconds: float, start, results):
+    """Run lookups for `seconds` once every worker is ready"""
+    latencies, errors = [], Counter()
+    start.wait()
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        start = time.perf_counter()
+        try:
+            with DatabaseConnection(db_path, profile) as db:
+                choice = random.random()
+                if choice < 0.5:
+                    db.execute("SELECT * FROM characters WHERE character_name = ?",
+                               (f"Seed {random.randrange(SEED_CHARACTERS)}",))
+                elif choice < 0.8:
+                    db.execute("""SELECT e.*, l.location_name
+                                  FROM character_events e
+                                  JOIN characters c ON e.character_id = c.character_id
+                                  LEFT JOIN locations l ON e.location_id = l.location_id
+                                  WHERE c.character_name = ?
+                                  ORDER BY e.event_year, e.event_date""",
+                               (f"Seed {random.randrange(SEED_CHARACTERS)}",))
+                else:
+                    db.execute("SELECT * FROM characters WHERE faction = ?", (random.choice(FACTIONS),))
+                db.fetchall()
+            latencies.append(time.perf_counter() - start)
+        except sqlite3.Error as e:
+            errors[str(e)] += 1
+    results.put(('reader', latencies, errors, 0))
+
+
+def writer(db_path: str, profile: str, seconds: float, start, results):
+    """Commit one character plus EVENTS_PER_COMMIT events per transaction"""
+    latencies, errors, rows = [], Counter(), 0
+    serial = 0
+    start.wait()
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        serial += 1
+        start = time.perf_counter()
+        try:
+            with DatabaseConnection(db_path, profile, write=(profile == 'concurrent')) as db:
+                db.execute("INSERT INTO characters (character_name, faction) VALUES (?, ?)",
+                           (f"Stress {serial}", random.choice(FACTIONS)))
+                character_id = db.cursor.lastrowid
+                db.cursor.executemany(
+                    """INSERT INTO character_events (character_id, event_year, event_type, description)
+                       VALUES (?, ?, 'career', ?)""",
+                    [(character_id, 2100 + e, f"Stress event {e}") for e in range(EVENTS_PER_COMMIT)]
+                )
+            latencies.append(time.perf_counter() - start)
+            rows += 1 + EVENTS_PER_COMMIT
+        except sqlite3.Error as e:
+            errors[str(e)] += 1
+    results.put(('writer', latencies, errors, rows))
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def run_mode(profile: str, readers: int, seconds: float):
+    """Run one mode on a fresh scratch database and print its results"""
+    workdir = tempfile.mkdtemp(prefix='stress_')
+    db_path = str(Path(workdir) / 'stress.db')
+    try:
+        build_scratch_database(db_path, 'WAL' if profile == 'concurrent' else 'DELETE')
+        checkpointer = Checkpointer(db_path, interval=1.0) if profile == 'concurrent' else None
+        if checkpointer:
+            checkpointer.start()
+
+        # Fresh interpreters, like separate scripts; forking would copy this
+        # process's SQLite state, including whatever the checkpointer holds
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        start = context.Barrier(readers + 2)
+        workers = [context.Process(target=reader, args=(db_path, profile, seconds, start, results))
+                   for _ in range(readers)]
+        workers.append(context.Process(target=writer, args=(db_path, profile, seconds, start, results)))
+        for worker in workers:
+            worker.start()
+        start.wait()
+        collected = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        if checkpointer:
+            checkpointer.stop()
+
+        read_latencies = [l for role, lat, _, _ in collected if role == 'reader' for l in lat]
+        write_latencies, rows = next((lat, r) for role, lat, _, r in collected if role == 'writer')
+        errors = Counter()
+        for _, _, errs, _ in collected:
+            errors.update(errs)
+
+        print(f"\n{profile} ({readers} readers + 1 writer, {seconds:.0f}s)")
+        print(f"  reads:   {len(read_latencies) / seconds:9,.0f}/s   "
+              f"p50 {statistics.median(read_latencies or [0]) * 1000:7.2f} ms   "
+              f"p99 {percentile(read_latencies, 0.99) * 1000:7.2f} ms   "
+              f"max {max(read_latencies or [0]) * 1000:8.2f} ms")
+        print(f"  commits: {len(write_latencies) / seconds:9,.0f}/s   "
+              f"p50 {statistics.median(write_latencies or [0]) * 1000:7.2f} ms   "
+              f"p99 {percentile(write_latencies, 0.99) * 1000:7.2f} ms   "
+              f"({rows / seconds:,.0f} rows/s)")
+        if checkpointer:
+            print(f"  checkpoints: {checkpointer.runs} scheduled, final {checkpointer.last}")
+        if errors:
+            for message, count in errors.most_common():
+                print(f"  ✗ {count} × {message}")
+        else:
+            print("  ✓ no errors")
+        return not errors
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    readers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    mode = sys.argv[3] if len(sys.argv) > 3 else 'both'
+
+    if mode not in ('default', 'concurrent', 'both'):
+        print("Usage: python stress_concurrency.py [readers] [seconds] [default|concurrent|both]")
+        sys.exit(1)
+
+    # Errors are the expected outcome in default mode; only concurrent must be clean
+    ok = True
+    for profile in (['default', 'concurrent'] if mode == 'both' else [mode]):
+        clean = run_mode(profile, readers, seconds)
+        ok = ok and (clean or profile == 'default')
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
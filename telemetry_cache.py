@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Live Telemetry Cache
+====================
+Keeps the most recent readings of every telemetry key in process memory so
+"current value and last 5 minutes" for sensors like sigil_phase_lock or
+rrl_verification never touches disk.
+
+Each key gets a fixed-size ring buffer backed by two array('d') buffers
+(timestamps and values). Pushing a sample and reading the latest value are
+O(1); windowed mean/min/max/percentile walk back from the newest sample
+only as far as the window reaches.
+
+A LiveTelemetry attached to a TelemetryStore is fed by the store's ingest
+API (append/ingest). The store keeps samples queued; whenever a sample
+opens a new flush window, LiveTelemetry tells the store to write every
+sample from the closed windows, so durable writes happen once per window
+instead of once per reading.
+
+Usage:
+    python telemetry_cache.py <database_path> demo [seconds]
+"""
+
+import math
+import random
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from telemetry_store import Sample, TelemetryStore
+
+
+DEFAULT_CAPACITY = 4096
+DEFAULT_FLUSH_WINDOW = 60
+
+
+class RingBuffer:
+    """Fixed-size circular buffer of (timestamp, value) samples"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.values = array('d', bytes(8 * capacity))
+        self.head = 0   # next slot to write
+        self.size = 0
+
+    def push(self, timestamp: float, value: float):
+        """Add a sample, overwriting the oldest when full"""
+        self.timestamps[self.head] = timestamp
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+
+    def latest(self) -> Optional[Tuple[float, float]]:
+        """Newest (timestamp, value), or None when empty"""
+        if not self.size:
+            return None
+        i = (self.head - 1) % self.capacity
+        return self.timestamps[i], self.values[i]
+
+    def window(self, seconds: float, now: Optional[float] = None) -> List[float]:
+        """
+        Values from the last `seconds`, newest first.
+
+        Samples are assumed to arrive in time order (per key), so the walk
+        stops at the first sample older than the window.
+        """
+        cutoff = (time.time() if now is None else now) - seconds
+        result = []
+        i = self.head
+        for _ in range(self.size):
+            i = (i - 1) % self.capacity
+            if self.timestamps[i] < cutoff:
+                break
+            result.append(self.values[i])
+        return result
+
+    def __len__(self) -> int:
+        return self.size
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Linearly interpolated percentile (q in 0..100)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    lo, hi = math.floor(rank), math.ceil(rank)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (rank - lo)
+
+
+class LiveTelemetry:
+    """Per-key ring buffers with windowed aggregates, fed by a TelemetryStore"""
+
+    def __init__(self, store: Optional[TelemetryStore] = None, capacity: int = DEFAULT_CAPACITY,
+                 flush_window: float = DEFAULT_FLUSH_WINDOW):
+        """
+        Args:
+            store: Store to attach to (its ingest feeds the cache, closed
+                   windows are flushed to it); None for a standalone cache
+            capacity: Samples kept per key
+            flush_window: Width in seconds of the windows flushed to the store
+        """
+        self.capacity = capacity
+        self.flush_window = flush_window
+        self.buffers: Dict[str, RingBuffer] = {}
+        self.store = store
+        self._open_window: Optional[int] = None
+        if store is not None:
+            store.subscribe(self.observe)
+
+    def observe(self, samples: List[Sample]):
+        """Push ingested samples into the ring buffers"""
+        newest = None
+        for key, timestamp, value in samples:
+            buffer = self.buffers.get(key)
+            if buffer is None:
+                buffer = self.buffers[key] = RingBuffer(self.capacity)
+            buffer.push(timestamp, value)
+            newest = timestamp if newest is None else max(newest, timestamp)
+        if newest is not None:
+            self._advance(newest)
+
+    def record(self, key: str, value: float, timestamp: Optional[float] = None):
+        """Record one reading (through the store when attached)"""
+        if self.store is not None:
+            self.store.append(key, value, timestamp)
+        else:
+            self.observe([(key, time.time() if timestamp is None else timestamp, float(value))])
+
+    def _advance(self, timestamp: float):
+        """Flush closed windows to the store when a new window opens"""
+        window = int(timestamp // self.flush_window)
+        if self._open_window is None:
+            self._open_window = window
+        elif window > self._open_window:
+            self._open_window = window
+            if self.store is not None:
+                self.store.flush(before=window * self.flush_window)
+
+    def tick(self, now: Optional[float] = None):
+        """Flush windows closed by the clock (call periodically when input is idle)"""
+        self._advance(time.time() if now is None else now)
+
+    # ──────────────────────────────────────────────────────────
+    # Reads
+    # ──────────────────────────────────────────────────────────
+
+    def latest(self, key: str) -> Optional[Tuple[float, float]]:
+        """Newest (timestamp, value) for a key — O(1)"""
+        buffer = self.buffers.get(key)
+        return buffer.latest() if buffer else None
+
+    def window(self, key: str, seconds: float, now: Optional[float] = None) -> List[float]:
+        """Values of a key within the last `seconds`, newest first"""
+        buffer = self.buffers.get(key)
+        return buffer.window(seconds, now) if buffer else []
+
+    def mean(self, key: str, seconds: float, now: Optional[float] = None) -> Optional[float]:
+        """Mean of a key over the last `seconds`"""
+        values = self.window(key, seconds, now)
+        return sum(values) / len(values) if values else None
+
+    def minimum(self, key: str, seconds: float, now: Optional[float] = None) -> Optional[float]:
+        """Minimum of a key over the last `seconds`"""
+        values = self.window(key, seconds, now)
+        return min(values) if values else None
+
+    def maximum(self, key: str, seconds: float, now: Optional[float] = None) -> Optional[float]:
+        """Maximum of a key over the last `seconds`"""
+        values = self.window(key, seconds, now)
+        return max(values) if values else None
+
+    def percentile(self, key: str, seconds: float, q: float,
+                   now: Optional[float] = None) -> Optional[float]:
+        """q-th percentile (0..100) of a key over the last `seconds`"""
+        return percentile(self.window(key, seconds, now), q)
+
+    def summary(self, key: str, seconds: float = 300, now: Optional[float] = None
+                ) -> Optional[Dict[str, float]]:
+        """
+        Current value and window statistics in one pass over the window.
+
+        Returns:
+            {latest, count, mean, min, max, p50, p95} or None if no samples
+        """
+        latest = self.latest(key)
+        values = self.window(key, seconds, now)
+        if latest is None or not values:
+            return None
+        return {
+            'latest': latest[1],
+            'count': len(values),
+            'mean': sum(values) / len(values),
+            'min': min(values),
+            'max': max(values),
+            'p50': percentile(values, 50),
+            'p95': percentile(values, 95),
+        }
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[2] != 'demo':
+        print("Usage: python telemetry_cache.py <database_path> demo [seconds]")
+        sys.exit(1)
+
+    db_path = sys.argv[1]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    # Simulate one reading per second for each registered sensor through a
+    # cache fronting a TelemetryStore. The store is in memory so the demo
+    # never writes simulated readings into the database itself.
+    seconds = int(sys.argv[3]) if len(sys.argv) > 3 else 600
+    start = time.time() - seconds
+    with TelemetryStore(db_path) as registry:
+        keys = registry.keys() or ['sigil_phase_lock', 'rrl_verification']
+
+    with TelemetryStore(':memory:') as store:
+        live = LiveTelemetry(store)
+        for i in range(seconds):
+            for key in keys:
+                live.record(key, random.gauss(0.9, 0.05), start + i)
+
+        now = start + seconds
+        for key in keys:
+            stats = live.summary(key, 300, now)
+            durable = store.raw(key, start, now)
+            print(f"  {key}: latest {stats['latest']:.3f} | 5 min mean {stats['mean']:.3f} "
+                  f"min {stats['min']:.3f} max {stats['max']:.3f} p95 {stats['p95']:.3f} "
+                  f"| {len(durable)} of {seconds} samples flushed to the store")
+
+
+if __name__ == "__main__":
+    main()
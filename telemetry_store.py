@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+Telemetry Time-Series Store
+===========================
+meta_core_telemetry and meta_core_vault_conditions are untyped EAV rows
+(category, key, value TEXT), so trend queries scan and cast strings. This
+module stores sensor readings as typed numeric samples:
+
+    telemetry_series    one row per key (vault_temp, coherence_index, ...)
+                        with unit and optional per-series retention
+    telemetry_chunks    append-only segments: each ingest batch writes one
+                        packed chunk per key and segment hour (float64
+                        timestamps and values as array blobs)
+    telemetry_rollups   min/max/sum/count per key per minute and per hour,
+                        upserted in the same transaction as the chunks
+
+Range queries read rollups for long spans and chunks for short ones, so
+months of data come back from a few hundred indexed rows. apply_retention()
+drops raw chunks and minute rollups past their retention; hour rollups
+remain as the downsampled history.
+
+Usage:
+    python telemetry_store.py <database_path> install
+    python telemetry_store.py <database_path> ingest <key> <value> [<key> <value> ...]
+    python telemetry_store.py <database_path> series <key> [hours]
+    python telemetry_store.py <database_path> retention
+"""
+
+import sqlite3
+import sys
+import time
+from array import array
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from database_utils import table_exists
+
+
+SEGMENT_SECONDS = 3600
+BUCKETS = {'minute': 60, 'hour': 3600}
+
+# Default retention in seconds (None = keep forever)
+RETENTION = {
+    'raw': 30 * 86400,
+    'minute': 180 * 86400,
+    'hour': None,
+}
+
+# Spans up to these lengths are answered from the named resolution
+AUTO_RESOLUTION = [
+    (6 * 3600, 'raw'),
+    (14 * 86400, 'minute'),
+]
+
+# Numeric vault conditions that seed a series: (category, key) → (series key, unit)
+CONDITION_SERIES = {
+    ('environmental', 'temperature_c'): ('vault_temp', 'C'),
+    ('environmental', 'em_noise_floor_dbm'): ('em_noise_floor', 'dBm'),
+    ('environmental', 'vibration_nm'): ('vibration', 'nm'),
+}
+
+Sample = Tuple[str, float, float]
+
+
+def create_telemetry_tables(cursor):
+    """Create telemetry series, chunk and rollup tables"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS telemetry_series (
+            series_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            key TEXT UNIQUE NOT NULL,
+            unit TEXT,
+            raw_retention_s INTEGER,
+            minute_retention_s INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS telemetry_chunks (
+            series_id INTEGER NOT NULL,
+            segment_start INTEGER NOT NULL,
+            chunk_id INTEGER NOT NULL,
+            t_first REAL NOT NULL,
+            t_last REAL NOT NULL,
+            sample_count INTEGER NOT NULL,
+            timestamps BLOB NOT NULL,
+            sample_values BLOB NOT NULL,
+            PRIMARY KEY (series_id, segment_start, chunk_id),
+            FOREIGN KEY (series_id) REFERENCES telemetry_series(series_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS telemetry_rollups (
+            series_id INTEGER NOT NULL,
+            bucket TEXT NOT NULL,
+            bucket_start INTEGER NOT NULL,
+            sample_count INTEGER NOT NULL,
+            value_sum REAL NOT NULL,
+            value_min REAL NOT NULL,
+            value_max REAL NOT NULL,
+            PRIMARY KEY (series_id, bucket, bucket_start),
+            FOREIGN KEY (series_id) REFERENCES telemetry_series(series_id)
+        ) WITHOUT ROWID
+    """)
+
+
+def _number(value: Any) -> float:
+    """Coerce a reading to float (bools become 0/1); raises ValueError otherwise"""
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ('true', 'false'):
+            return 1.0 if lowered == 'true' else 0.0
+        value = value.strip().lstrip('<>=~')
+    return float(value)
+
+
+def _pack(values: Iterable[float]) -> bytes:
+    return array('d', values).tobytes()
+
+
+def _unpack(blob: bytes) -> array:
+    values = array('d')
+    values.frombytes(blob)
+    return values
+
+
+class TelemetryStore:
+    """Batched writer and reader for typed telemetry"""
+
+    def __init__(self, db_path: str = "universe.db", batch_size: int = 5000):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(db_path)
+        create_telemetry_tables(self.conn.cursor())
+        self.conn.commit()
+        self._series: Dict[str, int] = {}
+        self._pending: List[Sample] = []
+        self._listeners: List[Callable[[List[Sample]], None]] = []
+
+    def close(self):
+        """Flush pending samples and close the connection"""
+        if self.conn:
+            self.flush()
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # ──────────────────────────────────────────────────────────
+    # Series registry
+    # ──────────────────────────────────────────────────────────
+
+    def series_id(self, key: str, unit: Optional[str] = None) -> int:
+        """Get (registering if needed) the id of a series"""
+        if key in self._series:
+            return self._series[key]
+        cursor = self.conn.cursor()
+        cursor.execute("INSERT OR IGNORE INTO telemetry_series (key, unit) VALUES (?, ?)", (key, unit))
+        cursor.execute("SELECT series_id FROM telemetry_series WHERE key = ?", (key,))
+        self._series[key] = cursor.fetchone()[0]
+        return self._series[key]
+
+    def lookup(self, key: str) -> Optional[int]:
+        """Get the id of a registered series without registering it (None if unknown)"""
+        if key in self._series:
+            return self._series[key]
+        row = self.conn.execute("SELECT series_id FROM telemetry_series WHERE key = ?", (key,)).fetchone()
+        if row:
+            self._series[key] = row[0]
+        return row[0] if row else None
+
+    def set_retention(self, key: str, raw_seconds: Optional[int] = None,
+                      minute_seconds: Optional[int] = None):
+        """Override retention for one series (None = module default)"""
+        self.conn.execute("""
+            UPDATE telemetry_series SET raw_retention_s = ?, minute_retention_s = ?
+            WHERE series_id = ?
+        """, (raw_seconds, minute_seconds, self.series_id(key)))
+        self.conn.commit()
+
+    def keys(self) -> List[str]:
+        """All registered series keys"""
+        return [row[0] for row in self.conn.execute("SELECT key FROM telemetry_series ORDER BY key")]
+
+    # ──────────────────────────────────────────────────────────
+    # Ingest
+    # ──────────────────────────────────────────────────────────
+
+    def append(self, key: str, value: Any, timestamp: Optional[float] = None):
+        """
+        Queue one sample; written when the batch fills or on flush().
+
+        Args:
+            key: Series key (e.g. 'vault_temp')
+            value: Numeric reading (numeric strings and booleans accepted)
+            timestamp: Unix time in seconds (default: now)
+        """
+        sample = (key, time.time() if timestamp is None else timestamp, _number(value))
+        self._pending.append(sample)
+        self._notify([sample])
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def ingest(self, samples: Iterable[Tuple[str, float, Any]]) -> int:
+        """
+        Write a batch of (key, timestamp, value) samples in one transaction.
+
+        Samples queued earlier by append() are written in the same flush.
+
+        Returns:
+            Number of samples ingested by this call
+        """
+        batch = [(key, ts, _number(value)) for key, ts, value in samples]
+        self._pending.extend(batch)
+        self._notify(batch)
+        self.flush()
+        return len(batch)
+
+    def subscribe(self, callback: Callable[[List[Sample]], None]):
+        """Call callback(samples) with every batch of samples as it is ingested"""
+        self._listeners.append(callback)
+
+    def _notify(self, samples: List[Sample]):
+        for callback in self._listeners:
+            callback(samples)
+
+    def flush(self, before: Optional[float] = None) -> int:
+        """
+        Write queued samples as chunks and fold them into the rollups.
+
+        Args:
+            before: Only write samples older than this time, keeping the rest
+                    queued (used to flush closed windows)
+
+        Returns:
+            Number of samples written. If the write fails the samples are
+            queued again and the error is raised.
+        """
+        if before is None:
+            pending, self._pending = self._pending, []
+        else:
+            pending = [sample for sample in self._pending if sample[1] < before]
+            self._pending = [sample for sample in self._pending if sample[1] >= before]
+        if not pending:
+            return 0
+
+        try:
+            self._write(pending)
+        except BaseException:
+            self._pending = pending + self._pending
+            # Series registered by the failed transaction were rolled back
+            self._series.clear()
+            raise
+        return len(pending)
+
+    def _write(self, pending: List[Sample]):
+        """Write samples as one chunk per series and segment, plus rollups, in one transaction"""
+        segments: Dict[Tuple[int, int], List[Tuple[float, float]]] = defaultdict(list)
+        rollups: Dict[Tuple[int, str, int], List[float]] = {}
+        for key, ts, value in pending:
+            series_id = self.series_id(key)
+            segments[(series_id, int(ts // SEGMENT_SECONDS) * SEGMENT_SECONDS)].append((ts, value))
+            for bucket, width in BUCKETS.items():
+                slot = (series_id, bucket, int(ts // width) * width)
+                agg = rollups.get(slot)
+                if agg is None:
+                    rollups[slot] = [1, value, value, value]
+                else:
+                    agg[0] += 1
+                    agg[1] += value
+                    agg[2] = min(agg[2], value)
+                    agg[3] = max(agg[3], value)
+
+        chunk_rows = []
+        for (series_id, segment_start), points in segments.items():
+            points.sort()
+            chunk_rows.append((
+                series_id, segment_start, points[0][0], points[-1][0], len(points),
+                _pack(p[0] for p in points), _pack(p[1] for p in points),
+                series_id, segment_start
+            ))
+
+        with self.conn:
+            # chunk_id is a per-segment sequence, assigned in the INSERT itself
+            self.conn.executemany("""
+                INSERT INTO telemetry_chunks
+                (series_id, segment_start, chunk_id, t_first, t_last, sample_count,
+                 timestamps, sample_values)
+                SELECT ?, ?, COALESCE(MAX(chunk_id), 0) + 1, ?, ?, ?, ?, ?
+                FROM telemetry_chunks WHERE series_id = ? AND segment_start = ?
+            """, chunk_rows)
+            self.conn.executemany("""
+                INSERT INTO telemetry_rollups
+                (series_id, bucket, bucket_start, sample_count, value_sum, value_min, value_max)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (series_id, bucket, bucket_start) DO UPDATE SET
+                    sample_count = sample_count + excluded.sample_count,
+                    value_sum = value_sum + excluded.value_sum,
+                    value_min = MIN(value_min, excluded.value_min),
+                    value_max = MAX(value_max, excluded.value_max)
+            """, [(*slot, *agg) for slot, agg in rollups.items()])
+
+    # ──────────────────────────────────────────────────────────
+    # Queries
+    # ──────────────────────────────────────────────────────────
+
+    def raw(self, key: str, start: float, end: float) -> List[Tuple[float, float]]:
+        """Raw (timestamp, value) samples in [start, end]"""
+        series_id = self.lookup(key)
+        points = []
+        for timestamps, values in self.conn.execute("""
+            SELECT timestamps, sample_values FROM telemetry_chunks
+            WHERE series_id = ? AND segment_start BETWEEN ? AND ?
+              AND t_last >= ? AND t_first <= ?
+        """, (series_id, int(start // SEGMENT_SECONDS) * SEGMENT_SECONDS, end, start, end)):
+            points.extend(p for p in zip(_unpack(timestamps), _unpack(values)) if start <= p[0] <= end)
+        points.sort()
+        return points
+
+    def rollup(self, key: str, start: float, end: float, bucket: str = 'minute'
+               ) -> List[Dict[str, float]]:
+        """Per-bucket {time, count, min, max, avg} in [start, end]"""
+        width = BUCKETS[bucket]
+        cursor = self.conn.execute("""
+            SELECT bucket_start, sample_count, value_min, value_max, value_sum / sample_count
+            FROM telemetry_rollups
+            WHERE series_id = ? AND bucket = ? AND bucket_start BETWEEN ? AND ?
+            ORDER BY bucket_start
+        """, (self.lookup(key), bucket, int(start // width) * width, end))
+        return [
+            {'time': t, 'count': n, 'min': lo, 'max': hi, 'avg': avg}
+            for t, n, lo, hi, avg in cursor.fetchall()
+        ]
+
+    def series(self, key: str, start: float, end: float, resolution: str = 'auto'
+               ) -> Tuple[str, List[Any]]:
+        """
+        Get a series over a time range at a suitable resolution.
+
+        Args:
+            key: Series key
+            start: Range start (unix seconds)
+            end: Range end (unix seconds)
+            resolution: 'raw', 'minute', 'hour' or 'auto' (by span)
+
+        Returns:
+            (resolution used, points)
+        """
+        if resolution == 'auto':
+            resolution = next((res for span, res in AUTO_RESOLUTION if end - start <= span), 'hour')
+        if resolution == 'raw':
+            return resolution, self.raw(key, start, end)
+        return resolution, self.rollup(key, start, end, resolution)
+
+    def latest(self, key: str) -> Optional[Tuple[float, float]]:
+        """Most recent durable (timestamp, value) for a series"""
+        row = self.conn.execute("""
+            SELECT timestamps, sample_values FROM telemetry_chunks
+            WHERE series_id = ? ORDER BY segment_start DESC, t_last DESC LIMIT 1
+        """, (self.lookup(key),)).fetchone()
+        if not row:
+            return None
+        return max(zip(_unpack(row[0]), _unpack(row[1])))
+
+    # ──────────────────────────────────────────────────────────
+    # Retention
+    # ──────────────────────────────────────────────────────────
+
+    def apply_retention(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Drop raw chunks and minute rollups older than their retention.
+
+        Hour rollups are kept as the downsampled history unless RETENTION
+        gives them a limit.
+
+        Returns:
+            Rows deleted per tier
+        """
+        now = time.time() if now is None else now
+        deleted = {'raw': 0, 'minute': 0, 'hour': 0}
+        policies = self.conn.execute(
+            "SELECT series_id, raw_retention_s, minute_retention_s FROM telemetry_series"
+        ).fetchall()
+        with self.conn:
+            for series_id, raw_seconds, minute_seconds in policies:
+                for tier, seconds, sql in (
+                    ('raw', raw_seconds, """
+                        DELETE FROM telemetry_chunks WHERE series_id = ? AND t_last < ?"""),
+                    ('minute', minute_seconds, """
+                        DELETE FROM telemetry_rollups
+                        WHERE series_id = ? AND bucket = 'minute' AND bucket_start < ?"""),
+                    ('hour', None, """
+                        DELETE FROM telemetry_rollups
+                        WHERE series_id = ? AND bucket = 'hour' AND bucket_start < ?"""),
+                ):
+                    keep = seconds if seconds is not None else RETENTION[tier]
+                    if keep is not None:
+                        deleted[tier] += self.conn.execute(sql, (series_id, now - keep)).rowcount
+        return deleted
+
+
+def install_telemetry(db_path: str) -> int:
+    """
+    Create telemetry tables, register sensors from meta_core_telemetry and
+    seed series from numeric meta_core_vault_conditions values.
+
+    Args:
+        db_path: Path to database
+
+    Returns:
+        Number of registered series
+    """
+    with TelemetryStore(db_path) as store:
+        cursor = store.conn.cursor()
+        if table_exists(cursor, 'meta_core_telemetry'):
+            cursor.execute("SELECT value FROM meta_core_telemetry WHERE category = 'sensor'")
+            for (key,) in cursor.fetchall():
+                store.series_id(key)
+
+        if table_exists(cursor, 'meta_core_vault_conditions'):
+            cursor.execute("SELECT category, key, value, created_at FROM meta_core_vault_conditions")
+            for category, key, value, created_at in cursor.fetchall():
+                if (category, key) not in CONDITION_SERIES:
+                    continue
+                series_key, unit = CONDITION_SERIES[(category, key)]
+                store.series_id(series_key, unit)
+                if store.latest(series_key) is None:
+                    try:
+                        ts = datetime.fromisoformat(created_at).timestamp() if created_at else None
+                        store.append(series_key, value, ts)
+                    except ValueError:
+                        continue
+        store.flush()
+        return len(store.keys())
+
+
+def main():
+    commands = ('install', 'ingest', 'series', 'retention')
+    if len(sys.argv) < 3 or sys.argv[2] not in commands:
+        print("Usage: python telemetry_store.py <database_path> install")
+        print("       python telemetry_store.py <database_path> ingest <key> <value> [<key> <value> ...]")
+        print("       python telemetry_store.py <database_path> series <key> [hours]")
+        print("       python telemetry_store.py <database_path> retention")
+        sys.exit(1)
+
+    db_path, command = sys.argv[1], sys.argv[2]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    if command == 'install':
+        print(f"✓ {install_telemetry(db_path)} telemetry series registered")
+        return
+
+    with TelemetryStore(db_path) as store:
+        if command == 'ingest':
+            now = time.time()
+            pairs = list(zip(sys.argv[3::2], sys.argv[4::2]))
+            print(f"✓ Ingested {store.ingest((key, now, value) for key, value in pairs)} samples")
+        elif command == 'series' and len(sys.argv) in (4, 5):
+            hours = float(sys.argv[4]) if len(sys.argv) == 5 else 24
+            end = time.time()
+            resolution, points = store.series(sys.argv[3], end - hours * 3600, end)
+            print(f"{sys.argv[3]} — last {hours:g}h at {resolution} resolution\n")
+            for point in points:
+                if resolution == 'raw':
+                    print(f"  {datetime.fromtimestamp(point[0]):%Y-%m-%d %H:%M:%S}  {point[1]:g}")
+                else:
+                    print(f"  {datetime.fromtimestamp(point['time']):%Y-%m-%d %H:%M}  "
+                          f"avg {point['avg']:g}  min {point['min']:g}  max {point['max']:g}  "
+                          f"(n={point['count']})")
+        elif command == 'retention':
+            for tier, count in store.apply_retention().items():
+                print(f"✓ {tier}: removed {count} rows")
+        else:
+            print(f"❌ Wrong arguments for '{command}'")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
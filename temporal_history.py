@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+"""
+Bitemporal History for Affiliations & Character State
+=======================================================
+The importers (import_cmm_klevels, import_shadow_core_resonance,
+import_full_roster) UPDATE affiliations and characters in place, so the
+previous clearance level, position or faction is lost. This module keeps
+trigger-maintained history tables that record every version of a row with
+two time axes:
+
+    valid time        valid_from / valid_to   story years, valid_to exclusive
+                                              (9999 = still valid)
+    transaction time  recorded_at / superseded_at   when the DB learned it
+
+Story years for in-place changes come from the timeline clock (a one-row
+table). Set it before running an importer so its changes land in the right
+year:
+
+    python temporal_history.py universe.db set-year 2024
+    python import_cmm_klevels.py universe.db ./cmm
+
+Live versions (superseded_at IS NULL) are mirrored into an R*Tree interval
+index, so as_of(year) is an indexed stabbing query instead of a history scan.
+
+Rows without a key (the Phase 5 importers insert characters with a NULL
+character_id) are not versioned until they are given one.
+
+Usage:
+    python temporal_history.py <database_path> install [since_year]
+    python temporal_history.py <database_path> set-year <year>
+    python temporal_history.py <database_path> as-of <year>
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from database_utils import table_exists, table_columns, rtree_available
+
+
+DEFAULT_STORY_YEAR = 2025  # Epoch 3 (current)
+OPEN_END = 9999
+
+# source table -> history table, key, tracked columns, date columns
+HISTORY_SPECS = {
+    'character_corporate_affiliations': {
+        'history': 'affiliation_history',
+        'key': 'affiliation_id',
+        'columns': [
+            'character_id', 'corp_id', 'division_id', 'affiliation_type',
+            'position_title', 'clearance_level', 'military_rank', 'is_current',
+        ],
+        'start_col': 'start_date',
+        'end_col': 'end_date',
+        'lookups': ['character_id'],
+    },
+    'characters': {
+        'history': 'character_history',
+        'key': 'character_id',
+        'columns': [
+            'character_name', 'codename', 'faction', 'primary_role',
+            'status', 'klevel', 'rrl_level',
+        ],
+        'start_col': None,
+        'end_col': None,
+        'lookups': [],
+    },
+}
+
+CLOCK = "(SELECT story_year FROM timeline_clock WHERE clock_id = 1)"
+NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+def _year_of(expr: str) -> str:
+    """SQL expression extracting a leading YYYY from a date string (NULL if absent)"""
+    return (
+        f"(CASE WHEN {expr} GLOB '[0-9][0-9][0-9][0-9]*' "
+        f"THEN CAST(substr({expr}, 1, 4) AS INTEGER) END)"
+    )
+
+
+def create_clock(cursor, story_year: int = DEFAULT_STORY_YEAR):
+    """Create the one-row timeline clock"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS timeline_clock (
+            clock_id INTEGER PRIMARY KEY CHECK (clock_id = 1),
+            story_year INTEGER NOT NULL
+        )
+    """)
+    cursor.execute(
+        "INSERT OR IGNORE INTO timeline_clock (clock_id, story_year) VALUES (1, ?)",
+        (story_year,)
+    )
+
+
+def _tracked(cursor, source: str) -> List[str]:
+    """Tracked columns that exist on the source table"""
+    existing = table_columns(cursor, source)
+    return [col for col in HISTORY_SPECS[source]['columns'] if col in existing]
+
+
+def create_history_table(cursor, source: str, use_rtree: bool):
+    """Create one history table, its indexes and its interval index"""
+    spec = HISTORY_SPECS[source]
+    history, key = spec['history'], spec['key']
+    columns = _tracked(cursor, source)
+
+    column_defs = ''.join(f"\n            {col}," for col in columns)
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {history} (
+            history_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            {key} NOT NULL,{column_defs}
+            valid_from INTEGER NOT NULL,
+            valid_to INTEGER NOT NULL,
+            recorded_at TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now')),
+            superseded_at TIMESTAMP
+        )
+    """)
+    cursor.execute(
+        f"CREATE INDEX IF NOT EXISTS idx_{history}_key ON {history}({key}, superseded_at)"
+    )
+    cursor.execute(
+        f"CREATE INDEX IF NOT EXISTS idx_{history}_recorded ON {history}(recorded_at)"
+    )
+    for col in spec['lookups']:
+        if col in columns:
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{history}_{col} ON {history}({col}, superseded_at)"
+            )
+
+    if use_rtree:
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {history}_rtree
+            USING rtree(history_id, valid_from, valid_to)
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_history_{history}_rtree_ins
+            AFTER INSERT ON {history}
+            WHEN NEW.superseded_at IS NULL
+            BEGIN
+                INSERT INTO {history}_rtree (history_id, valid_from, valid_to)
+                VALUES (NEW.history_id, NEW.valid_from, NEW.valid_to);
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_history_{history}_rtree_sup
+            AFTER UPDATE OF superseded_at ON {history}
+            WHEN NEW.superseded_at IS NOT NULL
+            BEGIN
+                DELETE FROM {history}_rtree WHERE history_id = NEW.history_id;
+            END
+        """)
+    else:
+        cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_{history}_valid
+            ON {history}(valid_from, valid_to) WHERE superseded_at IS NULL
+        """)
+
+
+def _close_versions_sql(source: str, columns: List[str]) -> str:
+    """
+    SQL that ends the live versions of OLD.<key> at the clock year: versions
+    spanning the clock year are re-recorded with valid_to = clock year, then
+    every live version still valid after it is superseded.
+    """
+    spec = HISTORY_SPECS[source]
+    history, key = spec['history'], spec['key']
+    col_list = ''.join(f"{col}, " for col in columns)
+    return f"""
+            INSERT INTO {history} ({key}, {col_list}valid_from, valid_to)
+            SELECT {key}, {col_list}valid_from, {CLOCK}
+            FROM {history}
+            WHERE {key} = OLD.{key} AND superseded_at IS NULL
+              AND valid_from < {CLOCK} AND valid_to > {CLOCK};
+            UPDATE {history} SET superseded_at = {NOW}
+            WHERE {key} = OLD.{key} AND superseded_at IS NULL
+              AND valid_to > {CLOCK};"""
+
+
+def _open_version_sql(source: str, columns: List[str], end_col: Optional[str],
+                      valid_from: str) -> str:
+    """SQL inserting a new live version from the NEW row (skipped while its key is NULL)"""
+    spec = HISTORY_SPECS[source]
+    history, key = spec['history'], spec['key']
+    col_list = ''.join(f"{col}, " for col in columns)
+    values = ''.join(f"NEW.{col}, " for col in columns)
+    valid_to = str(OPEN_END)
+    if end_col:
+        valid_to = f"MAX({valid_from}, COALESCE({_year_of('NEW.' + end_col)}, {OPEN_END}))"
+    return f"""
+            INSERT INTO {history} ({key}, {col_list}valid_from, valid_to)
+            SELECT NEW.{key}, {values}{valid_from}, {valid_to}
+            WHERE NEW.{key} IS NOT NULL;"""
+
+
+def create_history_triggers(cursor, source: str):
+    """Create insert/update/delete triggers that version one source table"""
+    spec = HISTORY_SPECS[source]
+    columns = _tracked(cursor, source)
+    existing = table_columns(cursor, source)
+
+    start_col = spec['start_col'] if spec['start_col'] in existing else None
+    end_col = spec['end_col'] if spec['end_col'] in existing else None
+    watched = columns + [col for col in (start_col, end_col) if col]
+
+    insert_from = CLOCK
+    if start_col:
+        insert_from = f"COALESCE({_year_of('NEW.' + start_col)}, {CLOCK})"
+
+    # The key is watched too, so a row that is given its key gets a version
+    changed = ' OR '.join(f"OLD.{col} IS NOT NEW.{col}" for col in [spec['key']] + watched)
+
+    cursor.execute(f"DROP TRIGGER IF EXISTS trg_history_{source}_ins")
+    cursor.execute(f"DROP TRIGGER IF EXISTS trg_history_{source}_upd")
+    cursor.execute(f"DROP TRIGGER IF EXISTS trg_history_{source}_del")
+
+    cursor.execute(f"""
+        CREATE TRIGGER trg_history_{source}_ins
+        AFTER INSERT ON {source}
+        BEGIN{_open_version_sql(source, columns, end_col, insert_from)}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER trg_history_{source}_upd
+        AFTER UPDATE ON {source}
+        WHEN {changed}
+        BEGIN{_close_versions_sql(source, columns)}{_open_version_sql(source, columns, end_col, CLOCK)}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER trg_history_{source}_del
+        AFTER DELETE ON {source}
+        BEGIN{_close_versions_sql(source, columns)}
+        END
+    """)
+
+
+def backfill_history(cursor, source: str, since_year: int):
+    """Record the current rows of a source table as the first live versions"""
+    spec = HISTORY_SPECS[source]
+    history, key = spec['history'], spec['key']
+    columns = _tracked(cursor, source)
+    existing = table_columns(cursor, source)
+    col_list = ''.join(f"{col}, " for col in columns)
+
+    valid_from = str(since_year)
+    if spec['start_col'] in existing:
+        valid_from = f"COALESCE({_year_of(spec['start_col'])}, {since_year})"
+    valid_to = str(OPEN_END)
+    if spec['end_col'] in existing:
+        valid_to = f"MAX({valid_from}, COALESCE({_year_of(spec['end_col'])}, {OPEN_END}))"
+
+    cursor.execute(f"""
+        INSERT INTO {history} ({key}, {col_list}valid_from, valid_to)
+        SELECT {key}, {col_list}{valid_from}, {valid_to}
+        FROM {source}
+        WHERE {key} IS NOT NULL AND {key} NOT IN (SELECT {key} FROM {history})
+    """)
+    return cursor.rowcount
+
+
+def install_history(db_path: str, since_year: Optional[int] = None) -> Dict[str, int]:
+    """
+    Create history tables, interval indexes and triggers, and record the
+    current state as the first version of every row.
+
+    Args:
+        db_path: Path to database
+        since_year: Valid-from year for existing rows without a start date
+                    (defaults to the timeline clock)
+
+    Returns:
+        Dictionary of history table -> rows backfilled
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        create_clock(cursor)
+        if since_year is None:
+            since_year = cursor.execute(CLOCK[1:-1]).fetchone()[0]
+        use_rtree = rtree_available(cursor)
+
+        backfilled = {}
+        for source, spec in HISTORY_SPECS.items():
+            if not table_exists(cursor, source):
+                continue
+            create_history_table(cursor, source, use_rtree)
+            create_history_triggers(cursor, source)
+            backfilled[spec['history']] = backfill_history(cursor, source, since_year)
+
+        conn.commit()
+        return backfilled
+    finally:
+        conn.close()
+
+
+def set_story_year(db_path: str, year: int):
+    """
+    Set the story year used as valid time for subsequent in-place changes.
+
+    Args:
+        db_path: Path to database
+        year: Story year (e.g. 2024)
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        create_clock(conn.cursor(), year)
+        conn.execute("UPDATE timeline_clock SET story_year = ? WHERE clock_id = 1", (year,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def get_story_year(db_path: str) -> int:
+    """Get the current timeline clock year"""
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute("SELECT story_year FROM timeline_clock WHERE clock_id = 1").fetchone()
+        return row[0] if row else DEFAULT_STORY_YEAR
+    finally:
+        conn.close()
+
+
+def _versions_as_of(cursor, source: str, year: int, known_at: Optional[str],
+                    filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Versions of a source table valid in a year (optionally as known at a time).
+
+    filters ({column: value}) restrict the versions in SQL; a filtered query
+    skips the interval index and seeks the key / lookups index instead.
+    """
+    spec = HISTORY_SPECS[source]
+    history, key = spec['history'], spec['key']
+    filters = filters or {}
+
+    params: List[Any] = []
+    if known_at is None and not filters and table_exists(cursor, f"{history}_rtree"):
+        query = f"""
+            SELECT h.* FROM {history}_rtree r
+            JOIN {history} h ON h.history_id = r.history_id
+            WHERE r.valid_from <= ? AND r.valid_to > ?
+        """
+        params += [year, year]
+    else:
+        query = f"""
+            SELECT h.* FROM {history} h
+            WHERE h.valid_from <= ? AND h.valid_to > ?
+        """
+        params += [year, year]
+        if known_at is None:
+            query += " AND h.superseded_at IS NULL"
+        else:
+            query += " AND h.recorded_at <= ? AND (h.superseded_at IS NULL OR h.superseded_at > ?)"
+            params += [known_at, known_at]
+
+    for column, value in filters.items():
+        query += f" AND h.{column} = ?"
+        params.append(value)
+    query += f" ORDER BY h.{key}"
+
+    cursor.execute(query, params)
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def affiliations_as_of(db_path: str, year: int, known_at: Optional[str] = None,
+                       character_id=None) -> List[Dict[str, Any]]:
+    """
+    Reconstruct affiliations (position, clearance, division) valid in a year.
+
+    Args:
+        db_path: Path to database
+        year: Story year
+        known_at: Optional transaction timestamp ('YYYY-MM-DD HH:MM:SS') to
+                  ask what the database believed at that moment
+        character_id: Restrict to one character
+
+    Returns:
+        List of affiliation versions
+    """
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        filters = {'character_id': character_id} if character_id is not None else None
+        return _versions_as_of(conn.cursor(), 'character_corporate_affiliations',
+                               year, known_at, filters)
+    finally:
+        conn.close()
+
+
+def character_state_as_of(db_path: str, year: int, known_at: Optional[str] = None,
+                          character_id=None) -> List[Dict[str, Any]]:
+    """
+    Reconstruct character state (name, faction, status, K-level) valid in a year.
+
+    Args:
+        db_path: Path to database
+        year: Story year
+        known_at: Optional transaction timestamp
+        character_id: Restrict to one character
+
+    Returns:
+        List of character versions
+    """
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        filters = {'character_id': character_id} if character_id is not None else None
+        return _versions_as_of(conn.cursor(), 'characters', year, known_at, filters)
+    finally:
+        conn.close()
+
+
+def as_of(db_path: str, year: int, known_at: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Reconstruct who held which position/clearance in a given story year.
+
+    Args:
+        db_path: Path to database
+        year: Story year
+        known_at: Optional transaction timestamp
+
+    Returns:
+        {'characters': [...], 'affiliations': [...]}
+    """
+    return {
+        'characters': character_state_as_of(db_path, year, known_at),
+        'affiliations': affiliations_as_of(db_path, year, known_at),
+    }
+
+
+def history_of(db_path: str, character_id) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Every recorded version (including superseded ones) for a character.
+
+    Args:
+        db_path: Path to database
+        character_id: ID of the character
+
+    Returns:
+        {'characters': [...], 'affiliations': [...]} ordered by valid time
+    """
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT * FROM character_history WHERE character_id = ?
+            ORDER BY valid_from, recorded_at
+        """, (character_id,))
+        characters = [dict(row) for row in cursor.fetchall()]
+        cursor.execute("""
+            SELECT * FROM affiliation_history WHERE character_id = ?
+            ORDER BY affiliation_id, valid_from, recorded_at
+        """, (character_id,))
+        affiliations = [dict(row) for row in cursor.fetchall()]
+        return {'characters': characters, 'affiliations': affiliations}
+    finally:
+        conn.close()
+
+
+def main():
+    commands = ('install', 'set-year', 'as-of')
+    if len(sys.argv) < 3 or sys.argv[2] not in commands:
+        print("Usage: python temporal_history.py <database_path> install [since_year]")
+        print("       python temporal_history.py <database_path> set-year <year>")
+        print("       python temporal_history.py <database_path> as-of <year>")
+        sys.exit(1)
+
+    db_path, command = sys.argv[1], sys.argv[2]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    if command == 'install':
+        since_year = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        backfilled = install_history(db_path, since_year)
+        for history, count in backfilled.items():
+            print(f"✓ {history}: {count} versions recorded")
+        print(f"✓ Timeline clock: {get_story_year(db_path)}")
+
+    elif command == 'set-year':
+        if len(sys.argv) != 4:
+            print("Usage: python temporal_history.py <database_path> set-year <year>")
+            sys.exit(1)
+        set_story_year(db_path, int(sys.argv[3]))
+        print(f"✓ Timeline clock set to {sys.argv[3]}")
+
+    else:
+        if len(sys.argv) != 4:
+            print("Usage: python temporal_history.py <database_path> as-of <year>")
+            sys.exit(1)
+        year = int(sys.argv[3])
+        state = as_of(db_path, year)
+        names = {row['character_id']: row['character_name'] for row in state['characters']}
+        print(f"\n━━━ As of {year} ━━━")
+        for row in state['affiliations']:
+            name = names.get(row['character_id'], row['character_id'])
+            print(f"  • {name}: {row.get('position_title') or 'N/A'}"
+                  f" | Clearance: {row.get('clearance_level') or 'N/A'}"
+                  f" | {row['valid_from']}–{row['valid_to'] if row['valid_to'] != OPEN_END else 'present'}")
+
+
+if __name__ == "__main__":
+    main()
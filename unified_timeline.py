@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Unified Chronology (K-Way Streaming Merge)
+===========================================
+Builds one timeline out of every dated source in the database:
+
+    character_events         event_year / event_date
+    land_war_events          date keys from war_event_dates.py
+    affiliations             start_date (joined) and end_date (left)
+    rivalries                origin_year, via temporal_intervals
+    lineage_frost            epoch_reference, via temporal_intervals
+
+Each source is read in index order with fetchmany() and the streams are
+combined with a heap-based k-way merge (heapq.merge), so events are yielded
+lazily and a chronology of any size can be paged without sorting it in
+memory. Every event carries a sort key (day, source rank, source id);
+passing the last key of a page as `after` resumes from there.
+
+Usage:
+    python unified_timeline.py <database_path> [--character NAME] [--faction NAME]
+                               [--location NAME] [--from YEAR] [--to YEAR] [--limit N]
+"""
+
+import heapq
+import sqlite3
+import sys
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from database_utils import table_exists, table_columns
+from epoch_intervals import parse_interval
+from war_event_dates import day_number, from_day_number
+
+
+SOURCE_RANKS = {
+    'lineage': 0,
+    'rivalry': 1,
+    'affiliation_start': 2,
+    'character_event': 3,
+    'land_war_event': 4,
+    'affiliation_end': 5,
+}
+
+BATCH_SIZE = 1000
+
+
+def _year_day(year: int, upper: bool = False) -> int:
+    """Day number of Jan 1 (or Dec 31) of a year, clamped to the supported range"""
+    return day_number(str(min(max(year, 1), 9999)), upper=upper)
+
+
+def _date_day(value: Optional[str]) -> Optional[int]:
+    """Day number of a (partial) ISO date string, None if it has no leading year"""
+    if not value or len(value) < 4 or not value[:4].isdigit():
+        return None
+    try:
+        return day_number(value[:10])
+    except ValueError:
+        return _year_day(int(value[:4]))
+
+
+def _stream(cursor) -> Iterator[sqlite3.Row]:
+    """Yield rows from an executed cursor in batches"""
+    while True:
+        rows = cursor.fetchmany(BATCH_SIZE)
+        if not rows:
+            return
+        yield from rows
+
+
+def _day_sorted(events: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Re-sort each run of same-day events by sort_key.
+
+    Sources arrive ordered by day from SQL; ties within a day may come in
+    text order rather than key order, and heapq.merge (and `after` paging)
+    needs every stream to be non-decreasing in sort_key.
+    """
+    run: List[Dict[str, Any]] = []
+    for event in events:
+        if run and event['day'] != run[0]['day']:
+            yield from sorted(run, key=lambda e: e['sort_key'])
+            run = []
+        run.append(event)
+    yield from sorted(run, key=lambda e: e['sort_key'])
+
+
+def _event(source: str, source_id, day: int, title: str, description: Optional[str] = None,
+           characters: Optional[List[str]] = None, factions: Optional[List[str]] = None,
+           location: Optional[str] = None, day_end: Optional[int] = None,
+           label: Optional[str] = None) -> Dict[str, Any]:
+    """Build a timeline event record"""
+    return {
+        'sort_key': (day, SOURCE_RANKS[source], str(source_id)),
+        'source': source,
+        'source_id': source_id,
+        'day': day,
+        'day_end': day if day_end is None else day_end,
+        'year': int(from_day_number(day)[:4]),
+        'date_label': label or from_day_number(day),
+        'title': title,
+        'description': description,
+        'characters': characters or [],
+        'factions': [f for f in (factions or []) if f],
+        'location': location,
+    }
+
+
+class UnifiedTimeline:
+    """Lazily merged chronology over all dated sources"""
+
+    def __init__(self, db_path="universe.db"):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self._factions = None
+
+    def close(self):
+        """Close database connection"""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # ──────────────────────────────────────────────────────────
+    # Helpers
+    # ──────────────────────────────────────────────────────────
+
+    def _has(self, table: str) -> bool:
+        return table_exists(self.conn.cursor(), table)
+
+    def _faction_of(self, name: str) -> Optional[str]:
+        """Faction for a character name (loaded once, only when needed)"""
+        if self._factions is None:
+            rows = self.conn.execute("SELECT character_name, faction FROM characters")
+            self._factions = {row['character_name']: row['faction'] for row in rows}
+        return self._factions.get(name)
+
+    # ──────────────────────────────────────────────────────────
+    # Sources (each yields events in non-decreasing sort_key order)
+    # ──────────────────────────────────────────────────────────
+
+    def _character_events(self, lo: Optional[int], hi: Optional[int],
+                          character: Optional[str]) -> Iterator[Dict[str, Any]]:
+        if not self._has('character_events'):
+            return
+        has_locations = self._has('locations')
+        query = f"""
+            SELECT e.event_id, e.event_year, e.event_date, e.event_type, e.description,
+                   c.character_name, c.faction,
+                   {'l.location_name' if has_locations else 'NULL AS location_name'}
+            FROM character_events e
+            JOIN characters c ON e.character_id = c.character_id
+            {'LEFT JOIN locations l ON e.location_id = l.location_id' if has_locations else ''}
+            WHERE 1 = 1
+        """
+        params: List[Any] = []
+        if lo is not None:
+            query += " AND e.event_year >= ?"
+            params.append(int(from_day_number(lo)[:4]))
+        if hi is not None:
+            query += " AND e.event_year <= ?"
+            params.append(int(from_day_number(hi)[:4]))
+        if character:
+            query += " AND c.character_name = ?"
+            params.append(character)
+        # Dates that don't start with the event year fall back to Jan 1, so sort them first
+        query += """ ORDER BY e.event_year,
+            CASE WHEN substr(e.event_date, 1, 4) = CAST(e.event_year AS TEXT)
+                 THEN replace(e.event_date, 'XX', '01') ELSE '' END"""
+
+        for row in _stream(self.conn.execute(query, params)):
+            day = _year_day(row['event_year'])
+            date_text = row['event_date'] or ''
+            if date_text.startswith(str(row['event_year'])):
+                day = _date_day(date_text) or day
+            yield _event('character_event', row['event_id'], day,
+                         row['event_type'] or 'event', row['description'],
+                         [row['character_name']], [row['faction']], row['location_name'],
+                         label=row['event_date'] or str(row['event_year']))
+
+    def _land_war_events(self, lo: Optional[int], hi: Optional[int],
+                         character: Optional[str]) -> Iterator[Dict[str, Any]]:
+        if not self._has('land_war_events'):
+            return
+        keyed = 'date_lo' in table_columns(self.conn.cursor(), 'land_war_events')
+        if keyed:
+            query = "SELECT * FROM land_war_events WHERE date_lo IS NOT NULL"
+            order = " ORDER BY date_lo, date_hi, id"
+        else:
+            # Without war_event_dates.py keys ISO text order is the best available
+            query = "SELECT * FROM land_war_events WHERE date GLOB '[0-9][0-9][0-9][0-9]*'"
+            order = " ORDER BY replace(date, 'XX', '01')"
+        params: List[Any] = []
+        if keyed and hi is not None:
+            query += " AND date_lo <= ?"
+            params.append(hi)
+        if keyed and lo is not None:
+            query += " AND date_hi >= ?"
+            params.append(lo)
+        if character:
+            query += " AND participants LIKE ?"
+            params.append(f"%{character}%")
+
+        for row in _stream(self.conn.execute(query + order, params)):
+            participants = [p.strip() for p in (row['participants'] or '').split(';') if p.strip()]
+            if character and character not in participants:
+                continue
+            if keyed:
+                day, day_end = row['date_lo'], row['date_hi']
+            else:
+                day = _date_day(row['date'].replace('XX', '01'))
+                day_end = day
+            yield _event('land_war_event', row['id'], day, row['title'], row['summary'],
+                         participants, [self._faction_of(p) for p in participants],
+                         row['location'], day_end=day_end, label=row['date'])
+
+    def _affiliations(self, column: str, source: str, lo: Optional[int], hi: Optional[int],
+                      character: Optional[str]) -> Iterator[Dict[str, Any]]:
+        if not self._has('character_corporate_affiliations'):
+            return
+        query = f"""
+            SELECT a.affiliation_id, a.{column} AS date_value, a.position_title,
+                   c.character_name, c.faction, corp.corp_name
+            FROM character_corporate_affiliations a
+            JOIN characters c ON a.character_id = c.character_id
+            LEFT JOIN corporations corp ON a.corp_id = corp.corp_id
+            WHERE a.{column} GLOB '[0-9][0-9][0-9][0-9]*'
+        """
+        params: List[Any] = []
+        if lo is not None:
+            query += f" AND a.{column} >= ?"
+            params.append(from_day_number(lo)[:4])
+        if hi is not None:
+            query += f" AND substr(a.{column}, 1, 4) <= ?"
+            params.append(from_day_number(hi)[:4])
+        if character:
+            query += " AND c.character_name = ?"
+            params.append(character)
+        query += f" ORDER BY replace(a.{column}, 'XX', '01')"
+
+        verb = 'joins' if source == 'affiliation_start' else 'leaves'
+        for row in _stream(self.conn.execute(query, params)):
+            title = f"{row['character_name']} {verb} {row['corp_name'] or 'corporation'}"
+            if row['position_title']:
+                title += f" ({row['position_title']})"
+            yield _event(source, row['affiliation_id'], _date_day(row['date_value']), title,
+                         characters=[row['character_name']], factions=[row['faction']],
+                         label=row['date_value'])
+
+    def _interval_source(self, table: str, id_col: str, field: str, entity_type: str,
+                         source: str, lo: Optional[int], hi: Optional[int],
+                         character: Optional[str], describe) -> Iterator[Dict[str, Any]]:
+        if not self._has(table):
+            return
+
+        if self._has('temporal_intervals'):
+            query = f"""
+                SELECT s.*, t.start_year, t.end_year
+                FROM temporal_intervals t
+                JOIN {table} s ON CAST(s.{id_col} AS TEXT) = t.entity_id
+                WHERE t.entity_type = ? AND t.field = ?
+            """
+            params: List[Any] = [entity_type, field]
+            if lo is not None:
+                query += " AND t.end_year >= ?"
+                params.append(int(from_day_number(lo)[:4]))
+            if hi is not None:
+                query += " AND t.start_year <= ?"
+                params.append(int(from_day_number(hi)[:4]))
+            query += " ORDER BY t.start_year"
+            rows = _stream(self.conn.execute(query, params))
+        else:
+            # Small lore tables: parse and order in Python when not normalized
+            parsed = []
+            for row in self.conn.execute(f"SELECT * FROM {table}"):
+                interval = parse_interval(row[field])
+                if interval:
+                    parsed.append((interval[0], interval[1], str(row[id_col]), dict(row)))
+            parsed.sort(key=lambda item: item[0])
+            rows = []
+            for start, end, _, row in parsed:
+                if lo is not None and end < int(from_day_number(lo)[:4]):
+                    continue
+                if hi is not None and start > int(from_day_number(hi)[:4]):
+                    continue
+                row.update(start_year=start, end_year=end)
+                rows.append(row)
+
+        for row in rows:
+            title, description, characters = describe(row)
+            if character and character not in characters:
+                continue
+            yield _event(source, row[id_col], _year_day(row['start_year']), title, description,
+                         characters, [self._faction_of(c) for c in characters],
+                         day_end=_year_day(row['end_year'], upper=True), label=str(row[field]))
+
+    def _rivalries(self, lo, hi, character):
+        return self._interval_source(
+            'rivalries', 'rivalry_id', 'origin_year', 'rivalry', 'rivalry', lo, hi, character,
+            lambda row: (
+                f"Rivalry: {row['participant_a']} vs {row['participant_b']}",
+                row['key_events'],
+                [row['participant_a'], row['participant_b']],
+            )
+        )
+
+    def _lineage(self, lo, hi, character):
+        return self._interval_source(
+            'lineage_frost', 'id', 'epoch_reference', 'lineage_member', 'lineage',
+            lo, hi, character,
+            lambda row: (
+                f"Frost lineage: {row['name_en']}",
+                row['role'],
+                [row['name_en']],
+            )
+        )
+
+    # ──────────────────────────────────────────────────────────
+    # Public API
+    # ──────────────────────────────────────────────────────────
+
+    def events(
+        self,
+        character: Optional[str] = None,
+        faction: Optional[str] = None,
+        location: Optional[str] = None,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        after: Optional[Tuple] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield events from every source in chronological order.
+
+        Args:
+            character: Only events involving this character name
+            faction: Only events involving a character of this faction
+            location: Only events at this location
+            start_year: First year (inclusive)
+            end_year: Last year (inclusive)
+            after: Resume after this sort_key (from the last event of a page)
+
+        Yields:
+            Event dictionaries with a 'sort_key'
+        """
+        lo = _year_day(start_year) if start_year is not None else None
+        hi = _year_day(end_year, upper=True) if end_year is not None else None
+        if after is not None:
+            lo = after[0] if lo is None else max(lo, after[0])
+
+        streams = [
+            self._lineage(lo, hi, character),
+            self._rivalries(lo, hi, character),
+            self._affiliations('start_date', 'affiliation_start', lo, hi, character),
+            self._character_events(lo, hi, character),
+            self._land_war_events(lo, hi, character),
+        ]
+        if 'end_date' in table_columns(self.conn.cursor(), 'character_corporate_affiliations'):
+            streams.append(self._affiliations('end_date', 'affiliation_end', lo, hi, character))
+
+        streams = [_day_sorted(stream) for stream in streams]
+        for event in heapq.merge(*streams, key=lambda e: e['sort_key']):
+            if after is not None and event['sort_key'] <= after:
+                continue
+            if faction and faction not in event['factions']:
+                continue
+            if location and event['location'] != location:
+                continue
+            yield event
+
+    def page(self, limit: int = 50, after: Optional[Tuple] = None, **filters) -> List[Dict[str, Any]]:
+        """
+        Get one page of the chronology.
+
+        Args:
+            limit: Maximum events to return
+            after: sort_key of the last event of the previous page
+            **filters: character, faction, location, start_year, end_year
+
+        Returns:
+            List of events (pass the last one's 'sort_key' as `after` for the next page)
+        """
+        return list(islice(self.events(after=after, **filters), limit))
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python unified_timeline.py <database_path> [--character NAME] [--faction NAME]")
+        print("                                  [--location NAME] [--from YEAR] [--to YEAR] [--limit N]")
+        sys.exit(1)
+
+    db_path = sys.argv[1]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    options = dict(zip(sys.argv[2::2], sys.argv[3::2]))
+    filters = {
+        'character': options.get('--character'),
+        'faction': options.get('--faction'),
+        'location': options.get('--location'),
+        'start_year': int(options['--from']) if '--from' in options else None,
+        'end_year': int(options['--to']) if '--to' in options else None,
+    }
+    limit = int(options.get('--limit', 100))
+
+    with UnifiedTimeline(db_path) as timeline:
+        current_year = None
+        for event in timeline.page(limit=limit, **filters):
+            if event['year'] != current_year:
+                current_year = event['year']
+                print(f"\n━━━ {current_year} ━━━")
+            print(f"  {event['date_label']} [{event['source']}] {event['title']}")
+            if event['characters']:
+                print(f"    Involves: {', '.join(event['characters'])}")
+            if event['location']:
+                print(f"    Location: {event['location']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,8 @@ import sqlite3
 import sys
 from datetime import datetime
 
+from database_utils import connect
+
 
 class SchemaValidator:
     """Validates database schema and integrity"""
@@ -30,9 +32,9 @@ class SchemaValidator:
     def connect(self):
         """Establish connection to SQLite database"""
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            # Default profile: the constraint checks insert (and roll back) test rows
+            self.conn = connect(self.db_path)
             self.cursor = self.conn.cursor()
-            self.cursor.execute("PRAGMA foreign_keys = ON")
             return True
         except sqlite3.Error as e:
             self.errors.append(f"Failed to connect to database: {e}")
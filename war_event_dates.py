@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Sortable Date Keys for Land War Events
+=======================================
+land_war_events.date holds partial dates like "2023-03-XX" next to a
+separate date_precision column, so ORDER BY date is lexical and range
+filters are unreliable. This module adds three derived, indexed columns:
+
+    date_lo             first possible day (Julian Day Number, INTEGER)
+    date_hi             last possible day  (Julian Day Number, INTEGER)
+    date_key_precision  'day' | 'month' | 'year' (coarser of the text and
+                        the declared date_precision)
+
+They are computed in SQL by insert/update triggers, so any importer that
+writes land_war_events gets keys at write time and readers never parse
+date strings. Chronological order is (date_lo, date_hi, id).
+
+Usage:
+    python war_event_dates.py <database_path> install
+    python war_event_dates.py <database_path> between <start> <end>
+"""
+
+import sqlite3
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from database_utils import table_columns
+
+
+# date.toordinal() + JDN_OFFSET == Julian Day Number
+JDN_OFFSET = 1721425
+
+KEY_COLUMNS = [
+    ('date_lo', 'INTEGER'),
+    ('date_hi', 'INTEGER'),
+    ('date_key_precision', 'TEXT'),
+]
+
+
+def day_number(value: str, upper: bool = False) -> int:
+    """
+    Convert a (possibly partial) date string to a Julian Day Number.
+
+    Args:
+        value: "YYYY", "YYYY-MM" or "YYYY-MM-DD" ("XX" parts count as missing)
+        upper: Return the last day of a partial date instead of the first
+
+    Returns:
+        Julian Day Number
+    """
+    parts = [p for p in value.split('-') if p and p.upper() != 'XX']
+    year = int(parts[0])
+    if len(parts) >= 3:
+        day = date(year, int(parts[1]), int(parts[2]))
+    elif len(parts) == 2:
+        month = int(parts[1])
+        if upper:
+            next_month = date(year + month // 12, month % 12 + 1, 1)
+            day = date.fromordinal(next_month.toordinal() - 1)
+        else:
+            day = date(year, month, 1)
+    else:
+        day = date(year, 12, 31) if upper else date(year, 1, 1)
+    return day.toordinal() + JDN_OFFSET
+
+
+def from_day_number(jdn: int) -> str:
+    """Convert a Julian Day Number back to YYYY-MM-DD"""
+    return date.fromordinal(jdn - JDN_OFFSET).isoformat()
+
+
+def _precision_sql(row: str, has_declared: bool = True) -> str:
+    """SQL for the effective precision of a row (NEW or table alias)"""
+    d = f"{row}date"
+    declared = f"lower({row}date_precision)" if has_declared else "NULL"
+    parsed = f"""(CASE
+            WHEN {d} GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*' THEN 'day'
+            WHEN {d} GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]*' THEN 'month'
+            WHEN {d} GLOB '[0-9][0-9][0-9][0-9]*' THEN 'year'
+        END)"""
+    return f"""(CASE
+            WHEN {parsed} IS NULL THEN NULL
+            WHEN {declared} = 'year' OR {parsed} = 'year' THEN 'year'
+            WHEN {declared} = 'month' OR {parsed} = 'month' THEN 'month'
+            ELSE 'day'
+        END)"""
+
+
+def _bounds_sql(row: str) -> str:
+    """SQL SET clause for date_lo/date_hi from date and date_key_precision"""
+    d, p = f"{row}date", f"{row}date_key_precision"
+    lo = f"""(CASE {p}
+            WHEN 'day' THEN substr({d}, 1, 10)
+            WHEN 'month' THEN substr({d}, 1, 7) || '-01'
+            WHEN 'year' THEN substr({d}, 1, 4) || '-01-01'
+        END)"""
+    hi = f"""(CASE {p}
+            WHEN 'day' THEN substr({d}, 1, 10)
+            WHEN 'month' THEN date(substr({d}, 1, 7) || '-01', '+1 month', '-1 day')
+            WHEN 'year' THEN substr({d}, 1, 4) || '-12-31'
+        END)"""
+    return (
+        f"date_lo = CAST(julianday({lo}) + 0.5 AS INTEGER),\n"
+        f"            date_hi = CAST(julianday({hi}) + 0.5 AS INTEGER)"
+    )
+
+
+def install_date_keys(db_path: str) -> Optional[int]:
+    """
+    Add the key columns, indexes and triggers, and derive keys for existing rows.
+
+    Args:
+        db_path: Path to database
+
+    Returns:
+        Number of events keyed, or None if land_war_events does not exist
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    try:
+        existing = table_columns(cursor, 'land_war_events')
+        if not existing:
+            print("❌ land_war_events table not found!")
+            return None
+
+        for column, col_type in KEY_COLUMNS:
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE land_war_events ADD COLUMN {column} {col_type}")
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_land_war_events_date_key
+            ON land_war_events(date_lo, date_hi, id)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_land_war_events_date_hi
+            ON land_war_events(date_hi)
+        """)
+
+        # Older land_war_events tables (universe.db) have no date_precision
+        has_declared = 'date_precision' in existing
+        watched = 'date, date_precision' if has_declared else 'date'
+
+        # Two statements: precision first, then bounds read the stored precision
+        derive = f"""
+            UPDATE land_war_events
+            SET date_key_precision = {_precision_sql('NEW.', has_declared)}
+            WHERE id = NEW.id;
+            UPDATE land_war_events
+            SET {_bounds_sql('')}
+            WHERE id = NEW.id;"""
+
+        cursor.execute("DROP TRIGGER IF EXISTS trg_land_war_events_date_key_ins")
+        cursor.execute("DROP TRIGGER IF EXISTS trg_land_war_events_date_key_upd")
+        cursor.execute(f"""
+            CREATE TRIGGER trg_land_war_events_date_key_ins
+            AFTER INSERT ON land_war_events
+            BEGIN{derive}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER trg_land_war_events_date_key_upd
+            AFTER UPDATE OF {watched} ON land_war_events
+            BEGIN{derive}
+            END
+        """)
+
+        cursor.execute(f"UPDATE land_war_events SET date_key_precision = {_precision_sql('', has_declared)}")
+        cursor.execute(f"UPDATE land_war_events SET {_bounds_sql('')}")
+        keyed = cursor.execute(
+            "SELECT COUNT(*) FROM land_war_events WHERE date_lo IS NOT NULL"
+        ).fetchone()[0]
+
+        conn.commit()
+        return keyed
+    finally:
+        conn.close()
+
+
+def iter_events_chronological(
+    conn: sqlite3.Connection,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    batch_size: int = 1000
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream events in chronological order straight off the date key index.
+
+    An event is included when its possible range overlaps [start, end].
+    Events with unknown dates are skipped.
+
+    Args:
+        conn: Open connection (row_factory is set to sqlite3.Row)
+        start: Lower bound date, partial dates allowed ("2023", "2023-03")
+        end: Upper bound date, partial dates allowed
+        batch_size: Rows fetched per round trip
+
+    Yields:
+        Event rows as dictionaries
+    """
+    conn.row_factory = sqlite3.Row
+    lo = day_number(start) if start else None
+    hi = day_number(end, upper=True) if end else None
+
+    query = "SELECT * FROM land_war_events WHERE date_lo IS NOT NULL"
+    params: List[Any] = []
+    if hi is not None:
+        query += " AND date_lo <= ?"
+        params.append(hi)
+    if lo is not None:
+        query += " AND date_hi >= ?"
+        params.append(lo)
+    query += " ORDER BY date_lo, date_hi, id"
+
+    cursor = conn.execute(query, params)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for row in rows:
+            yield dict(row)
+
+
+def events_between(db_path: str, start: str, end: str, certain: bool = False) -> List[Dict[str, Any]]:
+    """
+    Get land war events in a date range, in chronological order.
+
+    Args:
+        db_path: Path to database
+        start: Lower bound date ("2023", "2023-03", "2023-03-15")
+        end: Upper bound date
+        certain: Only return events whose whole possible range lies inside
+                 [start, end] (otherwise any overlap counts)
+
+    Returns:
+        List of events
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = list(iter_events_chronological(conn, start, end))
+        if certain:
+            lo, hi = day_number(start), day_number(end, upper=True)
+            rows = [row for row in rows if row['date_lo'] >= lo and row['date_hi'] <= hi]
+        return rows
+    finally:
+        conn.close()
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[2] not in ('install', 'between'):
+        print("Usage: python war_event_dates.py <database_path> install")
+        print("       python war_event_dates.py <database_path> between <start> <end>")
+        sys.exit(1)
+
+    db_path, command = sys.argv[1], sys.argv[2]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    if command == 'install':
+        keyed = install_date_keys(db_path)
+        if keyed is None:
+            sys.exit(1)
+        print(f"✓ Derived date keys for {keyed} land war events")
+        return
+
+    if len(sys.argv) != 5:
+        print("Usage: python war_event_dates.py <database_path> between <start> <end>")
+        sys.exit(1)
+
+    for event in events_between(db_path, sys.argv[3], sys.argv[4]):
+        span = from_day_number(event['date_lo'])
+        if event['date_hi'] != event['date_lo']:
+            span += f" … {from_day_number(event['date_hi'])}"
+        print(f"  • {span} ({event['date_key_precision']}) {event['title']}")
+
+
+if __name__ == "__main__":
+    main()
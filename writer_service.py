@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+Single-Writer Queue Service
+===========================
+Editors (database_utils), batch importers and telemetry feeds write the
+same file. Every database_utils call opens its own connection and
+commits on its own, so each call pays a commit (an fsync) and concurrent
+writers take turns on the lock.
+
+WriterService owns the only write connection. Callers submit operations
+to a bounded queue. The writer thread takes everything that has arrived,
+waits up to GROUP_WINDOW for more (at most MAX_BATCH), runs each
+operation in its own SAVEPOINT inside one transaction and commits once.
+A failing operation rolls back only its savepoint. While an operation
+runs, an authorizer denies transaction control (BEGIN, COMMIT,
+SAVEPOINT, ATTACH... however the SQL is spelled), so it cannot end or
+escape the group transaction. Futures resolve after the commit with the
+operation's return value (new row id, True/False for updates) or its
+exception. The write connection uses WAL, and a Checkpointer keeps the
+-wal file from growing while the service runs.
+
+Operations are the cursor-level writers from database_utils:
+
+    add_character, update_character, add_event, add_corporation,
+    add_location, add_affiliation, execute (one SQL statement)
+
+Other processes reach the service over a Unix socket, one JSON request
+(or a JSON list of requests, answered together) per line:
+
+    {"op": "add_event", "args": ["Kage Ishigawa", 2031, "Joins Shadow Core"]}
+    → {"ok": true, "result": 42}
+    → {"ok": false, "error": "IntegrityError", "message": "..."}
+
+Usage:
+    python writer_service.py <database_path> serve [socket_path]
+    python writer_service.py <database_path> call <operation> [<json_args> [<json_kwargs>]]
+
+    with WriterService(db_path) as writer:
+        event_id = writer.call('add_event', 'Kage Ishigawa', 2031, 'Joins Shadow Core')
+"""
+
+import json
+import os
+import queue
+import socket
+import socketserver
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, List
+
+from database_utils import (
+    Checkpointer, begin_write, connect, insert_affiliation, insert_character, insert_corporation,
+    insert_event, insert_location, modify_character,
+)
+
+
+GROUP_WINDOW = 0.002                # seconds to wait for more requests per commit
+MAX_BATCH = 500                     # operations per commit
+MAX_PENDING = 10000                 # queued operations before submit() blocks
+
+TRANSACTION_KEYWORDS = {'BEGIN', 'COMMIT', 'END', 'ROLLBACK', 'SAVEPOINT', 'RELEASE',
+                        'ATTACH', 'DETACH', 'VACUUM'}
+
+# Authorizer actions an operation may not perform
+TRANSACTION_ACTIONS = {sqlite3.SQLITE_TRANSACTION, sqlite3.SQLITE_SAVEPOINT,
+                       sqlite3.SQLITE_ATTACH, sqlite3.SQLITE_DETACH}
+
+REMOTE_ERRORS = {cls.__name__: cls for cls in (
+    sqlite3.IntegrityError, sqlite3.OperationalError, sqlite3.ProgrammingError,
+    sqlite3.DatabaseError, sqlite3.Error, ValueError, TypeError, KeyError,
+)}
+
+_STOP = object()
+
+
+def execute_statement(cursor, sql: str, params=()) -> Dict[str, Any]:
+    """
+    Run one write statement inside the current group transaction.
+
+    Args:
+        cursor: Open sqlite3 cursor
+        sql: A single INSERT/UPDATE/DELETE/... statement
+        params: Statement parameters (sequence or mapping)
+
+    Returns:
+        {'lastrowid': ..., 'rowcount': ...}
+    """
+    # Fails fast with a clear message (and keeps the service's own cached
+    # SAVEPOINT/RELEASE statements out of reach); the authorizer catches
+    # every other spelling
+    words = sql.split(None, 1)
+    if not words or words[0].upper().rstrip(';') in TRANSACTION_KEYWORDS:
+        raise ValueError("transaction control belongs to the writer service")
+    cursor.execute(sql, params)
+    return {'lastrowid': cursor.lastrowid, 'rowcount': cursor.rowcount}
+
+
+OPERATIONS = {
+    'add_character': insert_character,
+    'update_character': modify_character,
+    'add_event': insert_event,
+    'add_corporation': insert_corporation,
+    'add_location': insert_location,
+    'add_affiliation': insert_affiliation,
+    'execute': execute_statement,
+}
+
+
+class WriterService:
+    """One write connection fed by a queue, committing in groups"""
+
+    def __init__(self, db_path: str, group_window: float = GROUP_WINDOW,
+                 max_batch: int = MAX_BATCH, max_pending: int = MAX_PENDING,
+                 synchronous: str = 'FULL'):
+        """
+        Args:
+            db_path: Path to database
+            group_window: Seconds to wait for more requests before committing
+            max_batch: Most operations per commit
+            max_pending: Queue bound; submit() blocks while it is full
+            synchronous: PRAGMA synchronous for the write connection. FULL
+                         makes every resolved future durable; the fsync is
+                         paid once per group, not once per call.
+        """
+        self.db_path = db_path
+        self.group_window = group_window
+        self.max_batch = max_batch
+        self.synchronous = synchronous
+        self.queue = queue.Queue(max_pending)
+        self.stats = {'commits': 0, 'operations': 0, 'failed': 0, 'largest_batch': 0}
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+        self._in_operation = False
+        self.checkpointer = Checkpointer(db_path)
+
+    def start(self):
+        """Open the write connection in the writer thread"""
+        self._ready.clear()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name='writer-service', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error:
+            self._thread = None
+            raise self._error
+        self.checkpointer.start()
+
+    def stop(self):
+        """Commit what is queued, then close the connection and checkpoint"""
+        if self._thread:
+            self.queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+            self.checkpointer.stop()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    # ──────────────────────────────────────────────────────────
+    # Submitting
+    # ──────────────────────────────────────────────────────────
+
+    def submit(self, op: str, *args, **kwargs) -> Future:
+        """
+        Queue an operation.
+
+        Blocks while MAX_PENDING operations are waiting (back-pressure).
+        A future cancelled before its group starts is skipped.
+
+        Args:
+            op: Name in OPERATIONS
+            *args, **kwargs: Operation arguments (after the cursor)
+
+        Returns:
+            Future resolved after the commit that contains the operation
+        """
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{op}'")
+        if not self._thread:
+            raise RuntimeError("writer service is not running")
+        future = Future()
+        self.queue.put((OPERATIONS[op], args, kwargs, future))
+        return future
+
+    def call(self, op: str, *args, **kwargs):
+        """Submit an operation and wait for its result"""
+        return self.submit(op, *args, **kwargs).result()
+
+    # ──────────────────────────────────────────────────────────
+    # Writer thread
+    # ──────────────────────────────────────────────────────────
+
+    def _run(self):
+        try:
+            conn = connect(self.db_path, 'concurrent')
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+            conn.set_authorizer(self._authorize)
+        except sqlite3.Error as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+
+        cursor = conn.cursor()
+        try:
+            stopping = False
+            while not stopping:
+                batch, stopping = self._next_batch()
+                if batch:
+                    self._commit_batch(conn, cursor, batch)
+        finally:
+            conn.close()
+            # Anything submitted while stopping would otherwise wait forever
+            while True:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP and item[3].set_running_or_notify_cancel():
+                    item[3].set_exception(RuntimeError("writer service stopped"))
+
+    def _authorize(self, action, *args):
+        """Deny transaction control to statements prepared by an operation"""
+        if self._in_operation and action in TRANSACTION_ACTIONS:
+            return sqlite3.SQLITE_DENY
+        return sqlite3.SQLITE_OK
+
+    def _next_batch(self):
+        """Block for one request, then gather what arrives within the window"""
+        item = self.queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.group_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _commit_batch(self, conn, cursor, batch):
+        """Run a batch in one transaction, one savepoint per operation"""
+        outcomes = []
+        try:
+            begin_write(conn)
+            for operation, args, kwargs, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                cursor.execute("SAVEPOINT operation")
+                self._in_operation = True
+                try:
+                    outcomes.append((future, operation(cursor, *args, **kwargs), None))
+                except Exception as e:
+                    self._in_operation = False
+                    cursor.execute("ROLLBACK TO operation")
+                    outcomes.append((future, None, e))
+                finally:
+                    self._in_operation = False
+                cursor.execute("RELEASE operation")
+            conn.commit()
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.rollback()
+            for _, _, _, future in batch:
+                if future.running() or (not future.done() and future.set_running_or_notify_cancel()):
+                    future.set_exception(e)
+                    self.stats['failed'] += 1
+            return
+
+        self.stats['commits'] += 1
+        self.stats['operations'] += len(outcomes)
+        self.stats['largest_batch'] = max(self.stats['largest_batch'], len(outcomes))
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                self.stats['failed'] += 1
+                future.set_exception(error)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# UNIX SOCKET FRONT END
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def default_socket_path(db_path: str) -> str:
+    """Socket the service for a database listens on unless told otherwise"""
+    return f"{db_path}.writer.sock"
+
+
+def _reply(future: Future) -> Dict[str, Any]:
+    try:
+        return {'ok': True, 'result': future.result()}
+    except Exception as e:
+        return {'ok': False, 'error': type(e).__name__, 'message': str(e)}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Answers JSON lines; a list is submitted whole so it can share a commit"""
+
+    def handle(self):
+        writer = self.server.writer
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                requests = request if isinstance(request, list) else [request]
+                futures = [writer.submit(r['op'], *r.get('args', ()), **r.get('kwargs', {}))
+                           for r in requests]
+                replies = [_reply(f) for f in futures]
+                reply = replies if isinstance(request, list) else replies[0]
+            except Exception as e:
+                reply = {'ok': False, 'error': type(e).__name__, 'message': str(e)}
+            self.wfile.write((json.dumps(reply) + '\n').encode('utf-8'))
+            self.wfile.flush()
+
+
+def serve(db_path: str, socket_path: str = None):
+    """
+    Run the writer service behind a Unix socket until interrupted.
+
+    Args:
+        db_path: Path to database
+        socket_path: Socket to listen on (default <db_path>.writer.sock)
+    """
+    socket_path = socket_path or default_socket_path(db_path)
+    if Path(socket_path).exists():
+        try:
+            WriterClient(socket_path).close()
+            raise RuntimeError(f"a writer service is already listening on {socket_path}")
+        except OSError:
+            os.unlink(socket_path)          # left behind by a crashed service
+
+    with WriterService(db_path) as writer:
+        server = socketserver.ThreadingUnixStreamServer(socket_path, _RequestHandler)
+        server.daemon_threads = True
+        server.writer = writer
+        os.chmod(socket_path, 0o600)
+        print(f"✓ Writer service for {db_path} listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            os.unlink(socket_path)
+    print(f"✓ Stopped: {writer.stats['operations']} operations in {writer.stats['commits']} commits")
+
+
+class WriterClient:
+    """Blocking client for a writer service socket"""
+
+    def __init__(self, socket_path: str):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.connect(socket_path)
+        except OSError:
+            self.sock.close()
+            raise
+        self.file = self.sock.makefile('rwb')
+
+    def close(self):
+        """Close the connection"""
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _send(self, request):
+        self.file.write((json.dumps(request) + '\n').encode('utf-8'))
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("writer service closed the connection")
+        return json.loads(line)
+
+    def call(self, op: str, *args, **kwargs):
+        """
+        Run one operation on the service.
+
+        Returns:
+            The operation's result; its error is raised as the same
+            sqlite3/builtin exception type where possible
+        """
+        return _unwrap(self._send({'op': op, 'args': list(args), 'kwargs': kwargs}))
+
+    def call_many(self, requests: List[tuple]) -> List[Any]:
+        """
+        Run several operations in one round trip (and usually one commit).
+
+        Args:
+            requests: (op, args, kwargs) tuples
+
+        Returns:
+            Results in order; failed operations appear as exception instances
+        """
+        replies = self._send([{'op': op, 'args': list(args), 'kwargs': kwargs}
+                              for op, args, kwargs in requests])
+        results = []
+        for reply in replies:
+            try:
+                results.append(_unwrap(reply))
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+def _unwrap(reply: Dict[str, Any]):
+    if reply['ok']:
+        return reply['result']
+    raise REMOTE_ERRORS.get(reply['error'], RuntimeError)(reply['message'])
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[2] not in ('serve', 'call'):
+        print("Usage: python writer_service.py <database_path> serve [socket_path]")
+        print("       python writer_service.py <database_path> call <operation> [<json_args> [<json_kwargs>]]")
+        sys.exit(1)
+
+    db_path = sys.argv[1]
+
+    if not Path(db_path).exists():
+        print(f"❌ Error: Database file '{db_path}' not found!")
+        sys.exit(1)
+
+    if sys.argv[2] == 'serve':
+        serve(db_path, sys.argv[3] if len(sys.argv) > 3 else None)
+        return
+
+    if len(sys.argv) < 4:
+        print("Usage: python writer_service.py <database_path> call <operation> [<json_args> [<json_kwargs>]]")
+        sys.exit(1)
+    args = json.loads(sys.argv[4]) if len(sys.argv) > 4 else []
+    kwargs = json.loads(sys.argv[5]) if len(sys.argv) > 5 else {}
+    with WriterClient(default_socket_path(db_path)) as client:
+        try:
+            print(f"✓ {client.call(sys.argv[3], *args, **kwargs)}")
+        except Exception as e:
+            print(f"✗ {type(e).__name__}: {e}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()